@@ -0,0 +1,265 @@
+import bz2
+import json
+import lzma
+import os
+import shutil
+import stat
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .app_version import version
+from .arguments import parser as argparse
+
+# Build a source distribution from a manifest of files (a JSON file written
+# when configuring the build). Files are streamed into the archive one at a
+# time, and compressed in independent blocks on multiple threads. Each block
+# is a complete gzip/bzip2/xz stream; these formats all allow concatenating
+# streams, so the result can be read by any ordinary decompressor. To make
+# archives reproducible, files are added in sorted order with normalized
+# ownership and permissions, and their timestamps are clamped to
+# `SOURCE_DATE_EPOCH` if it's set.
+
+manifest_version = 1
+
+_block_size = 4 * 1024 * 1024
+_chunk_size = 1024 * 1024
+
+
+def _gzip_compress(data):
+    # Use zlib directly to get a gzip header without a timestamp or filename.
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+_compressors = {
+    'gzip': _gzip_compress,
+    'bzip2': lambda data: bz2.compress(data, 9),
+    'xz': lambda data: lzma.compress(data, lzma.FORMAT_XZ),
+}
+
+formats = tuple(_compressors) + ('zip',)
+
+# The earliest timestamp a zip file can represent.
+_zip_epoch = 315532800  # 1980-01-01T00:00:00Z
+
+# Python 3.5 can't stream data into a zip file.
+_zip_streaming = sys.version_info >= (3, 6)
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def write_manifest(out, files):
+    json.dump({'version': manifest_version, 'files': files}, out, indent=2)
+
+
+def read_manifest(filename):
+    with open(filename) as f:
+        data = json.load(f)
+    if data.get('version') != manifest_version:
+        raise ArchiveError('unsupported dist manifest version {!r}'
+                           .format(data.get('version')))
+    return data['files']
+
+
+def source_date_epoch():
+    value = os.environ.get('SOURCE_DATE_EPOCH')
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ArchiveError('invalid SOURCE_DATE_EPOCH {!r}'.format(value))
+
+
+class BlockCompressor:
+    # A write-only file object that compresses its input in fixed-size blocks
+    # on a thread pool, writing the compressed blocks to `out` in order. The
+    # block size doesn't depend on the number of jobs, so the output is the
+    # same no matter how many threads we use.
+
+    def __init__(self, out, compress, jobs=None, block_size=_block_size):
+        self.out = out
+        self.compress = compress
+        self.block_size = block_size
+        jobs = jobs or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=jobs)
+        self._max_pending = 2 * jobs
+        self._pending = deque()
+        self._buffer = bytearray()
+
+    def _submit(self, block):
+        self._pending.append(self._executor.submit(self.compress, block))
+        while len(self._pending) > self._max_pending:
+            self.out.write(self._pending.popleft().result())
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def close(self):
+        if self._buffer or not self._pending:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self.out.write(self._pending.popleft().result())
+        self._executor.shutdown()
+
+
+class Archiver:
+    def __init__(self, directory='.', prefix=None, *, jobs=None, epoch=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.jobs = jobs
+        self.epoch = epoch
+
+    def arcname(self, name):
+        name = name.replace(os.sep, '/')
+        return '{}/{}'.format(self.prefix, name) if self.prefix else name
+
+    def mtime(self, st):
+        mtime = int(st.st_mtime)
+        return min(mtime, self.epoch) if self.epoch is not None else mtime
+
+    @staticmethod
+    def mode(st):
+        if stat.S_ISDIR(st.st_mode) or st.st_mode & 0o111:
+            return 0o755
+        return 0o644
+
+    def entries(self, files):
+        # Yield each file (relative to our directory) and its stat info, in
+        # sorted order so that the archive doesn't depend on the order files
+        # were listed in the build.
+        for i in sorted(set(os.path.normpath(i) for i in files)):
+            path = os.path.join(self.directory, i)
+            try:
+                yield i, path, os.lstat(path)
+            except FileNotFoundError:
+                raise ArchiveError('{!r} does not exist'.format(i))
+
+    def _tarinfo(self, name, path, st):
+        info = tarfile.TarInfo(self.arcname(name))
+        info.mtime = self.mtime(st)
+        info.mode = self.mode(st)
+        if stat.S_ISLNK(st.st_mode):
+            info.type = tarfile.SYMTYPE
+            info.linkname = os.readlink(path)
+            info.mode = 0o777
+        elif stat.S_ISDIR(st.st_mode):
+            info.type = tarfile.DIRTYPE
+        else:
+            info.size = st.st_size
+        return info
+
+    def write_tar(self, out, files, format):
+        compressor = BlockCompressor(out, _compressors[format], self.jobs)
+        with tarfile.open(fileobj=compressor, mode='w|',
+                          format=tarfile.PAX_FORMAT) as tar:
+            for name, path, st in self.entries(files):
+                info = self._tarinfo(name, path, st)
+                if info.isreg():
+                    with open(path, 'rb') as f:
+                        tar.addfile(info, f)
+                else:
+                    tar.addfile(info)
+        compressor.close()
+
+    def _zipinfo(self, name, st):
+        is_dir = stat.S_ISDIR(st.st_mode)
+        date_time = time.gmtime(max(self.mtime(st), _zip_epoch))[:6]
+        info = zipfile.ZipInfo(self.arcname(name) + ('/' if is_dir else ''),
+                               date_time)
+        info.create_system = 3  # Unix
+        info.external_attr = (
+            (stat.S_IFDIR if is_dir else stat.S_IFREG) | self.mode(st)
+        ) << 16
+        if is_dir:
+            info.external_attr |= 0x10  # MS-DOS directory flag
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    def write_zip(self, out, files):
+        # Zip files compress each file separately, so we just stream each
+        # one into the archive.
+        with zipfile.ZipFile(out, 'w') as zf:
+            for name, path, st in self.entries(files):
+                info = self._zipinfo(name, st)
+                if stat.S_ISDIR(st.st_mode):
+                    zf.writestr(info, b'')
+                    continue
+                with open(path, 'rb') as src:
+                    if _zip_streaming:
+                        # Let zipfile know if it needs to use zip64.
+                        info.file_size = os.fstat(src.fileno()).st_size
+                        with zf.open(info, 'w') as dst:
+                            shutil.copyfileobj(src, dst, _chunk_size)
+                    else:  # pragma: no cover
+                        zf.writestr(info, src.read())
+
+    def archive(self, files, output, format):
+        if format not in formats:
+            raise ArchiveError('unrecognized format {!r}'.format(format))
+
+        # Write to a temporary file and then move it into place so that we
+        # never leave a partial archive behind.
+        dirname = os.path.dirname(output) or '.'
+        with tempfile.NamedTemporaryFile(
+            'wb', dir=dirname, prefix='.' + os.path.basename(output),
+            delete=False
+        ) as f:
+            try:
+                if format == 'zip':
+                    self.write_zip(f, files)
+                else:
+                    self.write_tar(f, files, format)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, output)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='bfg9000-archive',
+        description='Create a source distribution from the files listed in ' +
+                    'a dist manifest.'
+    )
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + version)
+    parser.add_argument('-f', '--format', choices=formats, default='gzip',
+                        help='the archive format (default: %(default)s)')
+    parser.add_argument('-C', '--directory', metavar='DIR', default='.',
+                        help='the directory the listed files are relative ' +
+                        'to')
+    parser.add_argument('-P', '--prefix', metavar='PREFIX',
+                        help='the directory to place files under in the ' +
+                        'archive')
+    parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                        help='the number of threads to compress with')
+    parser.add_argument('manifest', metavar='MANIFEST',
+                        help='the dist manifest')
+    parser.add_argument('output', metavar='OUTPUT', help='the archive to ' +
+                        'create')
+    args = parser.parse_args()
+
+    try:
+        archiver = Archiver(args.directory, args.prefix, jobs=args.jobs,
+                            epoch=source_date_epoch())
+        archiver.archive(read_manifest(args.manifest), args.output,
+                         args.format)
+    except (ArchiveError, OSError) as e:
+        parser.exit(1, '{}: error: {}\n'.format(parser.prog, e))
@@ -1,8 +1,7 @@
+import importlib as _importlib
 import re as _re
 from argparse import *
 
-from .. import path as _path
-
 _ArgumentParser = ArgumentParser
 
 
@@ -58,13 +57,19 @@ class ArgumentParser(_ArgumentParser):
         return super()._get_option_tuples(option_string)
 
 
+def _path():
+    # Import bfg9000.path lazily, since doing so requires detecting the
+    # platform. This keeps helper scripts (e.g. bfg9000-depfixer) quick.
+    return _importlib.import_module('..path', __package__)
+
+
 class BaseFile:
     def __init__(self, must_exist=False):
         self.must_exist = must_exist
 
     def __call__(self, string):
         p = self._abspath(string)
-        if _path.exists(p):
+        if _path().exists(p):
             if not self._check_type(p):
                 raise ArgumentTypeError("'{}' is not a {}"
                                         .format(string, self._kind))
@@ -79,11 +84,11 @@ class Directory(BaseFile):
 
     @staticmethod
     def _abspath(p):
-        return _path.abspath(p, directory=True, absdrive=False)
+        return _path().abspath(p, directory=True, absdrive=False)
 
     @staticmethod
     def _check_type(p):
-        return _path.isdir(p)
+        return _path().isdir(p)
 
 
 class File(BaseFile):
@@ -91,11 +96,11 @@ class File(BaseFile):
 
     @staticmethod
     def _abspath(p):
-        return _path.abspath(p, directory=False, absdrive=False)
+        return _path().abspath(p, directory=False, absdrive=False)
 
     @staticmethod
     def _check_type(p):
-        return _path.isfile(p)
+        return _path().isfile(p)
 
 
 # It'd be nice to just have a UserArgumentParser class with this method but it
@@ -1,25 +1,91 @@
+import importlib
 from collections import OrderedDict
-from pkg_resources import iter_entry_points, DistributionNotFound
 
+from .. import probes
 from ..objutils import memoize
+from ..plugins import iter_entry_points
+
+# The built-in backends and their priorities. These are known up front so that
+# we don't have to scan the installed distributions' entry points (or import
+# every backend) just to start up.
+_builtin_backends = OrderedDict([
+    ('ninja', ('bfg9000.backends.ninja.writer', 3)),
+    ('make', ('bfg9000.backends.make.writer', 2)),
+    ('msbuild', ('bfg9000.backends.msbuild.writer', 1)),
+])
+
+
+@memoize
+def _plugin_backends():
+    return OrderedDict((i.name, i) for i in iter_entry_points(
+        'bfg9000.backends'
+    ) if i.name not in _builtin_backends)
+
+
+class BackendNames:
+    # A lazily-evaluated collection of backend names, suitable for passing as
+    # `choices` to argparse. Third-party backends are only looked up if we
+    # need to show all the choices or to check a non-builtin name.
+    def __contains__(self, name):
+        return name in _builtin_backends or name in _plugin_backends()
+
+    def __iter__(self):
+        return iter(list_backend_names())
+
+
+@memoize
+def list_backend_names():
+    names = list(_builtin_backends.keys()) + list(_plugin_backends().keys())
+
+    def sort_key(x):
+        if x in _builtin_backends:
+            return _builtin_backends[x][1]
+        return get_backend(x).priority
+
+    # Sort the backends by priority, loading third-party backends as
+    # necessary to find their priority.
+    names.sort(key=sort_key, reverse=True)
+    return names
+
+
+@memoize
+def get_backend(name):
+    if name in _builtin_backends:
+        return importlib.import_module(_builtin_backends[name][0])
+    try:
+        return _plugin_backends()[name].load()
+    except KeyError:
+        raise ValueError('unknown backend {!r}'.format(name))
+
+
+@memoize
+def backend_version(name):
+    with probes.caller('backend {!r}'.format(name)):
+        return get_backend(name).version()
+
+
+def default_backend():
+    # Pick the highest-priority backend that's actually installed, probing
+    # only as many backends as we need to. If none are installed, just return
+    # the highest-priority one.
+    names = list_backend_names()
+    for i in names:
+        try:
+            if backend_version(i):
+                return i
+        except ImportError:  # pragma: no cover
+            pass
+    return names[0]
 
 
 @memoize
 def list_backends():
     backends = []
-    for i in iter_entry_points('bfg9000.backends'):
+    for i in list_backend_names():
         try:
-            backend = i.load()
-            backends.append((i.name, backend))
-        # An ImportError can be thrown by the MSBuild backend when bfg9000 was
-        # installed as a Wheel with setuptools < 34.0.2. We'd require 34.0.2 or
-        # better, but setuptools < 11.0 won't let you upgrade setuptools during
-        # bfg's installation. Since Ubuntu 14.04 is supported until 2019 and
-        # has setuptools 2.2 by default, we're stuck with this for a while.
-        except (DistributionNotFound, ImportError):  # pragma: no cover
+            backends.append((i, get_backend(i)))
+        # An ImportError can be thrown by the MSBuild backend when its
+        # optional dependencies (lxml) aren't installed.
+        except ImportError:  # pragma: no cover
             pass
-
-    def sort_key(x):
-        return x[1].priority if x[1].version() else 0
-    backends.sort(key=sort_key, reverse=True)
     return OrderedDict(backends)
@@ -1,5 +1,6 @@
+import posixpath
 import re
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from enum import Enum
 from io import StringIO
 
@@ -8,16 +9,20 @@ from ... import safe_str
 from ... import iterutils
 from ...platforms.host import platform_info
 from ...tools.common import Command
+from ...versioning import SpecifierSet
 
 # XXX: Make currently only supports sh-style shells.
 from ...shell import posix as pshell
 
-__all__ = ['Call', 'Entity', 'Function', 'Makefile', 'NamedEntity', 'Pattern',
-           'qvar', 'Section', 'Silent', 'Syntax', 'Variable', 'var', 'Writer']
+__all__ = ['Call', 'Entity', 'features', 'Function', 'Makefile', 'NamedEntity',
+           'Pattern', 'qvar', 'Section', 'Silent', 'Syntax', 'Variable', 'var',
+           'Writer']
 
 Rule = namedtuple('Rule', ['targets', 'deps', 'order_only', 'recipe',
-                           'variables', 'phony'])
+                           'variables', 'phony', 'grouped'])
 Include = namedtuple('Include', ['name', 'optional'])
+PatternRule = namedtuple('PatternRule', ['rule', 'targets', 'target_pattern',
+                                         'dep_pattern'])
 
 Syntax = Enum('Syntax', ['target', 'dependency', 'function', 'shell', 'clean'])
 Section = Enum('Section', ['path', 'command', 'flags', 'other'])
@@ -240,10 +245,30 @@ class Silent:
         self.data = data
 
 
+class _MakeFeatures:
+    # The GNU Make version required for each feature.
+    _features = {
+        'file_function': '4.0',
+        'grouped_targets': '4.3',
+    }
+
+    def version(self, feature):
+        return self._features[feature]
+
+    def supported(self, feature, version):
+        return version and version in SpecifierSet(
+            '>={}'.format(self.version(feature))
+        )
+
+
+features = _MakeFeatures()
+
+
 class Makefile:
     Section = Section
 
-    def __init__(self, bfgfile, destdir=False, *, gnu=False):
+    def __init__(self, bfgfile, destdir=False, *, gnu=False,
+                 pattern_rules=False):
         self.path_vars = {
             path.Root.srcdir  : Variable('srcdir'),
             path.Root.builddir: None,
@@ -254,6 +279,7 @@ class Makefile:
 
         self._bfgfile = bfgfile
         self._gnu = gnu
+        self._pattern_rules = gnu and pattern_rules
 
         self._var_table = set()
         self._global_variables = {i: [] for i in Section}
@@ -310,7 +336,7 @@ class Makefile:
         return out.stream.getvalue()
 
     def rule(self, target, deps=None, order_only=None, recipe=None,
-             variables=None, phony=False):
+             variables=None, phony=False, grouped=False):
         targets = iterutils.listify(target)
         if len(targets) == 0:
             raise ValueError('must have at least one target')
@@ -327,7 +353,7 @@ class Makefile:
 
         self._rules.append(Rule(
             targets, iterutils.listify(deps), iterutils.listify(order_only),
-            recipe, variables, phony
+            recipe, variables, phony, grouped and len(targets) > 1
         ))
 
     def has_rule(self, name):
@@ -359,7 +385,90 @@ class Makefile:
             out.write_literal('\n')
         out.write_literal('endef\n\n')
 
+    def _render(self, fn, *args, **kwargs):
+        out = self.writer(StringIO())
+        fn(out, *args, **kwargs)
+        return out.stream.getvalue()
+
+    @staticmethod
+    def _split_stem(name):
+        dirname, basename = posixpath.split(name)
+        stem, ext = posixpath.splitext(basename)
+        return (dirname + '/' if dirname else ''), stem, ext
+
+    def _pattern_key(self, rule):
+        # Get a key describing everything about a rule except the stem it
+        # shares with its (sole) dependency, or None if the rule can't be
+        # written as part of a static pattern rule.
+        if ( len(rule.targets) != 1 or len(rule.deps) != 1 or rule.phony or
+             rule.grouped or rule.recipe is None ):
+            return None
+
+        target = self._render(Writer.write, rule.targets[0], Syntax.target)
+        dep = self._render(Writer.write, rule.deps[0], Syntax.dependency)
+        if any(i in target + dep for i in '%\\'):
+            return None
+
+        target_dir, stem, target_ext = self._split_stem(target)
+        dep_dir, dep_stem, dep_ext = self._split_stem(dep)
+        if not stem or stem != dep_stem:
+            return None
+
+        recipe = self._render(self._write_recipe, rule.recipe)
+        variables = tuple(
+            self._render(self._write_variable, name, value)
+            for name, value in rule.variables.items()
+        )
+        order_only = self._render(Writer.write_each, rule.order_only,
+                                  Syntax.dependency)
+        return (target_dir + '%' + target_ext, dep_dir + '%' + dep_ext,
+                order_only, recipe, variables)
+
+    def _group_rules(self, rules):
+        # Combine rules that differ only by the stem of their target and
+        # dependency (e.g. compiling each source file in a directory with the
+        # same flags) into static pattern rules. This way, Make has far fewer
+        # rules and target-specific variables to parse.
+        groups = OrderedDict()
+        for i, rule in enumerate(rules):
+            key = self._pattern_key(rule)
+            groups.setdefault(i if key is None else key, []).append(rule)
+
+        for key, group in groups.items():
+            if len(group) == 1:
+                yield group[0]
+            else:
+                yield PatternRule(group[0], [i.targets[0] for i in group],
+                                  key[0], key[1])
+
+    def _write_recipe(self, out, recipe):
+        if isinstance(recipe, Entity):
+            out.write_literal(' ; ')
+            out.write_shell(recipe)
+        elif recipe is not None:
+            for cmd in recipe:
+                out.write_literal('\n\t')
+                out.write_shell(cmd)
+
+    def _write_pattern_rule(self, out, pattern_rule):
+        rule = pattern_rule.rule
+        for name, value in rule.variables.items():
+            out.write_each(pattern_rule.targets, Syntax.target)
+            out.write_literal(': ')
+            self._write_variable(out, name, value)
+
+        out.write_each(pattern_rule.targets, Syntax.target)
+        out.write_literal(': {}: {}'.format(pattern_rule.target_pattern,
+                                            pattern_rule.dep_pattern))
+        out.write_each(rule.order_only, Syntax.dependency,
+                       prefix=safe_str.literal(' | '))
+        self._write_recipe(out, rule.recipe)
+        out.write_literal('\n\n')
+
     def _write_rule(self, out, rule):
+        if isinstance(rule, PatternRule):
+            return self._write_pattern_rule(out, rule)
+
         if rule.variables:
             for target in rule.targets:
                 for name, value in rule.variables.items():
@@ -371,19 +480,12 @@ class Makefile:
             out.write_literal('\n')
 
         out.write_each(rule.targets, Syntax.target)
-        out.write_literal(':')
+        out.write_literal(' &:' if rule.grouped else ':')
 
         lit = safe_str.literal
         out.write_each(rule.deps, Syntax.dependency, prefix=lit(' '))
         out.write_each(rule.order_only, Syntax.dependency, prefix=lit(' | '))
-
-        if isinstance(rule.recipe, Entity):
-            out.write_literal(' ; ')
-            out.write_shell(rule.recipe)
-        elif rule.recipe is not None:
-            for cmd in rule.recipe:
-                out.write_literal('\n\t')
-                out.write_shell(cmd)
+        self._write_recipe(out, rule.recipe)
         out.write_literal('\n\n')
 
     def writer(self, out):
@@ -419,7 +521,10 @@ class Makefile:
         for name, value in self._defines:
             self._write_define(out, name, value)
 
-        for r in self._rules:
+        rules = self._rules
+        if self._pattern_rules:
+            rules = self._group_rules(rules)
+        for r in rules:
             self._write_rule(out, r)
 
         for i in self._includes:
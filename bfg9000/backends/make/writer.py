@@ -1,7 +1,8 @@
 import os
 import re
+from io import StringIO
 
-from ... import file_types, path, shell
+from ... import depfixer, file_types, path, profiler, shell
 from .syntax import *
 from ...iterutils import listify, uniques
 from ...versioning import Version
@@ -22,6 +23,7 @@ def version(env=os.environ):
 
 priority = 2
 filepath = path.Path('Makefile')
+stamppath = path.Path('Makefile.stamp')
 
 _rule_handlers = {}
 _pre_rules = []
@@ -49,21 +51,45 @@ def post_rule(fn):
 
 
 def write(env, build_inputs):
+    project = build_inputs['project']
     buildfile = Makefile(build_inputs.bfgpath.string(env.base_dirs),
                          env.supports_destdir,
-                         gnu=env.backend_version is not None)
+                         gnu=env.backend_version is not None,
+                         pattern_rules=project['pattern_rules'])
     buildfile.variable(buildfile.path_vars[path.Root.srcdir], env.srcdir,
                        Section.path)
 
     for i in _pre_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'pre_rule'):
+            i(build_inputs, buildfile, env)
     for e in build_inputs.edges():
-        _rule_handlers[type(e)](e, build_inputs, buildfile, env)
+        with profiler.span(type(e).__name__, 'rule_handler'):
+            _rule_handlers[type(e)](e, build_inputs, buildfile, env)
     for i in _post_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'post_rule'):
+            i(build_inputs, buildfile, env)
 
-    with open(filepath.string(env.base_dirs), 'w') as out:
-        buildfile.write(out)
+    out = StringIO()
+    buildfile.write(out)
+
+    # The Makefile is only rewritten when its contents change, so record when
+    # we last generated it in a separate stamp file for the regenerate rule.
+    with open(stamppath.string(env.base_dirs), 'w'):
+        pass
+    path.write_if_changed(filepath, out.getvalue(), env.base_dirs)
+
+
+def discovered_deps(env, outputs):
+    # Read the dependencies the compiler found during the last build (e.g.
+    # #included headers) from each output's depfile.
+    result = {}
+    for i in outputs:
+        try:
+            with open(os.path.join(env.builddir.string(), i + '.d')) as f:
+                result[i] = list(depfixer.iter_deps(f))
+        except (OSError, depfixer.ParseError):
+            pass
+    return result
 
 
 def flags_vars(name, value, buildfile):
@@ -77,17 +103,23 @@ def _get_path(thing):
     return thing if isinstance(thing, path.Path) else thing.path
 
 
-def multitarget_rule(build_inputs, buildfile, targets, deps=None,
-                     order_only=None, recipe=None, variables=None, phony=None,
-                     clean_stamp=True):
+def multitarget_rule(build_inputs, buildfile, env, targets, deps=None,
+                     order_only=None, recipe=None, variables=None, phony=None):
     targets = listify(targets)
     if len(targets) > 1:
+        # When supported, use grouped targets so that Make knows that the
+        # recipe produces all of the targets at once. Otherwise, have the
+        # recipe produce a stamp file that all the targets depend on.
+        if features.supported('grouped_targets', env.backend_version):
+            buildfile.rule(targets, deps, order_only, recipe, variables, phony,
+                           grouped=True)
+            return
+
         first = targets[0]
         primary = _get_path(first).addext('.stamp')
         buildfile.rule(target=targets, deps=[primary])
         recipe = listify(recipe) + [Silent([ 'touch', qvar('@') ])]
-        if clean_stamp:
-            build_inputs.add_target(file_types.File(primary))
+        build_inputs.add_target(file_types.File(primary))
     else:
         primary = targets[0]
 
@@ -1,7 +1,9 @@
 import os
 import re
+from io import BytesIO, StringIO
 
 from ... import path
+from ... import profiler
 from ... import shell
 from .solution import Solution, UuidMap
 from .syntax import *  # noqa
@@ -45,15 +47,18 @@ def write(env, build_inputs):
     solution = Solution(uuids)
 
     for e in build_inputs.edges():
-        _rule_handlers[type(e)](e, build_inputs, solution, env)
+        with profiler.span(type(e).__name__, 'rule_handler'):
+            _rule_handlers[type(e)](e, build_inputs, solution, env)
     for i in _post_rules:
-        i(build_inputs, solution, env)
+        with profiler.span(i.__name__, 'post_rule'):
+            i(build_inputs, solution, env)
 
     sln_file = path.Path(build_inputs['project'].name + '.sln')
-    with open(sln_file.string(env.base_dirs), 'w') as out:
-        solution.write(out)
+    out = StringIO()
+    solution.write(out)
+    path.write_if_changed(sln_file, out.getvalue(), env.base_dirs)
     for p in solution:
-        os.makedirs(p.path.parent().string(env.base_dirs), exist_ok=True)
-        with open(p.path.string(env.base_dirs), 'wb') as out:
-            p.write(out)
+        out = BytesIO()
+        p.write(out)
+        path.write_if_changed(p.path, out.getvalue(), env.base_dirs)
     uuids.save()
@@ -0,0 +1,173 @@
+import hashlib
+import re
+from collections import namedtuple
+from itertools import chain
+
+from ...iterutils import uniques
+from ...path import Path, Root
+
+# Ninja starts ready builds roughly in the order they appear in the manifest,
+# so a long chain of slow builds (e.g. a huge source file feeding a library
+# that everything else links against) can easily end up starting last. Using
+# the timings from `.ninja_log`, find how long the longest chain starting at
+# each build takes, and put the builds with the longest chains first.
+
+_log_header_ex = re.compile(r'^# ninja log v(\d+)$')
+
+# The timings change on every build, so reordering the builds every time we
+# regenerate would change the manifest (and make Ninja reload it) even when
+# nothing else did. Instead, mark each reordered file with a digest of its
+# unordered contents, and only reorder it again when that changes.
+_stamp_tmpl = '# critical path order: {}\n'
+_stamp_ex = re.compile(r'^# critical path order: ([0-9a-f]+)$')
+
+Report = namedtuple('Report', ['path', 'length', 'total'])
+GraphBuild = namedtuple('GraphBuild', ['outputs', 'inputs', 'implicit',
+                                       'order_only', 'rule'])
+
+
+def read_log(f):
+    header = _log_header_ex.match(f.readline().rstrip('\n'))
+    if not header or int(header.group(1)) < 5:
+        return {}
+
+    # Each output appears once per time it was built, so only keep the
+    # latest timing for each.
+    result = {}
+    for line in f:
+        fields = line.rstrip('\n').split('\t')
+        if len(fields) == 5:
+            try:
+                start, end = int(fields[0]), int(fields[1])
+            except ValueError:
+                continue
+            result[fields[3]] = (end - start) / 1000
+    return result
+
+
+def load_log(filename):
+    try:
+        with open(filename) as f:
+            return read_log(f)
+    except FileNotFoundError:
+        return {}
+
+
+def digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def stamp(text, digest):
+    return text + _stamp_tmpl.format(digest)
+
+
+def read_stamp(filename):
+    try:
+        with open(filename) as f:
+            line = ''
+            for line in f:
+                pass
+    except FileNotFoundError:
+        return None
+    match = _stamp_ex.match(line.rstrip('\n'))
+    return match.group(1) if match else None
+
+
+def _node(thing):
+    return getattr(thing, 'path', thing)
+
+
+def _name(thing):
+    node = _node(thing)
+    return node.suffix if isinstance(node, Path) else str(node)
+
+
+def _log_name(thing):
+    node = _node(thing)
+    if isinstance(node, Path) and node.root != Root.builddir:
+        return None
+    return _name(node)
+
+
+def _durations(builds, timings):
+    result = []
+    for i in builds:
+        times = [timings.get(_log_name(j)) for j in i.outputs]
+        times = [j for j in times if j is not None]
+        result.append(max(times) if times else None)
+
+    # Assume that builds we haven't run yet (e.g. from new source files) take
+    # about as long as the average build.
+    known = [i for i, b in zip(result, builds)
+             if i is not None and b.rule != 'phony']
+    default = sum(known) / len(known) if known else 0
+    return [0 if b.rule == 'phony' else default if i is None else i
+            for i, b in zip(result, builds)]
+
+
+def weigh(builds, timings):
+    builds = list(builds)
+    producers = {}
+    for n, i in enumerate(builds):
+        for j in i.outputs:
+            producers[_node(j)] = n
+
+    consumers = [[] for i in builds]
+    depcount = [0] * len(builds)
+    for n, i in enumerate(builds):
+        deps = uniques(producers[_node(j)] for j in
+                       chain(i.inputs, i.implicit, i.order_only)
+                       if _node(j) in producers)
+        for j in deps:
+            consumers[j].append(n)
+        depcount[n] = len(deps)
+
+    # Visit every build after all of its dependencies, and then walk that
+    # order backwards so that each build's consumers are weighed first.
+    order = [n for n, i in enumerate(depcount) if i == 0]
+    for n in order:
+        for j in consumers[n]:
+            depcount[j] -= 1
+            if depcount[j] == 0:
+                order.append(j)
+
+    durations = _durations(builds, timings)
+    weights = [0] * len(builds)
+    successors = [None] * len(builds)
+    for n in reversed(order):
+        if consumers[n]:
+            successors[n] = max(consumers[n], key=lambda j: weights[j])
+            weights[n] = weights[successors[n]]
+        weights[n] += durations[n]
+    return weights, successors, durations
+
+
+def schedule(buildfile, timings):
+    weights, _, _ = weigh(buildfile.builds(), timings)
+    weights = {id(b): w for b, w in zip(buildfile.builds(), weights)}
+    buildfile.sort_builds(key=lambda b: -weights[id(b)])
+
+
+def graph_builds(graph):
+    # Make builds from the edges in a saved build graph that look enough like
+    # Ninja builds to weigh, so we can analyze a build without regenerating it.
+    return [GraphBuild(
+        [graph.nodes[i] for i in edge['outputs']],
+        [graph.nodes[i] for i in edge['inputs']], [], [],
+        'phony' if edge['type'] == 'Alias' else edge['type']
+    ) for edge in graph.edges]
+
+
+def analyze(builds, timings):
+    builds = list(builds)
+    weights, successors, durations = weigh(builds, timings)
+    if not builds:
+        return Report([], 0, 0)
+
+    path = []
+    n = max(range(len(builds)), key=lambda i: weights[i])
+    while n is not None:
+        if builds[n].rule != 'phony':
+            path.append((_name(builds[n].outputs[0]), durations[n]))
+        n = successors[n]
+    return Report(path, max(weights), sum(durations))
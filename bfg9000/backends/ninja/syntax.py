@@ -1,7 +1,9 @@
 import re
 from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
 from enum import Enum
 from io import StringIO
+from itertools import chain
 
 from ... import path
 from ... import safe_str
@@ -15,13 +17,17 @@ __all__ = ['features', 'NinjaFile', 'Section', 'Syntax', 'var', 'Variable',
            'Writer']
 
 Rule = namedtuple('Rule', ['command', 'depfile', 'deps', 'description',
-                           'generator', 'pool', 'restat'])
+                           'generator', 'pool', 'restat', 'rspfile',
+                           'rspfile_content'])
 Build = namedtuple('Build', ['outputs', 'rule', 'inputs', 'implicit',
                              'order_only', 'variables'])
 
 Syntax = Enum('Syntax', ['output', 'input', 'shell', 'clean'])
 Section = Enum('Section', ['path', 'command', 'flags', 'other'])
 
+# Matches references to variables in a rendered variable value.
+_var_ref_re = re.compile(r'\$\{?(\w+)')
+
 _comment_tmpl = """
 # Do not edit this file! It was automatically generated by bfg9000.
 # Instead, you should edit the source file that created this:
@@ -140,6 +146,7 @@ def var(v):
 class _NinjaFeatures:
     _features = {
         'console': '1.5',
+        'dyndep': '1.10',
     }
 
     def version(self, feature):
@@ -178,6 +185,10 @@ class NinjaFile:
         self._build_outputs = set()
         self._defaults = []
 
+        # Builds to write to separate files, included via `subninja`.
+        self._fragments = OrderedDict()
+        self._current_builds = self._builds
+
     def min_version(self, version):
         version = Version(version)
         if self._min_version is None or version > self._min_version:
@@ -202,8 +213,12 @@ class NinjaFile:
         return var(name) in self._var_table
 
     def rule(self, name, command, depfile=None, deps=None, description=None,
-             generator=False, pool=None, restat=False):
+             generator=False, pool=None, restat=False, rspfile=None,
+             rspfile_content=None):
         command = self._convert_args(command)
+        if (rspfile is None) != (rspfile_content is None):
+            raise ValueError('rspfile and rspfile_content must be specified ' +
+                             'together')
 
         if pool is not None:
             if pool == 'console':
@@ -218,7 +233,8 @@ class NinjaFile:
             raise ValueError('rule {!r} already exists'.format(name))
 
         self._rules[name] = Rule(command, depfile, deps, description,
-                                 generator, pool, restat)
+                                 generator, pool, restat, rspfile,
+                                 rspfile_content)
 
     def has_rule(self, name):
         return name in self._rules
@@ -242,7 +258,7 @@ class NinjaFile:
             if self.has_build(out):
                 raise ValueError('build for {!r} already exists'.format(out))
             self._build_outputs.add(out)
-        self._builds.append(Build(
+        self._current_builds.append(Build(
             outputs, rule, iterutils.listify(inputs),
             iterutils.listify(implicit), iterutils.listify(order_only),
             variables
@@ -251,6 +267,36 @@ class NinjaFile:
     def has_build(self, name):
         return name in self._build_outputs
 
+    @contextmanager
+    def fragment(self, path, bfgfile=None):
+        # Put any builds added in this context into the file at `path`, which
+        # will be included by the main file. Rules and global variables are
+        # always shared with the main file.
+        old_builds = self._current_builds
+        if path is not None:
+            if path not in self._fragments:
+                self._fragments[path] = (bfgfile or self._bfgfile, [])
+            self._current_builds = self._fragments[path][1]
+        try:
+            yield
+        finally:
+            self._current_builds = old_builds
+
+    def fragments(self):
+        return iter(self._fragments)
+
+    def builds(self):
+        return chain(self._builds, chain.from_iterable(
+            builds for bfgfile, builds in self._fragments.values()
+        ))
+
+    def sort_builds(self, key):
+        # Sorting is stable, so builds with the same key stay in the order
+        # they were added.
+        self._builds.sort(key=key)
+        for bfgfile, builds in self._fragments.values():
+            builds.sort(key=key)
+
     def default(self, paths):
         self._defaults.extend(iterutils.iterate(paths))
 
@@ -283,8 +329,55 @@ class NinjaFile:
             self._write_variable(out, var('pool'), rule.pool, indent=1)
         if rule.restat:
             self._write_variable(out, var('restat'), '1', indent=1)
+        if rule.rspfile:
+            self._write_variable(out, var('rspfile'), rule.rspfile, indent=1)
+            self._write_variable(out, var('rspfile_content'),
+                                 rule.rspfile_content, indent=1)
+
+    def _render_variables(self, build):
+        desc_var = var('description')
+        result = []
+        for k, v in build.variables.items():
+            syntax = Syntax.clean if k == desc_var else Syntax.shell
+            out = self.writer(StringIO())
+            out.write_shell(v, syntax)
+            result.append((k, out.stream.getvalue()))
+        return result
+
+    def _shared_variables(self, rendered):
+        # Large projects often have many build statements with the same
+        # per-build variables (e.g. every object file in a target has the same
+        # `cflags`). Hoist any values used by more than one build into global
+        # variables so that we only write them (and Ninja only parses them)
+        # once.
+        counts = OrderedDict()
+        for variables in rendered:
+            names = set(k.name for k, v in variables)
+            for k, v in variables:
+                # Build-level variables can refer to earlier variables on the
+                # same build, so we can't hoist those.
+                if names.isdisjoint(_var_ref_re.findall(v)):
+                    counts[k, v] = counts.get((k, v), 0) + 1
+
+        shared = OrderedDict()
+        indices = {}
+        for (k, v), count in counts.items():
+            # Don't bother with values that are about as short as a reference
+            # to the shared variable would be.
+            if count < 2 or len(v) <= len(k.name) + 5:
+                continue
+            while True:
+                indices[k] = indices.get(k, 0) + 1
+                name = var('{}_{}'.format(k.name, indices[k]))
+                if not self.has_variable(name):
+                    break
+            shared[k, v] = name
+        return shared
+
+    def _write_build(self, out, build, variables=None, shared={}):
+        if variables is None:
+            variables = self._render_variables(build)
 
-    def _write_build(self, out, build):
         out.write_literal('build ')
         out.write_each(build.outputs, Syntax.output)
         out.write_literal(': ' + build.rule)
@@ -295,15 +388,26 @@ class NinjaFile:
         out.write_each(build.order_only, Syntax.input, prefix=lit(' || '))
         out.write_literal('\n')
 
-        if build.variables:
-            desc_var = var('description')
-            for k, v in build.variables.items():
-                syntax = Syntax.clean if k == desc_var else Syntax.shell
-                self._write_variable(out, k, v, indent=1, syntax=syntax)
+        for k, v in variables:
+            if (k, v) in shared:
+                v = shared[k, v].use().string
+            out.write_literal('  ' + k.name + ' = ' + v + '\n')
 
     def writer(self, out, *args, **kwargs):
         return Writer(out, self.path_vars, *args, **kwargs)
 
+    def _write_builds(self, out, builds):
+        rendered = [self._render_variables(i) for i in builds]
+        shared = self._shared_variables(rendered)
+        for (k, v), name in shared.items():
+            out.write_literal(name.name + ' = ' + v + '\n')
+        if shared:
+            out.write_literal('\n')
+
+        for build, variables in zip(builds, rendered):
+            self._write_build(out, build, variables, shared)
+            out.write_literal('\n')
+
     def write(self, out):
         out = self.writer(out)
         out.write_literal(_comment_tmpl.format(self._bfgfile) + '\n\n')
@@ -327,11 +431,22 @@ class NinjaFile:
             self._write_rule(out, name, rule)
             out.write_literal('\n')
 
-        for build in self._builds:
-            self._write_build(out, build)
+        self._write_builds(out, self._builds)
+
+        for i in self._fragments:
+            out.write_literal('subninja ')
+            out.write(i, Syntax.input)
+            out.write_literal('\n')
+        if self._fragments:
             out.write_literal('\n')
 
         if self._defaults:
             out.write_literal('default ')
             out.write_each(self._defaults, Syntax.input)
             out.write_literal('\n')
+
+    def write_fragment(self, out, path):
+        bfgfile, builds = self._fragments[path]
+        out = self.writer(out)
+        out.write_literal(_comment_tmpl.format(bfgfile) + '\n\n')
+        self._write_builds(out, builds)
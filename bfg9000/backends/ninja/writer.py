@@ -1,8 +1,11 @@
 import os
+from io import StringIO
 
 from ... import iterutils
 from ... import path
+from ... import profiler
 from ... import shell
+from . import critical_path
 from .syntax import *
 from ...versioning import Version
 
@@ -20,6 +23,7 @@ def version(env=os.environ):
 
 priority = 3
 filepath = path.Path('build.ninja')
+logpath = path.Path('.ninja_log')
 
 _rule_handlers = {}
 _pre_rules = []
@@ -44,21 +48,119 @@ def post_rule(fn):
     return fn
 
 
-def write(env, build_inputs):
+def _fragment_path(build_inputs, module):
+    if module == build_inputs.bfgpath:
+        return None
+    return path.Path(module.parent().suffix).append(filepath.basename())
+
+
+def generate(env, build_inputs):
     buildfile = NinjaFile(build_inputs.bfgpath.string(env.base_dirs),
                           env.supports_destdir)
     buildfile.variable(buildfile.path_vars[path.Root.srcdir], env.srcdir,
                        Section.path)
 
+    # Optionally write the builds from each submodule into a separate file
+    # so that only the files for modules that changed need to be rewritten.
+    subninja = build_inputs['project']['subninja']
+
     for i in _pre_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'pre_rule'):
+            i(build_inputs, buildfile, env)
     for e in build_inputs.edges():
-        _rule_handlers[type(e)](e, build_inputs, buildfile, env)
+        fragment = bfgfile = None
+        if subninja:
+            module = build_inputs.module(e)
+            fragment = _fragment_path(build_inputs, module)
+            bfgfile = module.string(env.base_dirs)
+        with profiler.span(type(e).__name__, 'rule_handler'), \
+             buildfile.fragment(fragment, bfgfile):  # noqa
+            _rule_handlers[type(e)](e, build_inputs, buildfile, env)
     for i in _post_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'post_rule'):
+            i(build_inputs, buildfile, env)
+    return buildfile
+
 
-    with open(filepath.string(env.base_dirs), 'w') as out:
+def _render(buildfile, fragment):
+    out = StringIO()
+    if fragment is None:
         buildfile.write(out)
+    else:
+        buildfile.write_fragment(out, fragment)
+    return out.getvalue()
+
+
+def write(env, build_inputs):
+    buildfile = generate(env, build_inputs)
+
+    # The main file is keyed by `None`, and the fragments by their paths.
+    files = list(buildfile.fragments()) + [None]
+    contents = {i: _render(buildfile, i) for i in files}
+
+    # If we've built before, start the builds on the longest chains first.
+    # Files whose builds are the same as when we last ordered them are left
+    # alone so that new timings don't change the manifest.
+    timings = critical_path.load_log(logpath.string(env.base_dirs))
+    if timings:
+        stale = {}
+        for i in files:
+            digest = critical_path.digest(contents[i])
+            filename = (i or filepath).string(env.base_dirs)
+            if critical_path.read_stamp(filename) == digest:
+                del contents[i]
+            else:
+                stale[i] = digest
+
+        if stale:
+            with profiler.span('critical_path', 'phase'):
+                critical_path.schedule(buildfile, timings)
+            for i, digest in stale.items():
+                contents[i] = critical_path.stamp(_render(buildfile, i),
+                                                  digest)
+
+    fragments_changed = False
+    for i in buildfile.fragments():
+        if i in contents:
+            fragments_changed |= path.write_if_changed(i, contents[i],
+                                                       env.base_dirs)
+
+    # Ninja only reloads its manifest if build.ninja itself changed, so update
+    # its timestamp if any of the fragments changed.
+    changed = None in contents and path.write_if_changed(
+        filepath, contents[None], env.base_dirs
+    )
+    if fragments_changed and not changed:
+        os.utime(filepath.string(env.base_dirs))
+
+
+def _parse_deps(output):
+    result = {}
+    deps = None
+    for line in output.splitlines():
+        if line.startswith(' '):
+            if deps is not None:
+                deps.append(line.strip())
+        elif line:
+            deps = result.setdefault(line.split(': #deps', 1)[0], [])
+    return result
+
+
+def discovered_deps(env, outputs):
+    # Ask Ninja for the dependencies it found during the last build (e.g.
+    # #included headers from depfiles).
+    try:
+        ninja = shell.which(env.getvar('NINJA', ['ninja', 'ninja-build']),
+                            env.variables)
+        output = shell.execute(
+            ninja + ['-C', env.builddir.string(), '-t', 'deps'],
+            stdout=shell.Mode.pipe, stderr=shell.Mode.devnull
+        )
+    except (IOError, OSError, shell.CalledProcessError):
+        return {}
+
+    outputs = set(outputs)
+    return {k: v for k, v in _parse_deps(output).items() if k in outputs}
 
 
 def flags_vars(name, value, buildfile):
@@ -69,7 +171,7 @@ def flags_vars(name, value, buildfile):
 
 def command_build(buildfile, env, output, inputs=None, implicit=None,
                   order_only=None, command=[], console=False, phony=False,
-                  description=None):
+                  restat=False, description=None):
     if phony:
         extra_implicit = ['PHONY']
         if not buildfile.has_build('PHONY'):
@@ -89,6 +191,8 @@ def command_build(buildfile, env, output, inputs=None, implicit=None,
                        **rule_kwargs)
 
     variables = {'cmd': command}
+    if restat:
+        variables['restat'] = '1'
     if description:
         variables['description'] = description
     buildfile.build(
@@ -1,6 +1,13 @@
 import errno
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
 from itertools import chain
 
+from .app_version import version as bfg_version
+from . import profiler
 from .arguments.parser import ArgumentParser
 from .builtins import builtin, init as builtin_init
 from .build_inputs import BuildInputs
@@ -10,6 +17,7 @@ from .tools import init as tools_init
 
 bfgfile = 'build.bfg'
 optsfile = 'options.bfg'
+cachedir = '.bfg_cache'
 
 user_description = """
 These arguments are defined by the options.bfg file in the project's source
@@ -28,13 +36,54 @@ def is_srcdir(path):
     return exists(path.append(bfgfile))
 
 
+def _cache_header(source):
+    # Cached code objects are only valid for the same Python bytecode format,
+    # the same version of bfg9000, and (of course) the same source code.
+    return (importlib.util.MAGIC_NUMBER + bfg_version.encode('utf-8') + b'\0' +
+            hashlib.sha256(source.encode('utf-8')).digest())
+
+
+def _compile_script(source, filename, cache=None):
+    if cache is None:
+        return compile(source, filename, 'exec')
+
+    cachefile = os.path.join(cache, hashlib.sha1(
+        filename.encode('utf-8')
+    ).hexdigest() + '.bfgc')
+    header = _cache_header(source)
+    try:
+        with open(cachefile, 'rb') as f:
+            if f.read(len(header)) == header:
+                return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile(source, filename, 'exec')
+    try:
+        os.makedirs(cache, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=cache)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                marshal.dump(code, f)
+            os.replace(tmpname, cachefile)
+        except Exception:
+            os.remove(tmpname)
+            raise
+    except OSError:
+        pass
+    return code
+
+
 def _execute_script(f, context, path, run_post=False):
     builddir = context.env.builddir.string() if context.env.builddir else None
     filename = path.realize({Root.srcdir: None, Root.builddir: builddir})
+    cache = os.path.join(builddir, cachedir) if builddir else None
 
     with pushd(path.parent().string(context.env.base_dirs)), \
-         context.push_path(path) as p:  # noqa
-        code = compile(f.read(), filename, 'exec')
+         context.push_path(path) as p, \
+         profiler.span(filename, 'script'):  # noqa
+        code = _compile_script(f.read(), filename, cache)
         try:
             exec(code, context.builtins)
         except SystemExit as e:
@@ -91,6 +140,7 @@ def fill_user_help(env, parent):
 
 def configure_build(env):
     builtin_init()
+    tools_init()
     parser, opts_paths = _execute_options(env)
     argv = parser.parse_args(env.extra_args)
 
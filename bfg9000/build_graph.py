@@ -0,0 +1,188 @@
+import json
+import os
+from collections import OrderedDict
+from itertools import chain
+
+from .build_inputs import GraphIndex
+from .file_types import Node
+from .iterutils import iterate, listify, uniques
+from .path import Path, Root, write_if_changed
+from .tools.common import Command
+
+# A snapshot of the configured build graph, saved alongside the environment so
+# that tools can ask questions about the build (e.g. "what depends on this
+# file?") without having to re-run build.bfg. Nodes are stored once in a table
+# and referred to by index everywhere else to keep the file compact.
+
+graphfile = '.bfg_graph'
+version = 1
+
+
+class GraphVersionError(RuntimeError):
+    pass
+
+
+def _arg_str(arg):
+    if isinstance(arg, Node):
+        arg = arg.path
+    if isinstance(arg, Path):
+        return arg.suffix
+    try:
+        return str(arg)
+    except NotImplementedError:
+        return repr(arg)
+
+
+def _command_strs(cmd):
+    # Expand tools (e.g. the interpreter for a script) into the command line
+    # they actually run, just like `Environment.execute` does.
+    cmd = Command.convert_args(listify(cmd), lambda x: x.command)
+    return [_arg_str(i) for i in cmd]
+
+
+def snapshot(build_inputs):
+    nodes = OrderedDict()
+
+    def index(node):
+        key = node.path
+        if key not in nodes:
+            nodes[key] = len(nodes)
+        return nodes[key]
+
+    sources = [index(i) for i in build_inputs.sources()]
+    bootstrap = uniques(nodes[i] for i in chain(build_inputs.bootstrap_paths,
+                                                [build_inputs.bfgpath])
+                        if i in nodes)
+
+    edges = []
+    for i in build_inputs.edges():
+        edges.append({
+            'type': type(i).__name__,
+            'outputs': [index(j) for j in i.output],
+            'inputs': [index(j) for j in i.inputs if isinstance(j, Node)],
+            'options': [repr(j) for j in getattr(i, 'options', None) or []],
+        })
+
+    tests = []
+
+    def add_tests(items, parent=None):
+        for i in items:
+            # Record every file in the command, not just the built ones, so
+            # that changing e.g. a test script or its data affects the test.
+            tests.append({
+                'command': _command_strs(i.cmd),
+                'inputs': [index(j) for j in uniques(chain(
+                    i.inputs, (j for j in iterate(i.cmd)
+                               if isinstance(j, Node))
+                ))],
+                'parent': parent,
+            })
+            add_tests(getattr(i, 'tests', []), len(tests) - 1)
+
+    add_tests(build_inputs['tests'].tests)
+
+    return {
+        'version': version,
+        'nodes': [i.to_json() if isinstance(i, Path) else i for i in nodes],
+        'sources': sources,
+        'bootstrap': bootstrap,
+        'edges': edges,
+        'tests': tests,
+        'test_deps': [index(i) for i in build_inputs['tests'].extra_deps
+                      if isinstance(i, Node)],
+    }
+
+
+def save(build_inputs, env):
+    data = json.dumps(snapshot(build_inputs), separators=(',', ':'))
+    write_if_changed(Path(graphfile), data, env.base_dirs)
+
+
+class BuildGraph:
+    def __init__(self, data):
+        if data.get('version') != version:
+            raise GraphVersionError('build graph version mismatch; please ' +
+                                    're-run bfg9000')
+
+        self.nodes = [Path.from_json(i) if isinstance(i, list) else i
+                      for i in data['nodes']]
+        self.sources = data['sources']
+        self.bootstrap = data['bootstrap']
+        self.edges = data['edges']
+        self.tests = data['tests']
+        self.test_deps = data['test_deps']
+
+        self._index = GraphIndex()
+        for n, edge in enumerate(self.edges):
+            self._index.add_edge(n, edge['outputs'], edge['inputs'])
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, graphfile)) as f:
+            return cls(json.load(f))
+
+    def find(self, name, base_dirs):
+        # Look up a node by its name (e.g. for phony targets) or by its
+        # absolute path.
+        for n, i in enumerate(self.nodes):
+            if isinstance(i, Path):
+                if ( i.root in (Root.srcdir, Root.builddir, Root.absolute) and
+                     os.path.normcase(i.string(base_dirs)) ==
+                     os.path.normcase(name) ):
+                    return n
+            elif i == name:
+                return n
+        return None
+
+    def creator(self, node):
+        n = self._index.creator(node)
+        return None if n is None else self.edges[n]
+
+    def dependents(self, node):
+        # Walk the graph breadth-first so that direct dependents come first.
+        result = OrderedDict()
+        queue = [node]
+        for i in queue:
+            for e in self._index.dependents(i):
+                for j in self.edges[e]['outputs']:
+                    if j not in result:
+                        result[j] = True
+                        queue.append(j)
+        return list(result)
+
+    def _closure(self, nodes):
+        result = set(nodes)
+        for i in nodes:
+            result.update(self.dependents(i))
+        return result
+
+    def covering_tests(self, *nodes):
+        affected = self._closure(nodes)
+        if affected.intersection(self.test_deps):
+            return list(range(len(self.tests)))
+
+        # Test drivers appear before their children, so we can tell if a
+        # child's driver is affected by the time we get to the child.
+        result = OrderedDict()
+        for n, test in enumerate(self.tests):
+            if ( affected.intersection(test['inputs']) or
+                 test['parent'] in result ):
+                result[n] = True
+        return list(result)
+
+    def affected(self, nodes):
+        # Changing any of the bootstrap files (e.g. build.bfg) could change
+        # anything at all, so just treat everything as affected.
+        everything = bool(set(nodes).intersection(self.bootstrap))
+        if everything:
+            nodes = range(len(self.nodes))
+
+        # Only return the final outputs; building those will rebuild anything
+        # else that's affected along the way.
+        affected = self._closure(nodes)
+        targets = [i for i in sorted(affected)
+                   if self._index.creator(i) is not None and
+                   not self._index.has_dependents(i)]
+        if everything:
+            return targets, list(range(len(self.tests)))
+        return targets, self.covering_tests(*affected)
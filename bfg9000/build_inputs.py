@@ -1,4 +1,5 @@
-from collections import OrderedDict
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
 from itertools import chain
 
 from .path import Path, Root
@@ -19,6 +20,11 @@ def build_input(name):
 
 
 class Edge:
+    # Like nodes, there's one edge for nearly every file in the build, so use
+    # `__slots__` to keep them small.
+    __slots__ = ('description', 'raw_output', 'output', 'public_output',
+                 'extra_deps')
+
     def __init__(self, build, output, final_output=None, extra_deps=None,
                  description=None):
         self.description = description
@@ -42,6 +48,45 @@ class Edge:
                            for i in iterate(extra_deps)]
         build.add_edge(self)
 
+    @property
+    def inputs(self):
+        return self.extra_deps
+
+
+class GraphIndex:
+    # Lookups into a build graph, updated as nodes and edges are added so that
+    # finding what creates or depends on a node doesn't need to scan every
+    # edge. `key` maps a node to the value it's looked up by.
+
+    def __init__(self, key=lambda node: node):
+        self._key = key
+        self._nodes = {}
+        self._creators = {}
+        self._dependents = defaultdict(list)
+
+    def add_node(self, node):
+        self._nodes.setdefault(self._key(node), node)
+
+    def add_edge(self, edge, outputs, inputs):
+        for i in outputs:
+            key = self._key(i)
+            self._nodes[key] = i
+            self._creators[key] = edge
+        for i in inputs:
+            self._dependents[self._key(i)].append(edge)
+
+    def node(self, key):
+        return self._nodes.get(key)
+
+    def creator(self, key):
+        return self._creators.get(key)
+
+    def dependents(self, key):
+        return iter(self._dependents.get(key, ()))
+
+    def has_dependents(self, key):
+        return key in self._dependents
+
 
 class BuildInputs:
     def __init__(self, env, bfgpath):
@@ -51,6 +96,17 @@ class BuildInputs:
         self._extra_targets = []
         self._extra_inputs = {}
 
+        # Indexes into the build graph: nodes by path, the edge creating and
+        # the edges consuming each path, and edges by their type (including
+        # base classes).
+        self._index = GraphIndex(lambda node: node.path)
+        self._edge_types = defaultdict(list)
+
+        # The build.bfg file currently being executed, and the file that
+        # created each edge.
+        self._module_stack = []
+        self._edge_modules = {}
+
         self.bfgpath = bfgpath
         self.add_bootstrap(bfgpath)
 
@@ -63,16 +119,46 @@ class BuildInputs:
 
     def add_source(self, source):
         self._sources[source.path] = source
+        self._index.add_node(source)
         return source
 
+    @contextmanager
+    def push_module(self, path):
+        self._module_stack.append(path)
+        try:
+            yield
+        finally:
+            self._module_stack.pop()
+
     def add_edge(self, edge):
         self._edges.append(edge)
+        self._index.add_edge(edge, edge.output, (
+            i for i in edge.inputs if isinstance(i, Node)
+        ))
+        for i in type(edge).__mro__:
+            if issubclass(i, Edge):
+                self._edge_types[i].append(edge)
+        if self._module_stack:
+            self._edge_modules[edge] = self._module_stack[-1]
         return edge
 
     def add_target(self, target):
         self._extra_targets.append(target)
+        self._index.add_node(target)
         return target
 
+    def node(self, path):
+        return self._index.node(path)
+
+    def creator(self, path):
+        return self._index.creator(path)
+
+    def dependents(self, path):
+        return self._index.dependents(path)
+
+    def module(self, edge):
+        return self._edge_modules.get(edge, self.bfgpath)
+
     def sources(self):
         return chain((File(i) for i in self.bootstrap_paths),
                      self._sources.values())
@@ -83,8 +169,10 @@ class BuildInputs:
             self._extra_targets
         )
 
-    def edges(self):
-        return iter(self._edges)
+    def edges(self, kind=None):
+        if kind is None:
+            return iter(self._edges)
+        return iter(self._edge_types.get(kind, ()))
 
     def __getitem__(self, key):
         return self._extra_inputs[key]
@@ -3,6 +3,7 @@ import inspect
 from contextlib import contextmanager
 from itertools import chain
 
+from .. import profiler
 from ..iterutils import iterate, listify
 from ..platforms.basepath import BasePath
 
@@ -27,8 +28,9 @@ class Builtins:
         return builtins
 
     def run_post(self, context):
-        for v in self._post.values():
-            v(context=context)
+        for k, v in self._post.items():
+            with profiler.span(k, 'post'):
+                v(context=context)
 
 
 build = Builtins()
@@ -101,6 +103,11 @@ class BuildContext(StackContext):
         self.argv = argv
         super().__init__(env)
 
+    @contextmanager
+    def push_path(self, path):
+        with super().push_path(path) as p, self.build.push_module(path):
+            yield p
+
 
 class OptionsContext(StackContext):
     kind = 'options'
@@ -142,9 +149,17 @@ class _PartialFunctionBinder(_Binder):
     builtin_bound = 1
 
     def bind(self, context):
-        @functools.wraps(self._fn)
-        def wrapper(*args, **kwargs):
-            return self._fn(context, *args, **kwargs)
+        if profiler.enabled():
+            name = self._fn.__name__
+
+            @functools.wraps(self._fn)
+            def wrapper(*args, **kwargs):
+                with profiler.span(name, 'builtin'):
+                    return self._fn(context, *args, **kwargs)
+        else:
+            @functools.wraps(self._fn)
+            def wrapper(*args, **kwargs):
+                return self._fn(context, *args, **kwargs)
 
         sig = inspect.signature(wrapper)
         params = list(sig.parameters.values())[self.builtin_bound:]
@@ -1,9 +1,13 @@
+from .. import shell
 from ..backends.make import writer as make
 
 
 @make.post_rule
 def make_clean_rule(build_inputs, buildfile, env):
     rm = env.tool('rm')
+    # Split up the list of files to remove so that each command stays within
+    # the OS's command line length limits.
     buildfile.rule(target='clean', recipe=[
-        rm(i.path for i in build_inputs.targets())
+        rm(i.path for i in chunk)
+        for chunk in shell.chunk_files(build_inputs.targets())
     ], phony=True)
@@ -53,6 +53,8 @@ Output = Placeholder('output')
 
 
 class BaseCommand(Edge):
+    __slots__ = ('name', 'files', 'phony', 'cmds', 'env')
+
     def __init__(self, context, name, outputs, *, cmds, files,
                  environment=None, phony=False, extra_deps=None,
                  description=None):
@@ -73,6 +75,10 @@ class BaseCommand(Edge):
                      for line in cmds]
         self.env = environment or {}
 
+    @property
+    def inputs(self):
+        return self.files + self.extra_deps
+
     @staticmethod
     def convert_args(context, kwargs):
         cmd = kwargs.pop('cmd', None)
@@ -98,7 +104,9 @@ class BaseCommand(Edge):
 
 
 class Command(BaseCommand):
+    __slots__ = ()
     console = True
+    restat = False
 
     def __init__(self, context, name, **kwargs):
         super().__init__(context, name, Phony(name), phony=True, **kwargs)
@@ -114,12 +122,14 @@ command.input = Input
 
 
 class BuildStep(BaseCommand):
+    __slots__ = ('restat',)
     console = False
     msbuild_output = True
 
     def __init__(self, context, name, type=None, always_outdated=False,
-                 **kwargs):
+                 restat=False, **kwargs):
         name = listify(name)
+        self.restat = restat
         project_name = name[0]
 
         if not isiterable(type):
@@ -160,7 +170,7 @@ build_step.output = Output
 def make_command(rule, build_inputs, buildfile, env):
     # Join all the commands onto one line so that users can use 'cd' and such.
     make.multitarget_rule(
-        build_inputs, buildfile,
+        build_inputs, buildfile, env,
         targets=rule.output,
         deps=rule.files + rule.extra_deps,
         order_only=(make.directory_deps(rule.output) if
@@ -180,6 +190,7 @@ def ninja_command(rule, build_inputs, buildfile, env):
         command=shell.global_env(rule.env, rule.cmds),
         console=rule.console,
         phony=rule.phony,
+        restat=rule.restat,
         description=rule.description
     )
 
@@ -14,9 +14,14 @@ from ..path import Path
 from ..shell import posix as pshell
 
 build_input('compile_options')(lambda build_inputs, env: defaultdict(list))
+build_input('cxx_modules')(lambda build_inputs, env: None)
+fortran_deps = Path('.bfg_fortran_deps')
+cxx_module_deps = Path('.bfg_cxx_module_deps')
+cxx_module_exts = ('.cppm', '.ixx', '.mpp', '.cxxm', '.c++m')
 
 
 class BaseCompile(Edge):
+    __slots__ = ('file', 'compiler', 'user_options', '_internal_options')
     desc_verb = 'compile'
 
     def __init__(self, context, name, internal_options, directory=None,
@@ -44,6 +49,10 @@ class BaseCompile(Edge):
 
         super().__init__(build, output, public_output, extra_deps, description)
 
+    @property
+    def inputs(self):
+        return [self.file] + self.extra_deps
+
     @property
     def options(self):
         return self._internal_options + self.user_options
@@ -59,6 +68,10 @@ class BaseCompile(Edge):
 
 
 class Compile(BaseCompile):
+    # `pch_source` is set by MSVC for sources that create a PCH.
+    __slots__ = ('includes', 'include_deps', 'packages', 'libs', 'pch',
+                 'pch_source')
+
     def __init__(self, context, name, *, includes, include_deps, pch, libs,
                  packages, options, lang=None, directory=None, extra_deps=None,
                  description=None):
@@ -90,6 +103,10 @@ class Compile(BaseCompile):
         super().__init__(context, name, internal_options, directory,
                          extra_deps, description)
 
+    @property
+    def inputs(self):
+        return super().inputs + self.include_deps
+
     @staticmethod
     def convert_args(context, lang, kwargs):
         def pch(file, **kwargs):
@@ -124,6 +141,8 @@ class Compile(BaseCompile):
 
 
 class CompileSource(Compile):
+    __slots__ = ()
+
     def __init__(self, context, name, file, *, lang=None, **kwargs):
         builder_lang = lang or getattr(file, 'lang', None)
         if builder_lang is None:
@@ -148,8 +167,11 @@ class CompileSource(Compile):
             builder = context.env.builder(guessed_file.lang)
             if hasattr(builder, 'compiler'):
                 # This builder supports compilation; no need to forward to
-                # `generated_source`.
-                file = context['source_file'](file)
+                # `generated_source`. If we already got a source file, use it
+                # instead of making a duplicate node for it.
+                if not isinstance(guessed_file, SourceFile):
+                    guessed_file = context['source_file'](file)
+                file = guessed_file
             else:
                 # Pop off the `directory` argument and pass it to
                 # `generated_source`. This puts the intermediate source file in
@@ -166,6 +188,7 @@ class CompileSource(Compile):
 
 
 class CompileHeader(Compile):
+    __slots__ = ()
     desc_verb = 'compile-header'
 
     def __init__(self, context, name, file, *, source, lang=None, **kwargs):
@@ -189,6 +212,7 @@ class CompileHeader(Compile):
 
 
 class GenerateSource(BaseCompile):
+    __slots__ = ()
     desc_verb = 'generate'
 
     def __init__(self, context, name, file, *, options, lang=None,
@@ -275,6 +299,45 @@ def global_options(context, options, lang):
         ))
 
 
+def _module_compiles(build_inputs, flavor):
+    return [i for i in build_inputs.edges(CompileSource) if
+            getattr(i.compiler, 'module_flavor', None) == flavor]
+
+
+def _fortran_compiles(build_inputs):
+    return _module_compiles(build_inputs, 'fortran')
+
+
+def _fortran_dep_args(edges):
+    return [i.output[0].path + '=' + i.file.path for i in edges]
+
+
+def _cxx_module_compiles(build_inputs):
+    # Scanning for C++ modules means preprocessing every source an extra time,
+    # so only do so if the project has any module interface units.
+    if build_inputs['cxx_modules'] is None:
+        edges = _module_compiles(build_inputs, 'p1689')
+        if not any(i.file.path.ext() in cxx_module_exts for i in edges):
+            edges = []
+        build_inputs['cxx_modules'] = edges
+    return build_inputs['cxx_modules']
+
+
+def _uses_cxx_modules(rule, build_inputs):
+    return ( isinstance(rule, CompileSource) and
+             getattr(rule.compiler, 'module_flavor', None) == 'p1689' and
+             len(_cxx_module_compiles(build_inputs)) > 0 )
+
+
+def _cxx_module_scan_output(rule):
+    return rule.output[0].path.addext('.ddi')
+
+
+def _cxx_module_scan_deps(rule):
+    return ([rule.file] + getattr(rule, 'include_deps', []) +
+            rule.extra_deps)
+
+
 def _get_flags(backend, rule, build_inputs, buildfile):
     variables = {}
     cmd_kwargs = {}
@@ -299,6 +362,9 @@ def _get_flags(backend, rule, build_inputs, buildfile):
 def make_compile(rule, build_inputs, buildfile, env):
     compiler = rule.compiler
     variables, cmd_kwargs = _get_flags(make, rule, build_inputs, buildfile)
+    modules = _uses_cxx_modules(rule, build_inputs)
+    if modules:
+        cmd_kwargs['modules'] = True
 
     output_params = []
     if compiler.num_outputs == 'all':
@@ -340,8 +406,14 @@ def make_compile(rule, build_inputs, buildfile, env):
         build_inputs.add_target(File(depfile))
         buildfile.include(depfile, optional=True)
 
+    if getattr(compiler, 'module_flavor', None) == 'fortran':
+        _make_fortran_deps(build_inputs, buildfile, env)
+    elif modules:
+        _make_cxx_module_scan(rule, variables, cmd_kwargs, build_inputs,
+                              buildfile, env)
+
     make.multitarget_rule(
-        build_inputs, buildfile,
+        build_inputs, buildfile, env,
         targets=rule.output,
         deps=deps + rule.extra_deps,
         order_only=make.directory_deps(rule.output),
@@ -350,10 +422,157 @@ def make_compile(rule, build_inputs, buildfile, env):
     )
 
 
+def _make_fortran_deps(build_inputs, buildfile, env):
+    # Scan all the Fortran sources for the modules they define and use, and
+    # include the resulting dependencies between their objects. Make will
+    # regenerate this file as needed before building anything else.
+    if buildfile.has_rule(fortran_deps.suffix):
+        return
+
+    edges = _fortran_compiles(build_inputs)
+    fortrandep = env.tool('fortrandep')
+    buildfile.rule(
+        target=fortran_deps,
+        deps=[i.file for i in edges],
+        recipe=[fortrandep(_fortran_dep_args(edges), make.qvar('@'),
+                           format='make')]
+    )
+    buildfile.include(fortran_deps, optional=True)
+    build_inputs.add_target(File(fortran_deps))
+
+
+def _make_cxx_module_scan(rule, variables, cmd_kwargs, build_inputs,
+                          buildfile, env):
+    # Scan each C++ source for the modules it provides and requires, and then
+    # collect the results into a file making each object depend on the objects
+    # providing the modules it imports. Like with Fortran, Make will regenerate
+    # this file as needed before building anything else.
+    compiler = rule.compiler
+    recipename = make.var('RULE_{}_SCAN'.format(compiler.rule_name.upper()))
+    if not buildfile.has_variable(recipename):
+        depfixer = env.tool('depfixer')
+        deps = make.qvar('@') + '.d'
+        buildfile.define(recipename, [
+            compiler.scan_modules(make.qvar('<'), make.qvar('@'),
+                                  make.var('1'), deps=deps,
+                                  flags=cmd_kwargs.get('flags')),
+            make.Silent(depfixer(deps)),
+        ])
+
+    scan_output = _cxx_module_scan_output(rule)
+    for i in ('.d', '.ii'):
+        build_inputs.add_target(File(scan_output.addext(i)))
+    build_inputs.add_target(File(scan_output))
+    buildfile.include(scan_output.addext('.d'), optional=True)
+    buildfile.rule(
+        target=scan_output,
+        deps=_cxx_module_scan_deps(rule),
+        order_only=make.directory_deps([scan_output]),
+        recipe=make.Call(recipename, rule.output[0]),
+        variables=variables
+    )
+
+    if not buildfile.has_rule(cxx_module_deps.suffix):
+        scan_outputs = [_cxx_module_scan_output(i)
+                        for i in _cxx_module_compiles(build_inputs)]
+        cxxmoduledep = env.tool('cxxmoduledep')
+        buildfile.rule(
+            target=cxx_module_deps,
+            deps=scan_outputs,
+            recipe=[cxxmoduledep(scan_outputs, make.qvar('@'),
+                                 format='make')]
+        )
+        buildfile.include(cxx_module_deps, optional=True)
+        build_inputs.add_target(File(cxx_module_deps))
+
+
+def _ninja_fortran_dyndep(build_inputs, buildfile, env):
+    # Scan all the Fortran sources for the modules they define and use, and
+    # write a dyndep file telling Ninja which objects produce and consume
+    # each module.
+    if not buildfile.has_rule('fortrandep'):
+        fortrandep = env.tool('fortrandep')
+        rspfile = ninja.var('out') + '.rsp'
+        buildfile.rule(
+            name='fortrandep',
+            command=fortrandep('@' + rspfile, ninja.var('out')),
+            rspfile=rspfile,
+            rspfile_content=ninja.var('files'),
+            description='scan => ' + ninja.var('out')
+        )
+
+        edges = _fortran_compiles(build_inputs)
+        buildfile.build(
+            output=fortran_deps,
+            rule='fortrandep',
+            inputs=[i.file for i in edges],
+            variables={'files': _fortran_dep_args(edges)}
+        )
+    return fortran_deps
+
+
+def _ninja_cxx_module_dyndep(rule, variables, cmd_kwargs, build_inputs,
+                             buildfile, env):
+    # Scan each C++ source for the modules it provides and requires, and then
+    # collect the results into a dyndep file telling Ninja which objects
+    # produce and consume each module interface.
+    compiler = rule.compiler
+    scan_rule = compiler.rule_name + '_scan'
+    if not buildfile.has_rule(scan_rule):
+        depfile = ninja.var('out') + '.d'
+        buildfile.rule(
+            name=scan_rule,
+            command=compiler.scan_modules(
+                ninja.var('in'), ninja.var('out'), ninja.var('target'),
+                deps=depfile, flags=cmd_kwargs.get('flags')
+            ),
+            depfile=depfile,
+            deps='gcc',
+            description='scan => ' + ninja.var('out')
+        )
+
+    scan_variables = dict(variables)
+    scan_variables['target'] = rule.output[0]
+    buildfile.build(
+        output=_cxx_module_scan_output(rule),
+        rule=scan_rule,
+        inputs=[rule.file],
+        implicit=_cxx_module_scan_deps(rule)[1:],
+        variables=scan_variables
+    )
+
+    if not buildfile.has_rule('cxxmoduledep'):
+        cxxmoduledep = env.tool('cxxmoduledep')
+        buildfile.rule(
+            name='cxxmoduledep',
+            command=cxxmoduledep(ninja.var('in'), ninja.var('out')),
+            description='collate => ' + ninja.var('out')
+        )
+
+        edges = _cxx_module_compiles(build_inputs)
+        buildfile.build(
+            output=cxx_module_deps,
+            rule='cxxmoduledep',
+            inputs=[_cxx_module_scan_output(i) for i in edges]
+        )
+    return cxx_module_deps
+
+
 @ninja.rule_handler(CompileSource, CompileHeader, GenerateSource)
 def ninja_compile(rule, build_inputs, buildfile, env):
     compiler = rule.compiler
     variables, cmd_kwargs = _get_flags(ninja, rule, build_inputs, buildfile)
+
+    dyndep = None
+    if ( getattr(compiler, 'module_flavor', None) == 'fortran' and
+         ninja.features.supported('dyndep', env.backend_version) ):
+        dyndep = _ninja_fortran_dyndep(build_inputs, buildfile, env)
+    elif ( _uses_cxx_modules(rule, build_inputs) and
+           ninja.features.supported('dyndep', env.backend_version) ):
+        cmd_kwargs['modules'] = True
+        dyndep = _ninja_cxx_module_dyndep(rule, variables, cmd_kwargs,
+                                          build_inputs, buildfile, env)
+
     if rule.description:
         variables['description'] = rule.description
 
@@ -380,10 +599,19 @@ def ninja_compile(rule, build_inputs, buildfile, env):
             deps = 'msvc'
             cmd_kwargs['deps'] = True
 
+        command = compiler(ninja.var('in'), output_vars, **cmd_kwargs)
+
+        # Code generators often rewrite their outputs even when nothing has
+        # changed, so restore the old timestamps in that case and let Ninja
+        # skip rebuilding anything that depends on them.
+        restat = isinstance(rule, GenerateSource)
+        if restat:
+            command = env.tool('restat')(command, ninja.var('out'))
+
         desc = rule.desc_verb + ' => ' + first(output_vars)
-        buildfile.rule(name=compiler.rule_name, command=compiler(
-            ninja.var('in'), output_vars, **cmd_kwargs
-        ), depfile=depfile, deps=deps, description=desc)
+        buildfile.rule(name=compiler.rule_name, command=command,
+                       depfile=depfile, deps=deps, restat=restat,
+                       description=desc)
 
     inputs = [rule.file]
     implicit_deps = []
@@ -403,6 +631,15 @@ def ninja_compile(rule, build_inputs, buildfile, env):
     # so just use the first output and set up an alias if necessary. Aliases
     # aren't perfect, since the build can get out of sync if you delete the
     # "alias" file, but it's close enough.
+    order_only = []
+    if dyndep:
+        variables['dyndep'] = dyndep
+        order_only.append(dyndep)
+        # Fortran compilers only update module files when their interfaces
+        # change, so there's no need to rebuild their consumers otherwise.
+        if compiler.module_flavor == 'fortran':
+            variables['restat'] = '1'
+
     if compiler.deps_flavor in ('gcc', 'msvc') and len(rule.output) > 1:
         output = rule.output[0]
         buildfile.build(
@@ -418,6 +655,7 @@ def ninja_compile(rule, build_inputs, buildfile, env):
         rule=compiler.rule_name,
         inputs=inputs,
         implicit=implicit_deps + rule.extra_deps,
+        order_only=order_only,
         variables=variables
     )
 
@@ -12,7 +12,8 @@ from ..versioning import SpecifierSet
 
 
 class CopyFile(Edge):
-    __modes = {'copy', 'symlink', 'hardlink'}
+    __slots__ = ('mode', 'copier', 'file')
+    __modes = {'copy', 'reflink', 'symlink', 'hardlink'}
     msbuild_output = True
 
     def __init__(self, context, output, file, *, mode='copy', extra_deps=None,
@@ -25,6 +26,10 @@ class CopyFile(Edge):
         self.file = file
         super().__init__(context.build, output, None, extra_deps, description)
 
+    @property
+    def inputs(self):
+        return [self.file] + self.extra_deps
+
     @staticmethod
     def convert_args(context, name, file, kwargs):
         directory = kwargs.pop('directory', None)
@@ -1,17 +1,22 @@
 from collections import OrderedDict
+from io import StringIO
 
 from . import builtin
+from .. import archiver
 from ..iterutils import iterate
 from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
-from ..path import Path, Root
+from ..path import Path, Root, write_if_changed
 
 _exts = OrderedDict(
     gzip='.tar.gz',
     bzip2='.tar.bz2',
+    xz='.tar.xz',
     zip='.zip',
 )
 
+dist_manifest = '.bfg_dist_manifest'
+
 
 @builtin.function()
 def extra_dist(context, files=None, dirs=None):
@@ -21,24 +26,31 @@ def extra_dist(context, files=None, dirs=None):
         context['directory'](i, include='*')
 
 
-def _dist_command(format, build_inputs, buildfile, env):
+def _write_dist_manifest(build_inputs, env):
     srcdir = Path('.', Root.srcdir)
-    doppel = env.tool('doppel')
+    files = [i.path.relpath(srcdir, localize=False)
+             for i in build_inputs.sources()]
+
+    out = StringIO()
+    archiver.write_manifest(out, files)
+    write_if_changed(Path(dist_manifest), out.getvalue(), env.base_dirs)
 
+
+def _dist_command(format, build_inputs, buildfile, env):
     project = build_inputs['project']
     dstname = project.name
     if project.version:
         dstname += '-' + str(project.version)
 
-    return doppel(
-        'archive', [i.path.relpath(srcdir) for i in build_inputs.sources()],
-        Path(dstname + _exts[format]), directory=srcdir, format=format,
-        dest_prefix=dstname
+    return env.tool('archiver')(
+        Path(dist_manifest), Path(dstname + _exts[format]),
+        directory=Path('.', Root.srcdir), format=format, dest_prefix=dstname
     )
 
 
 @make.post_rule
 def make_dist_rule(build_inputs, buildfile, env):
+    _write_dist_manifest(build_inputs, env)
     for fmt in _exts:
         buildfile.rule(
             target='dist-{}'.format(fmt),
@@ -55,6 +67,7 @@ def make_dist_rule(build_inputs, buildfile, env):
 
 @ninja.post_rule
 def ninja_dist_rule(build_inputs, buildfile, env):
+    _write_dist_manifest(build_inputs, env)
     for fmt in _exts:
         ninja.command_build(
             buildfile, env,
@@ -1,14 +1,14 @@
-import os
 import warnings
 from collections import abc
 from contextlib import contextmanager
+from io import BytesIO, StringIO
 from itertools import chain
 
 from . import builtin
 from ..file_types import *
 from ..iterutils import iterate, listify, uniques
 from ..languages import known_langs
-from ..path import Path, Root
+from ..path import Path, Root, write_if_changed
 
 _kind_to_file_type = {
     'header': HeaderFile,
@@ -36,6 +36,7 @@ class FileList(abc.Sequence):
     def __init__(self, relpath, files):
         self.__files = listify(files, scalar_ok=False)
         self.__relpath = relpath
+        self.__by_source = None
 
     def __getitem__(self, key):
         if isinstance(key, str):
@@ -44,13 +45,23 @@ class FileList(abc.Sequence):
             key = key.path
 
         if isinstance(key, Path):
-            for i in self.__files:
-                if i.creator and i.creator.file.path == key:
-                    return i
-            raise IndexError('{!r} not found'.format(key))
+            try:
+                return self.__source_index()[key]
+            except KeyError:
+                raise IndexError('{!r} not found'.format(key))
         else:
             return self.__files[key]
 
+    def __source_index(self):
+        # Map the path of each file's source to the file itself so that
+        # repeated lookups don't have to scan the whole list.
+        if self.__by_source is None:
+            self.__by_source = {}
+            for i in self.__files:
+                if i.creator:
+                    self.__by_source.setdefault(i.creator.file.path, i)
+        return self.__by_source
+
     def __len__(self):
         return len(self.__files)
 
@@ -73,13 +84,12 @@ def make_file_list(context, fn, files, **kwargs):
 
 
 @contextmanager
-def make_immediate_file(context, file, mode='w', makedirs=True):
-    if makedirs:
-        os.makedirs(file.path.parent().string(context.env.base_dirs),
-                    exist_ok=True)
-
-    with open(file.path.string(context.env.base_dirs), mode) as f:
-        yield f
+def make_immediate_file(context, file, mode='w'):
+    # Only touch the file if its contents changed so that we don't rebuild
+    # everything that depends on it every time we regenerate the build.
+    f = BytesIO() if 'b' in mode else StringIO()
+    yield f
+    write_if_changed(file.path, f.getvalue(), context.env.base_dirs)
     context.build['regenerate'].outputs.append(file)
 
 
@@ -2,6 +2,7 @@ import re
 import warnings
 from enum import Enum
 from functools import reduce
+from io import StringIO
 from itertools import product
 
 from . import builtin
@@ -11,7 +12,8 @@ from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
 from ..backends.make.syntax import Writer, Syntax
 from ..build_inputs import build_input
-from ..path import exists, isdir, Path, Root, walk, uniquetrees
+from ..path import (exists, isdir, Path, Root, walk, uniquetrees,
+                    write_if_changed)
 from ..platforms import known_platforms
 
 build_input('find_dirs')(lambda build_inputs, env: set())
@@ -73,23 +75,28 @@ class FileFilter:
 
 
 def write_depfile(env, path, output, seen_dirs, makeify=False):
-    with open(path.string(env.base_dirs), 'w') as f:
-        # Since this file is in the build dir, we can use relative dirs for
-        # deps also in the build dir.
-        roots = env.base_dirs.copy()
-        roots[Root.builddir] = None
-
-        out = Writer(f, None)
-        out.write(output.string(roots), Syntax.target)
-        out.write_literal(':')
+    # Since this file is in the build dir, we can use relative dirs for deps
+    # also in the build dir.
+    roots = env.base_dirs.copy()
+    roots[Root.builddir] = None
+
+    # Sort the dirs so that the file's contents don't depend on the order we
+    # found them in; otherwise, we'd rewrite it every time.
+    seen_dirs = sorted(i.string(roots) for i in seen_dirs)
+
+    f = StringIO()
+    out = Writer(f, None)
+    out.write(output.string(roots), Syntax.target)
+    out.write_literal(':')
+    for i in seen_dirs:
+        out.write_literal(' ')
+        out.write(i, Syntax.dependency)
+    out.write_literal('\n')
+    if makeify:
         for i in seen_dirs:
-            out.write_literal(' ')
-            out.write(i.string(roots), Syntax.dependency)
-        out.write_literal('\n')
-        if makeify:
-            for i in seen_dirs:
-                out.write(i.string(roots), Syntax.target)
-                out.write_literal(':\n')
+            out.write(i, Syntax.target)
+            out.write_literal(':\n')
+    write_if_changed(path, f.getvalue(), env.base_dirs)
 
 
 def _path_type(path):
@@ -222,7 +229,7 @@ def find_paths(context, *args, **kwargs):
 @make.post_rule
 def make_find_dirs(build_inputs, buildfile, env):
     if build_inputs['find_dirs']:
-        write_depfile(env, Path(depfile_name), make.filepath,
+        write_depfile(env, Path(depfile_name), make.stamppath,
                       build_inputs['find_dirs'], makeify=True)
         buildfile.include(depfile_name)
 
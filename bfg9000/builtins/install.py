@@ -1,27 +1,38 @@
 import warnings
 from collections import OrderedDict
+from io import StringIO
+from itertools import chain
 
 from . import builtin
+from .. import installer
 from .. import path
+from .. import safe_str
 from .. import shell
 from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
 from ..build_inputs import build_input
 from ..file_types import BaseFile, Directory
-from ..iterutils import flatten, iterate, map_iterable, unlistify
+from ..iterutils import flatten, map_iterable, unlistify
+from ..path import InstallRoot, Root
+from ..tools.common import Command
+
+install_plan = '.bfg_install_plan'
+install_manifest = '.bfg_install_manifest'
 
 
 @build_input('install')
 class InstallOutputs:
     def __init__(self, build_inputs, env):
         self.explicit = []
+        self._explicit_set = set()
         self.host = OrderedDict()
         self.target = OrderedDict()
         self.env = env
 
     def add(self, item, directory=None):
-        if item not in self.explicit:
+        if item not in self._explicit_set:
             self.explicit.append(item)
+            self._explicit_set.add(item)
         return self._add_implicit(item, directory)
 
     def _add_implicit(self, item, directory):
@@ -106,59 +117,100 @@ def install(context, *args, directory=None):
     ) for i in args))
 
 
-def _doppel_cmd(env, buildfile):
-    doppel = env.tool('doppel')
-
-    def wrapper(kind):
-        cmd_var = buildfile.cmd_var(doppel)
-        cmd = [cmd_var] + doppel.kind_args(kind)
-
-        basename = cmd_var.name
-        if basename.isupper():
-            kind = kind.upper()
-        name = '{name}_{kind}'.format(name=basename, kind=kind)
-
-        cmd = buildfile.variable(name, cmd, buildfile.Section.command, True)
-        return lambda *args, **kwargs: doppel(*args, cmd=cmd, **kwargs)
-    return wrapper
-
-
-def _install_files(install_outputs, buildfile, env):
-    doppel = _doppel_cmd(env, buildfile)
-
-    def install_line(src, dst):
-        cmd = doppel(src.install_kind)
+def _plan_path(p):
+    return [p.root.name, p.suffix]
+
+
+def _plan_arg(arg):
+    if isinstance(arg, path.BasePath):
+        result = {'path': _plan_path(arg)}
+        if isinstance(arg.root, InstallRoot) and not arg.destdir:
+            result['target'] = True
+        return result
+    elif isinstance(arg, safe_str.jbos):
+        return [_plan_arg(i) for i in arg.bits]
+    elif isinstance(arg, safe_str.literal_types):
+        return arg.string
+    return str(arg)
+
+
+def _post_install(file, install_outputs):
+    return file.post_install(install_outputs) if file.post_install else None
+
+
+def _fixup(src, dst, install_outputs):
+    # Post-install fixups are commands that end with the installed file. The
+    # installer runs them itself (adding the file), but only when it actually
+    # installs the file.
+    cmd = _post_install(src, install_outputs)
+    if not cmd:
+        return None
+
+    *cmd, file = cmd
+    if file != dst:
+        raise ValueError(('post-install command for {!r} must end with ' +
+                          'its installed path').format(src.path))
+    return {
+        'command': [_plan_arg(i) for i in
+                    Command.convert_args(cmd, lambda x: x.command)],
+        'batch': any(getattr(i, 'batch_files', False) for i in cmd
+                     if isinstance(i, Command)),
+    }
+
+
+def _install_plan(install_outputs):
+    def entry(kind, src, dst):
+        result = {'kind': kind, 'src': _plan_path(src.path),
+                  'dst': _plan_path(dst)}
+        fixup = _fixup(src, dst, install_outputs)
+        if fixup:
+            result['fixup'] = fixup
+        return result
+
+    def entries(src, dst):
         if isinstance(src, Directory):
             if src.files is not None:
-                src_paths = [i.path.relpath(src.path) for i in src.files]
-                return cmd('into', src_paths, dst.path, directory=src.path)
+                return [entry(src.install_kind, i,
+                              dst.path.append(i.path.relpath(src.path)))
+                        for i in src.files]
 
             warnings.warn(
                 ('installed directory {!r} has no matching files; did you ' +
                  'forget to set `include`?').format(src.path)
             )
+            return [{'kind': 'directory', 'dst': _plan_path(dst.path)}]
 
-        return cmd('onto', src.path, dst.path)
+        return [entry(src.install_kind, src, dst.path)]
 
-    def post_install(i):
-        return i.post_install(install_outputs) if i.post_install else None
+    return flatten(entries(*i) for i in install_outputs.host.items())
 
-    return ([install_line(*i) for i in install_outputs.host.items()] +
-            list(filter( None, (post_install(i) for i in install_outputs) )))
 
+def _write_install_plan(plan, env):
+    out = StringIO()
+    installer.write_plan(out, plan)
+    path.write_if_changed(path.Path(install_plan), out.getvalue(),
+                          env.base_dirs)
 
-def _uninstall_files(install_outputs, env):
-    def uninstall_line(src, dst):
-        if isinstance(src, Directory):
-            return [dst.path.append(i.path.relpath(src.path)) for i in
-                    iterate(src.files)]
-        return [dst.path]
 
-    if install_outputs:
-        return [env.tool('rm')(flatten(
-            uninstall_line(*i) for i in install_outputs.host.items()
-        ))]
-    return []
+def _install_commands(install_outputs, env):
+    plan = _install_plan(install_outputs)
+    _write_install_plan(plan, env)
+
+    roots = [(i.name, path.Path('', i, destdir=isinstance(i, InstallRoot)))
+             for i in chain([Root.srcdir], InstallRoot)]
+    # Fixups can refer to where files will be on the installed system (e.g.
+    # for rpaths), so pass those along too.
+    target_roots = []
+    if any('fixup' in i for i in plan):
+        target_roots = [(i.name, path.Path('', i, destdir=False))
+                        for i in InstallRoot]
+    tool = env.tool('installer')
+
+    def call(action):
+        return tool(action, path.Path(install_plan),
+                    path.Path(install_manifest), roots, target_roots)
+
+    return [call('install')], [call('uninstall')]
 
 
 def _add_install_paths(buildfile, env):
@@ -177,8 +229,7 @@ def make_install_rule(build_inputs, buildfile, env):
     if not can_install(env) or not install_outputs:
         return
 
-    install_files = _install_files(install_outputs, buildfile, env)
-    uninstall_files = _uninstall_files(install_outputs, env)
+    install_files, uninstall_files = _install_commands(install_outputs, env)
     _add_install_paths(buildfile, env)
 
     buildfile.rule(
@@ -200,8 +251,7 @@ def ninja_install_rule(build_inputs, buildfile, env):
     if not can_install(env) or not install_outputs:
         return
 
-    install_files = _install_files(install_outputs, buildfile, env)
-    uninstall_files = _uninstall_files(install_outputs, env)
+    install_files, uninstall_files = _install_commands(install_outputs, env)
     _add_install_paths(buildfile, env)
 
     ninja.command_build(
@@ -4,7 +4,7 @@ from collections import defaultdict
 from itertools import chain
 
 from . import builtin
-from .. import options as opts
+from .. import options as opts, shell
 from .file_types import static_file
 from .path import relname
 from ..backends.make import writer as make
@@ -16,6 +16,7 @@ from ..iterutils import first, flatten, iterate, listify, slice_dict, uniques
 from ..languages import known_formats
 from ..objutils import convert_each, convert_one
 from ..platforms import known_native_object_formats
+from ..safe_str import literal, safe_str
 from ..shell import posix as pshell
 
 build_input('link_options')(lambda build_inputs, env: {
@@ -24,6 +25,11 @@ build_input('link_options')(lambda build_inputs, env: {
 
 
 class Link(Edge):
+    # `manifest` is set by JVM linkers.
+    __slots__ = ('name', 'user_libs', 'libs', 'user_packages', 'packages',
+                 'user_files', 'files', 'user_options', 'format',
+                 'input_langs', 'langs', 'linker', '_internal_options',
+                 'manifest')
     msbuild_output = True
     extra_kwargs = ()
 
@@ -93,6 +99,10 @@ class Link(Edge):
         super().__init__(build, output, public_output, extra_deps, description)
         build['defaults'].add(self.public_output)
 
+    @property
+    def inputs(self):
+        return self.files + self.libs + self.extra_deps
+
     @classmethod
     def convert_args(cls, context, name, files, kwargs):
         lang = kwargs.get('lang')
@@ -148,6 +158,7 @@ class Link(Edge):
 
 
 class DynamicLink(Link):
+    __slots__ = ('entry_point', 'module_defs')
     desc_verb = 'link'
     base_mode = 'dynamic'
     mode = 'executable'
@@ -204,6 +215,7 @@ class DynamicLink(Link):
 
 
 class SharedLink(DynamicLink):
+    __slots__ = ('version', 'soversion')
     desc_verb = 'shared-link'
     mode = 'shared_library'
     msbuild_mode = 'DynamicLibrary'
@@ -220,6 +232,7 @@ class SharedLink(DynamicLink):
 
 
 class StaticLink(Link):
+    __slots__ = ('user_static_options',)
     desc_verb = 'static-link'
     base_mode = 'static'
     mode = 'static_library'
@@ -440,6 +453,14 @@ def _get_flags(backend, rule, build_inputs, buildfile):
     return variables, cmd_kwargs
 
 
+def _rspfile_arg(linker, files, rspfile):
+    # Pass long lists of input files via a response file (if the linker
+    # supports them) so that we don't exceed any command line length limits.
+    if shell.files_length(files) <= shell.max_files_length:
+        return None
+    return linker.rspfile_arg(rspfile)
+
+
 @make.rule_handler(StaticLink, DynamicLink, SharedLink)
 def make_link(rule, build_inputs, buildfile, env):
     linker = rule.linker
@@ -455,11 +476,37 @@ def make_link(rule, build_inputs, buildfile, env):
             output_vars.append(v)
             output_params.append(rule.output[i])
 
-    recipename = make.var('RULE_{}'.format(linker.rule_name.upper()))
-    if not buildfile.has_variable(recipename):
-        buildfile.define(recipename, [linker(
-            make.var('1'), output_vars, **cmd_kwargs
-        )])
+    rsparg = None
+    if make.features.supported('file_function', env.backend_version):
+        # Pass the response file's name as the last argument so that it's
+        # the same no matter which output triggered the recipe.
+        rspnum = str(len(output_params) + 2)
+        rsparg = _rspfile_arg(linker, rule.files,
+                              safe_str(make.qvar(rspnum)))
+
+    if rsparg:
+        # Write the inputs to the response file when expanding the recipe,
+        # since they'd be too long to pass to a shell command.
+        recipename = make.var('RULE_{}_RSP'.format(linker.rule_name.upper()))
+        if not buildfile.has_variable(recipename):
+            buildfile.define(recipename, [
+                make.Function('file', literal('>') + make.var(rspnum),
+                              make.var('1')),
+                linker(rsparg, output_vars, **cmd_kwargs),
+                make.Silent(env.tool('rm')(make.qvar(rspnum))),
+            ])
+
+        # If the link fails, the response file is left behind, so make sure
+        # `make clean` removes it.
+        rspfile = first(rule.output).path.addext('.rsp')
+        build_inputs.add_target(File(rspfile))
+        output_params.append(rspfile)
+    else:
+        recipename = make.var('RULE_{}'.format(linker.rule_name.upper()))
+        if not buildfile.has_variable(recipename):
+            buildfile.define(recipename, [linker(
+                make.var('1'), output_vars, **cmd_kwargs
+            )])
 
     files = rule.files
     if hasattr(linker, 'transform_input'):
@@ -469,7 +516,7 @@ def make_link(rule, build_inputs, buildfile, env):
     module_defs = listify(getattr(rule, 'module_defs', None))
     manifest = listify(getattr(rule, 'manifest', None))
     make.multitarget_rule(
-        build_inputs, buildfile,
+        build_inputs, buildfile, env,
         targets=rule.output,
         deps=(rule.files + rule.libs + package_build_deps + module_defs +
               manifest + rule.extra_deps),
@@ -504,17 +551,29 @@ def ninja_link(rule, build_inputs, buildfile, env):
     else:
         input_var = ninja.var('in')
 
-    if not buildfile.has_rule(linker.rule_name):
-        buildfile.rule(name=linker.rule_name, command=linker(
-            input_var, output_vars, **cmd_kwargs
-        ), description=rule.desc_verb + ' => ' + first(output_vars))
+    description = rule.desc_verb + ' => ' + first(output_vars)
+    rspfile = first(output_vars) + '.rsp'
+    rsparg = _rspfile_arg(linker, rule.files, rspfile)
+    if rsparg:
+        rule_name = linker.rule_name + '_rsp'
+        if not buildfile.has_rule(rule_name):
+            buildfile.rule(name=rule_name, command=linker(
+                rsparg, output_vars, **cmd_kwargs
+            ), description=description, rspfile=rspfile,
+                rspfile_content=input_var)
+    else:
+        rule_name = linker.rule_name
+        if not buildfile.has_rule(rule_name):
+            buildfile.rule(name=rule_name, command=linker(
+                input_var, output_vars, **cmd_kwargs
+            ), description=description)
 
     package_build_deps = flatten(i.deps for i in rule.packages)
     module_defs = listify(getattr(rule, 'module_defs', None))
     manifest = listify(getattr(rule, 'manifest', None))
     buildfile.build(
         output=rule.output,
-        rule=linker.rule_name,
+        rule=rule_name,
         inputs=rule.files,
         implicit=(rule.libs + package_build_deps + module_defs + manifest +
                   rule.extra_deps),
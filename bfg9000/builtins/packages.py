@@ -4,6 +4,7 @@ import re
 from . import builtin
 from .find import find
 from .. import options as opts
+from .. import probes
 from ..exceptions import PackageResolutionError, PackageVersionError
 from ..file_types import Directory, Executable
 from ..iterutils import default_sentinel, iterate, uniques
@@ -39,9 +40,10 @@ def package(context, name, version=None, *, lang=default_sentinel,
         else:
             lang = context.build['project']['lang']
 
-    return context.env.builder(lang).packages.resolve(
-        name, version, kind, headers, libs
-    )
+    with probes.caller('package {!r}'.format(name)):
+        return context.env.builder(lang).packages.resolve(
+            name, version, kind, headers, libs
+        )
 
 
 @builtin.function()
@@ -12,6 +12,8 @@ class ProjectInfo:
             'intermediate_dirs': True,
             'lang': 'c',
             'find_exclude': ['.*#', '*~', '#*#'],
+            'subninja': False,
+            'pattern_rules': False,
         }
 
     def __getitem__(self, key):
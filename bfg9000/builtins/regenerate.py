@@ -16,12 +16,20 @@ class Regenerate:
 def make_regenerate_rule(build_inputs, buildfile, env):
     bfg9000 = env.tool('bfg9000')
 
-    make.multitarget_rule(
-        build_inputs, buildfile,
-        targets=[Path('Makefile')] + build_inputs['regenerate'].outputs,
+    # Regenerating the build only rewrites files whose contents changed, so
+    # the Makefile can stay older than build.bfg. Instead, compare against the
+    # stamp file (touched on every regeneration), and give the Makefile and
+    # our other outputs a no-op recipe so that Make only restarts when the
+    # Makefile was actually rewritten.
+    buildfile.rule(
+        target=make.stamppath,
         deps=build_inputs.bootstrap_paths + listify(env.toolchain.path),
-        recipe=[bfg9000(Path('.'))],
-        clean_stamp=False
+        recipe=[bfg9000(Path('.'))]
+    )
+    buildfile.rule(
+        target=[make.filepath] + build_inputs['regenerate'].outputs,
+        deps=[make.stamppath],
+        recipe=[make.Silent([':'])]
     )
 
 
@@ -36,6 +44,7 @@ def ninja_regenerate_rule(build_inputs, buildfile, env):
         name='regenerate',
         command=bfg9000(Path('.')),
         generator=True,
+        restat=True,
         depfile=build_inputs['regenerate'].depfile,
         **rule_kwargs
     )
@@ -0,0 +1,78 @@
+import json
+from collections import OrderedDict
+
+from .app_version import version
+from .arguments import parser as argparse
+from .fortrandep import ScanResult, formats, write_make, write_ninja
+
+# Collect the P1689 dependency files produced by scanning a set of C++ sources
+# and write a file telling the build which objects need to be built before
+# others, in the same format as `bfg9000-fortrandep`. Each logical module name
+# is mapped to the path of its compiled module interface (using GCC's default
+# `gcm.cache/` layout unless the scanner tells us otherwise). Only modules
+# provided by one of the scanned sources are considered, since any others
+# (e.g. header units or the standard library modules) aren't built by us.
+
+
+def bmi_path(entry):
+    if 'compiled-module-path' in entry:
+        return entry['compiled-module-path']
+    # GCC names partitions like `foo:bar` as `foo-bar.gcm`.
+    return 'gcm.cache/{}.gcm'.format(entry['logical-name'].replace(':', '-'))
+
+
+def read(f):
+    data = json.load(f)
+    results = OrderedDict()
+    for rule in data.get('rules', []):
+        result = ScanResult(
+            [bmi_path(i) for i in rule.get('provides', [])],
+            [bmi_path(i) for i in rule.get('requires', [])]
+        )
+        results[rule['primary-output']] = result
+    return results
+
+
+def read_files(files):
+    results = OrderedDict()
+    for i in files:
+        with open(i) as f:
+            results.update(read(f))
+
+    # Only keep the requirements we actually know how to build.
+    providers = {}
+    for obj, result in results.items():
+        for i in result.provides:
+            providers[i] = obj
+    for result in results.values():
+        result.requires = [i for i in result.requires if i in providers]
+    return results, providers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='bfg9000-cxxmoduledep',
+        usage='%(prog)s [-f FORMAT] -o OUTPUT FILE...',
+        description='Collect the P1689 dependency files for a set of C++ ' +
+                    'sources, and write the dependencies between their ' +
+                    'objects.'
+    )
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + version)
+    parser.add_argument('-f', '--format', choices=formats, default='ninja',
+                        help='the format to write (default: %(default)s)')
+    parser.add_argument('-o', '--output', required=True, metavar='FILE',
+                        help='the file to write (required)')
+    parser.add_argument('files', nargs='*', metavar='FILE',
+                        help='a P1689 dependency file')
+    args = parser.parse_args()
+
+    try:
+        results, providers = read_files(args.files)
+        with open(args.output, 'w') as out:
+            if args.format == 'ninja':
+                write_ninja(out, results)
+            else:
+                write_make(out, results, providers)
+    except (OSError, ValueError, KeyError) as e:
+        parser.exit(1, '{}: error: {}\n'.format(parser.prog, e))
@@ -61,8 +61,9 @@ def tokenize(s):
             yield (Token.char, c)
 
 
-def emit_deps(instream, outstream):
+def iter_deps(instream):
     state = State.target
+    dep = []
 
     for tok, value in tokenize(instream.read()):
         if state == State.target:
@@ -81,19 +82,19 @@ def emit_deps(instream, outstream):
                 raise UnexpectedTokenError(tok)
         elif state == State.dep:
             if tok == Token.char:
-                outstream.write(value)
+                dep.append(value)
             elif tok == Token.space:
-                outstream.write(':\n')
+                yield ''.join(dep)
                 state = State.between_deps
             elif tok == Token.newline:
-                outstream.write(':\n')
+                yield ''.join(dep)
                 state = State.target
             else:
                 raise UnexpectedTokenError(tok)
         else:  # state == State.between_deps
             if tok == Token.char:
                 state = State.dep
-                outstream.write(value)
+                dep = [value]
             elif tok == Token.newline:
                 state = State.target
             elif tok != Token.space:
@@ -103,6 +104,11 @@ def emit_deps(instream, outstream):
         raise ParseError('unexpected end of file')
 
 
+def emit_deps(instream, outstream):
+    for i in iter_deps(instream):
+        outstream.write(i + ':\n')
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog='bfg9000-depfixer',
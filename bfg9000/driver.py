@@ -1,17 +1,26 @@
 import os
 import sys
+from contextlib import contextmanager
 
 from . import build
+from . import build_graph
 from . import log
+from . import objutils
 from . import path
+from . import probes
+from . import profiler
 from .arguments import parser as argparse
-from .backends import list_backends
+from .backends import (BackendNames, backend_version, default_backend,
+                       get_backend)
+from .backends.ninja import critical_path
 from .environment import Environment, EnvVersionError
 from .platforms.target import platform_info
 from .app_version import version
 
 logger = log.getLogger(__name__)
 
+memoize_cachefile = 'memoize.json'
+
 description = """
 bfg9000 ("build file generator") is a cross-platform build configuration system
 with an emphasis on making it easy to define how to build your software. It
@@ -37,6 +46,28 @@ is run automatically if bfg9000 determines that the build files are out of
 date.
 """
 
+analyze_desc = """
+Report the critical path through the build (the longest chain of build steps
+that each depend on the last) and how much parallelism the build can achieve,
+using the build graph saved when the build files were generated and the
+timings recorded by the last build. This requires the Ninja backend.
+"""
+
+query_desc = """
+Answer questions about the build graph saved by the last time the build files
+were generated, without re-running build.bfg. QUERY is one of `creator` (show
+the step that builds each FILE), `dependents` (list everything built from each
+FILE), or `tests` (list the tests that depend on each FILE).
+"""
+
+affected_desc = """
+List the targets that need to be rebuilt (or with `--tests`, the tests that
+need to be run) after changing each FILE, using the build graph saved by the
+last time the build files were generated. Changes to headers are detected via
+the dependencies recorded by the last build. If FILE is `-`, read the list of
+changed files from standard input.
+"""
+
 env_desc = """
 Print the environment variables stored by this build configuration.
 """
@@ -56,15 +87,67 @@ def handle_reload_exception(e, suggest_rerun=False):
     return e.code if isinstance(e, build.ScriptExitError) else 1
 
 
+@contextmanager
+def profile_to(filename):
+    if filename is None:
+        yield
+        return
+
+    p = profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        with open(filename.string(), 'w') as out:
+            p.write(out)
+
+
+@contextmanager
+def explain_probes(args):
+    probes.reset()
+    try:
+        yield
+    finally:
+        if args.explain_probes:
+            logger.info('\n'.join(probes.summarize(verbose=True)))
+        elif args.debug:
+            logger.debug('\n'.join(probes.summarize()))
+        if args.debug:
+            logger.debug('\n'.join(objutils.summarize_caches()))
+
+
+def configure_and_write(env, backend):
+    cachefile = os.path.join(env.builddir.string(), build.cachedir,
+                             memoize_cachefile)
+    with objutils.persistent_caches(cachefile):
+        with profiler.span('configure_build', 'phase'):
+            build_inputs = build.configure_build(env)
+        with profiler.span('write', 'phase'):
+            backend.write(env, build_inputs)
+            build_graph.save(build_inputs, env)
+
+
+def add_diagnostic_args(parser):
+    parser.add_argument('--profile', metavar='FILE', type=argparse.File(),
+                        help=('write a Chrome trace of the configuration ' +
+                              'process to FILE'))
+    parser.add_argument('--explain-probes', action='store_true',
+                        help=('show every subprocess and path lookup run ' +
+                              'while configuring'))
+
+
 def environment_from_args(args):
     # Get the bin directory holding bfg's executables.
     bfgdir = path.abspath(sys.argv[0]).parent()
 
-    backend = list_backends()[args.backend]
+    # Only probe the version of the backend we're actually going to use.
+    if args.backend is None:
+        args.backend = default_backend()
+    backend = get_backend(args.backend)
     env = Environment(
         bfgdir=bfgdir,
         backend=args.backend,
-        backend_version=backend.version(),
+        backend_version=backend_version(args.backend),
         srcdir=args.srcdir,
         builddir=args.builddir,
     )
@@ -134,17 +217,15 @@ def add_generic_args(parser):
 
 
 def add_configure_args(parser):
-    backends = list_backends()
-
     parser.add_argument('-h', '--help', action=ConfigureHelp,
                         help='show this help message and exit')
+    add_diagnostic_args(parser)
 
     build = parser.add_argument_group('build arguments')
     build.add_argument('--backend', metavar='BACKEND',
-                       choices=list(backends.keys()),
-                       default=list(backends.keys())[0],
+                       choices=BackendNames(),
                        help=('build backend (one of %(choices)s; default: ' +
-                             '%(default)s)'))
+                             'the first one installed)'))
     build.add_argument('--toolchain', metavar='FILE',
                        type=argparse.File(must_exist=True),
                        help=('a file defining the toolchain to use for this ' +
@@ -187,14 +268,14 @@ def configure(parser, subparser, args, extra):
     os.makedirs(args.builddir.string(), exist_ok=True)
 
     try:
-        env, backend = environment_from_args(args)
-        if args.toolchain:
-            build.load_toolchain(env, args.toolchain)
-        finalize_environment(env, args, extra)
-        env.save(args.builddir.string())
-
-        build_inputs = build.configure_build(env)
-        backend.write(env, build_inputs)
+        with profile_to(args.profile), explain_probes(args):
+            env, backend = environment_from_args(args)
+            if args.toolchain:
+                build.load_toolchain(env, args.toolchain)
+            finalize_environment(env, args, extra)
+            env.save(args.builddir.string())
+
+            configure_and_write(env, backend)
     except Exception as e:
         logger.exception(e)
         return e.code if isinstance(e, build.ScriptExitError) else 1
@@ -209,18 +290,170 @@ def refresh(parser, subparser, args, extra):
                         .format(build.bfgfile))
 
     try:
-        env = Environment.load(args.builddir.string())
-        if env.toolchain.path:
-            build.load_toolchain(env, env.toolchain.path, reload=True)
-        env.save(args.builddir.string())
+        with profile_to(args.profile), explain_probes(args):
+            env = Environment.load(args.builddir.string())
+            if env.toolchain.path:
+                build.load_toolchain(env, env.toolchain.path, reload=True)
+            env.save(args.builddir.string())
 
-        backend = list_backends()[env.backend]
-        build_inputs = build.configure_build(env)
-        backend.write(env, build_inputs)
+            configure_and_write(env, get_backend(env.backend))
     except Exception as e:
         return handle_reload_exception(e, suggest_rerun=True)
 
 
+def analyze(parser, subparser, args, extra):
+    if extra:
+        subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
+
+    if build.is_srcdir(args.builddir):
+        subparser.error('build directory must not contain a {} file'
+                        .format(build.bfgfile))
+
+    try:
+        env = Environment.load(args.builddir.string())
+        if env.backend != 'ninja':
+            subparser.error('analyze requires the ninja backend')
+
+        backend = get_backend(env.backend)
+        timings = critical_path.load_log(
+            backend.logpath.string(env.base_dirs)
+        )
+        if not timings:
+            logger.error('no build timings found; run a build first')
+            return 1
+
+        graph = build_graph.BuildGraph.load(args.builddir.string())
+    except Exception as e:
+        return handle_reload_exception(e)
+
+    report = critical_path.analyze(critical_path.graph_builds(graph), timings)
+    print('critical path: {:.2f}s ({} steps)'.format(report.length,
+                                                     len(report.path)))
+    for name, duration in report.path:
+        print('  {:8.2f}s  {}'.format(duration, name))
+    print('total time: {:.2f}s'.format(report.total))
+    print('achievable parallelism: {:.2f}'.format(
+        report.total / report.length if report.length else 1
+    ))
+
+
+def _find_node(graph, env, name):
+    # Look for the file relative to the current directory first, and then
+    # relative to the build directory.
+    for i in (os.path.abspath(name),
+              os.path.join(env.builddir.string(), name)):
+        node = graph.find(os.path.normpath(i), env.base_dirs)
+        if node is not None:
+            return node
+    return graph.find(name, env.base_dirs)
+
+
+def query(parser, subparser, args, extra):
+    if extra:
+        subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
+
+    try:
+        env = Environment.load(args.builddir.string())
+        graph = build_graph.BuildGraph.load(args.builddir.string())
+    except Exception as e:
+        return handle_reload_exception(e)
+
+    def node_str(node):
+        node = graph.nodes[node]
+        if isinstance(node, path.Path):
+            return os.path.relpath(node.string(env.base_dirs))
+        return node
+
+    result = 0
+    for name in args.files:
+        node = _find_node(graph, env, name)
+        if node is None:
+            logger.error('{!r} is not in the build graph'.format(name))
+            result = 1
+            continue
+
+        if args.query == 'creator':
+            edge = graph.creator(node)
+            if edge is None:
+                print('{}: (source)'.format(name))
+                continue
+            print('{}: {} {}'.format(
+                name, edge['type'],
+                ' '.join(node_str(i) for i in edge['inputs'])
+            ))
+            for i in edge['options']:
+                print('  ' + i)
+        elif args.query == 'dependents':
+            for i in graph.dependents(node):
+                print(node_str(i))
+        else:
+            for i in graph.covering_tests(node):
+                print(' '.join(graph.tests[i]['command']))
+    return result
+
+
+def affected(parser, subparser, args, extra):
+    if extra:
+        subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
+
+    try:
+        env = Environment.load(args.builddir.string())
+        graph = build_graph.BuildGraph.load(args.builddir.string())
+    except Exception as e:
+        return handle_reload_exception(e)
+
+    files = []
+    for i in args.files:
+        if i == '-':
+            files.extend(j.strip() for j in sys.stdin if j.strip())
+        else:
+            files.append(i)
+
+    # Files are usually listed relative to the root of the repository (e.g.
+    # from `git diff --name-only`), so try the source directory too. Anything
+    # we can't find isn't part of the build, so changing it affects nothing.
+    srcdir = env.srcdir.string()
+    nodes = []
+    for name in files:
+        node = _find_node(graph, env, name)
+        if node is None:
+            node = graph.find(os.path.normpath(os.path.join(srcdir, name)),
+                              env.base_dirs)
+        if node is not None:
+            nodes.append(node)
+
+    # Headers and the like aren't in the build graph unless they were listed
+    # explicitly, so check the dependencies the last build discovered.
+    discovered_deps = getattr(get_backend(env.backend), 'discovered_deps',
+                              None)
+    if discovered_deps:
+        builddir = env.builddir.string()
+        changed = {os.path.normcase(os.path.normpath(os.path.abspath(i)))
+                   for i in files}
+        changed.update(os.path.normcase(os.path.normpath(
+            os.path.join(srcdir, i)
+        )) for i in files)
+
+        outputs = {}
+        for n, i in enumerate(graph.nodes):
+            if isinstance(i, path.Path) and i.root == path.Root.builddir:
+                outputs[i.suffix] = n
+        for output, deps in discovered_deps(env, outputs).items():
+            if any(os.path.normcase(os.path.normpath(
+                    os.path.join(builddir, j)
+                   )) in changed for j in deps):
+                nodes.append(outputs[output])
+
+    targets, tests = graph.affected(nodes)
+    if args.tests:
+        for i in tests:
+            print(' '.join(graph.tests[i]['command']))
+    else:
+        for i in targets:
+            node = graph.nodes[i]
+            print(node.suffix if isinstance(node, path.Path) else node)
+
+
 def env(parser, subparser, args, extra):
     if extra:
         subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
@@ -285,11 +518,49 @@ def main():
         'refresh', description=refresh_desc, help='regenerate build files'
     )
     refresh_p.set_defaults(func=refresh, parser=refresh_p)
+    add_diagnostic_args(refresh_p)
     refresh_p.add_argument('builddir',
                            type=argparse.Directory(must_exist=True),
                            metavar='BUILDDIR', nargs='?', default='.',
                            help='build directory')
 
+    analyze_p = subparsers.add_parser(
+        'analyze', description=analyze_desc,
+        help='report the critical path through the build'
+    )
+    analyze_p.set_defaults(func=analyze, parser=analyze_p)
+    analyze_p.add_argument('builddir',
+                           type=argparse.Directory(must_exist=True),
+                           metavar='BUILDDIR', nargs='?', default='.',
+                           help='build directory')
+
+    query_p = subparsers.add_parser(
+        'query', description=query_desc, help='query the build graph'
+    )
+    query_p.set_defaults(func=query, parser=query_p)
+    query_p.add_argument('-C', '--builddir',
+                         type=argparse.Directory(must_exist=True),
+                         metavar='BUILDDIR', default='.',
+                         help='build directory (default: %(default)s)')
+    query_p.add_argument('query', choices=['creator', 'dependents', 'tests'],
+                         metavar='QUERY', help='the query to run')
+    query_p.add_argument('files', nargs='+', metavar='FILE',
+                         help='the files to query')
+
+    affected_p = subparsers.add_parser(
+        'affected', description=affected_desc,
+        help='list targets and tests affected by changed files'
+    )
+    affected_p.set_defaults(func=affected, parser=affected_p)
+    affected_p.add_argument('-C', '--builddir',
+                            type=argparse.Directory(must_exist=True),
+                            metavar='BUILDDIR', default='.',
+                            help='build directory (default: %(default)s)')
+    affected_p.add_argument('--tests', action='store_true',
+                            help='list affected tests instead of targets')
+    affected_p.add_argument('files', nargs='+', metavar='FILE',
+                            help='the changed files')
+
     env_p = subparsers.add_parser(
         'env', description=env_desc, help='print environment'
     )
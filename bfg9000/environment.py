@@ -4,12 +4,13 @@ import platform
 from collections import namedtuple
 
 from . import platforms
+from . import probes
 from . import tools
 from . import shell
-from .backends import list_backends
+from .backends import backend_version
 from .file_types import Executable, Node
 from .iterutils import first, isiterable, listify
-from .path import abspath, InstallRoot, Path, Root
+from .path import abspath, DirectoryIndex, InstallRoot, Path, Root
 from .tools.common import Command
 from .versioning import Version
 
@@ -68,9 +69,9 @@ class Environment:
 
     def __new__(cls, *args, **kwargs):
         env = object.__new__(cls)
-        tools.init()
         env.__builders = {}
         env.__tools = {}
+        env.dir_index = DirectoryIndex()
         return env
 
     def __init__(self, bfgdir, backend, backend_version, srcdir, builddir):
@@ -134,12 +135,14 @@ class Environment:
 
     def builder(self, lang):
         if lang not in self.__builders:
-            self.__builders[lang] = tools.get_builder(self, lang)
+            with probes.caller('builder {!r}'.format(lang)):
+                self.__builders[lang] = tools.get_builder(self, lang)
         return self.__builders[lang]
 
     def tool(self, name):
         if name not in self.__tools:
-            self.__tools[name] = tools.get_tool(self, name)
+            with probes.caller('tool {!r}'.format(name)):
+                self.__tools[name] = tools.get_tool(self, name)
         return self.__tools[name]
 
     def _runner(self, lang):
@@ -235,8 +238,7 @@ class Environment:
         # v6 adds persistence for the backend's version and converts bfgpath to
         # a Path object internally.
         if version < 6:
-            backend = list_backends()[data['backend']]
-            data['backend_version'] = str(backend.version())
+            data['backend_version'] = str(backend_version(data['backend']))
             data['bfgpath'] = Path(data['bfgpath']).to_json()
 
         # v7 replaces bfgpath with bfgdir.
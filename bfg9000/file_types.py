@@ -1,5 +1,6 @@
 from . import safe_str as _safe_str
 from .iterutils import listify as _listify
+from .objutils import instance_vars as _instance_vars
 from .path import InstallRoot as _InstallRoot
 
 
@@ -14,12 +15,17 @@ def _clone_traits(exclude=set(), subfiles={}):
     return inner
 
 
+# Large projects can have hundreds of thousands of nodes, so these classes use
+# `__slots__` to keep them small. Subclasses should declare `__slots__` too
+# (even if it's empty), or they'll get a `__dict__` anyway.
+
 class Node(_safe_str.safe_string_ops):
-    private = False
+    __slots__ = ('creator', 'path', 'private')
 
     def __init__(self, path):
         self.creator = None
         self.path = path
+        self.private = False
 
     def _safe_str(self):
         return _safe_str.safe_str(self.path)
@@ -44,15 +50,16 @@ class Node(_safe_str.safe_string_ops):
 
 
 class Phony(Node):
-    pass
+    __slots__ = ()
 
 
 class BaseFile:
-    pass
+    __slots__ = ()
 
 
 class FileOrDirectory(Node, BaseFile):
-    _clone_exclude = {'path', 'creator', 'post_install'}
+    __slots__ = ('post_install',)
+    _clone_exclude = {'path', 'creator', 'private', 'post_install'}
     _clone_subfiles = {}
 
     install_kind = 'data'
@@ -68,7 +75,7 @@ class FileOrDirectory(Node, BaseFile):
 
     def _clone_args(self, pathfn, recursive):
         args = {'path': pathfn(self)}
-        for k, v in self.__dict__.items():
+        for k, v in _instance_vars(self).items():
             if k in self._clone_exclude:
                 continue
             try:
@@ -95,6 +102,8 @@ class FileOrDirectory(Node, BaseFile):
 
 
 class File(FileOrDirectory):
+    __slots__ = ()
+
     def __init__(self, path):
         if path.directory:
             raise ValueError('expected a non-directory')
@@ -103,6 +112,8 @@ class File(FileOrDirectory):
 
 @_clone_traits(exclude={'files'})
 class Directory(FileOrDirectory):
+    __slots__ = ('files',)
+
     def __init__(self, path, files=None):
         super().__init__(path.as_directory())
         self.files = files
@@ -119,25 +130,31 @@ class Directory(FileOrDirectory):
 
 
 class CodeFile(File):
+    __slots__ = ('lang',)
+
     def __init__(self, path, lang):
         super().__init__(path)
         self.lang = lang
 
 
 class SourceFile(CodeFile):
-    pass
+    __slots__ = ()
 
 
 class HeaderFile(CodeFile):
+    __slots__ = ()
     install_root = _InstallRoot.includedir
 
 
 class PrecompiledHeader(HeaderFile):
+    __slots__ = ()
     install_root = None
 
 
 @_clone_traits(subfiles={'object_file': 'object_path'})
 class MsvcPrecompiledHeader(PrecompiledHeader):
+    __slots__ = ('object_file', 'header_name')
+
     def __init__(self, path, object_path, header_name, format, lang):
         super().__init__(path, lang)
         self.object_file = ObjectFile(object_path, format, self.lang)
@@ -151,6 +168,7 @@ class MsvcPrecompiledHeader(PrecompiledHeader):
 
 
 class HeaderDirectory(Directory):
+    __slots__ = ('system', 'langs')
     install_root = _InstallRoot.includedir
 
     def __init__(self, path, files=None, system=False, langs=None):
@@ -160,10 +178,11 @@ class HeaderDirectory(Directory):
 
 
 class ModuleDefFile(File):
-    pass
+    __slots__ = ()
 
 
 class Binary(File):
+    __slots__ = ('format', 'lang')
     install_root = _InstallRoot.libdir
 
     def __init__(self, path, format, lang=None):
@@ -173,12 +192,14 @@ class Binary(File):
 
 
 class ObjectFile(Binary):
-    pass
+    # `extra_objects` is set by MSVC for objects built with a PCH.
+    __slots__ = ('extra_objects',)
 
 
 # This is used by JVM languages to hold a list of all the object files
 # generated by a particular source file's compilation.
 class ObjectFileList(ObjectFile):
+    __slots__ = ('object_file',)
     install_root = None
 
     def __init__(self, path, object_name, format, lang=None):
@@ -191,6 +212,8 @@ class ObjectFileList(ObjectFile):
 # installed to the system, etc.
 @_clone_traits(exclude={'runtime_deps', 'linktime_deps', 'package_deps'})
 class LinkedBinary(Binary):
+    __slots__ = ('runtime_deps', 'linktime_deps', 'package_deps')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.runtime_deps = []
@@ -203,12 +226,15 @@ class LinkedBinary(Binary):
 
 
 class Executable(LinkedBinary):
+    __slots__ = ()
     install_kind = 'program'
     install_root = _InstallRoot.bindir
 
 
 @_clone_traits(exclude={'parent'})
 class Library(LinkedBinary):
+    __slots__ = ('parent',)
+
     @property
     def runtime_file(self):
         return None
@@ -218,11 +244,13 @@ class Library(LinkedBinary):
 # Multiple inheritance is a sign that we should perhaps switch to a trait-based
 # system though...
 class ExecutableLibrary(Executable, Library):
+    __slots__ = ()
     install_kind = 'program'
     install_root = _InstallRoot.libdir
 
 
 class SharedLibrary(Library):
+    __slots__ = ()
     install_kind = 'program'
 
     @property
@@ -232,6 +260,8 @@ class SharedLibrary(Library):
 
 @_clone_traits(exclude={'format', 'lang'})
 class LinkLibrary(SharedLibrary):
+    __slots__ = ('library',)
+
     def __init__(self, path, library):
         super().__init__(path, library.format, library.lang)
         self.library = library
@@ -249,6 +279,8 @@ class LinkLibrary(SharedLibrary):
 
 @_clone_traits(subfiles={'soname': 'soname_path', 'link': 'linkname_path'})
 class VersionedSharedLibrary(SharedLibrary):
+    __slots__ = ('soname', 'link')
+
     def __init__(self, path, format, lang, soname_path, linkname_path):
         super().__init__(path, format, lang)
         self.soname = LinkLibrary(soname_path, self)
@@ -256,12 +288,25 @@ class VersionedSharedLibrary(SharedLibrary):
 
 
 class StaticLibrary(Library):
+    __slots__ = ('forward_opts',)
+
     def __init__(self, path, format, lang=None, forward_opts=None):
         super().__init__(path, format, lang)
         self.forward_opts = forward_opts
 
+    def __setattr__(self, name, value):
+        # Anything that cached the options we used to forward needs to get
+        # the new ones instead.
+        if name == 'forward_opts':
+            old = getattr(self, name, None)
+            if old is not None:
+                old.invalidate()
+        super().__setattr__(name, value)
+
 
 class WholeArchive(StaticLibrary):
+    __slots__ = ('library',)
+
     def __init__(self, library):
         self.library = library
 
@@ -272,7 +317,11 @@ class WholeArchive(StaticLibrary):
 
 
 class ExportFile(File):
-    private = True
+    __slots__ = ()
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.private = True
 
 
 # This refers specifically to DLL files that have an import library, not just
@@ -282,16 +331,19 @@ class ExportFile(File):
 @_clone_traits(subfiles={'import_lib': 'import_path',
                          'export_file': 'export_path'})
 class DllBinary(LinkedBinary):
+    __slots__ = ('import_lib', 'export_file')
     install_root = _InstallRoot.bindir
-    private = True
 
     def __init__(self, path, format, lang, import_path, export_path=None):
         super().__init__(path, format, lang)
+        self.private = True
         self.import_lib = LinkLibrary(import_path, self)
         self.export_file = ExportFile(export_path) if export_path else None
 
 
 class DualUseLibrary(BaseFile):
+    __slots__ = ('shared', 'static')
+
     def __init__(self, shared, static):
         self.shared = shared
         self.static = static
@@ -333,4 +385,6 @@ class DualUseLibrary(BaseFile):
 
 
 class PkgConfigPcFile(File):
+    __slots__ = ()
+
     install_root = _InstallRoot.libdir
@@ -0,0 +1,175 @@
+import re
+import shlex
+from collections import OrderedDict
+
+from .app_version import version
+from .arguments import parser as argparse
+
+# Scan a set of Fortran sources for the modules they define and use, and then
+# write a file telling the build which objects need to be built before others.
+# For Ninja, this is a dyndep file listing each object's module outputs and
+# inputs; for Make, this is a Makefile fragment making each object depend on
+# the objects whose modules it uses. Only modules defined by one of the scanned
+# sources are considered, since any others (e.g. intrinsic modules) don't need
+# to be built.
+
+formats = ('ninja', 'make')
+
+_comment_ex = re.compile(r'!.*$')
+_module_ex = re.compile(r'^module\s+(\w+)$', re.I)
+_submodule_ex = re.compile(r'^submodule\s*\(\s*(\w+)\s*(?::\s*(\w+)\s*)?\)' +
+                           r'\s*(\w+)$', re.I)
+_use_ex = re.compile(r'^use(?:\s*,\s*(\w+)\s*::|\s*::|\s)\s*(\w+)', re.I)
+
+
+class ScanResult:
+    def __init__(self, provides=None, requires=None):
+        self.provides = provides or []
+        self.requires = requires or []
+
+    def __eq__(self, rhs):
+        return (type(self) == type(rhs) and self.provides == rhs.provides and
+                self.requires == rhs.requires)
+
+    def __repr__(self):
+        return '<ScanResult({!r}, {!r})>'.format(self.provides, self.requires)
+
+
+def _statements(f):
+    for line in f:
+        line = _comment_ex.sub('', line)
+        for i in line.split(';'):
+            i = i.strip()
+            if i:
+                yield i
+
+
+def scan(f):
+    result = ScanResult()
+
+    def add(which, name):
+        name = name.lower()
+        if name not in which:
+            which.append(name)
+
+    for stmt in _statements(f):
+        m = _module_ex.match(stmt)
+        if m:
+            add(result.provides, m.group(1) + '.mod')
+            continue
+
+        m = _submodule_ex.match(stmt)
+        if m:
+            parent, ancestor, name = m.groups()
+            add(result.provides, '{}@{}.smod'.format(parent, name))
+            add(result.requires, '{}@{}.smod'.format(parent, ancestor)
+                if ancestor else parent + '.mod')
+            continue
+
+        m = _use_ex.match(stmt)
+        if m and (m.group(1) or '').lower() != 'intrinsic':
+            add(result.requires, m.group(2) + '.mod')
+
+    for i in result.provides:
+        if i in result.requires:
+            result.requires.remove(i)
+    return result
+
+
+def scan_files(files):
+    results = OrderedDict()
+    for obj, src in files:
+        with open(src) as f:
+            results[obj] = scan(f)
+
+    # Only keep the requirements we actually know how to build.
+    providers = {}
+    for obj, result in results.items():
+        for i in result.provides:
+            providers[i] = obj
+    for result in results.values():
+        result.requires = [i for i in result.requires if i in providers]
+    return results, providers
+
+
+def _escape_ninja(path):
+    return re.sub(r'([$ :])', r'$\1', path)
+
+
+def write_ninja(out, results):
+    out.write('ninja_dyndep_version = 1\n')
+    for obj, result in results.items():
+        out.write('build ' + _escape_ninja(obj))
+        if result.provides:
+            out.write(' | ' + ' '.join(_escape_ninja(i)
+                                       for i in result.provides))
+        out.write(': dyndep')
+        if result.requires:
+            out.write(' | ' + ' '.join(_escape_ninja(i)
+                                       for i in result.requires))
+        out.write('\n')
+
+
+def _escape_make(path):
+    return re.sub(r'([\s:#%])', r'\\\1', path).replace('$', '$$')
+
+
+def write_make(out, results, providers):
+    for obj, result in results.items():
+        deps = []
+        for i in result.requires:
+            if providers[i] not in deps:
+                deps.append(providers[i])
+        if deps:
+            out.write('{}: {}\n'.format(
+                _escape_make(obj), ' '.join(_escape_make(i) for i in deps)
+            ))
+
+
+def _expand_args(args):
+    # Expand any `@FILE` arguments into the (shell-quoted) arguments contained
+    # within that file.
+    result = []
+    for i in args:
+        if i.startswith('@'):
+            with open(i[1:]) as f:
+                result.extend(shlex.split(f.read()))
+        else:
+            result.append(i)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='bfg9000-fortrandep',
+        usage='%(prog)s [-f FORMAT] -o OUTPUT OBJECT=SOURCE...',
+        description='Scan Fortran source files for the modules they ' +
+                    'define and use, and write the dependencies between ' +
+                    'their objects.'
+    )
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + version)
+    parser.add_argument('-f', '--format', choices=formats, default='ninja',
+                        help='the format to write (default: %(default)s)')
+    parser.add_argument('-o', '--output', required=True, metavar='FILE',
+                        help='the file to write (required)')
+    parser.add_argument('files', nargs='*', metavar='OBJECT=SOURCE',
+                        help='an object file and the source it is built from')
+    args = parser.parse_args()
+
+    files = []
+    for i in _expand_args(args.files):
+        obj, sep, src = i.partition('=')
+        if not sep:
+            parser.error('expected OBJECT=SOURCE: {!r}'.format(i))
+        files.append((obj, src))
+
+    try:
+        results, providers = scan_files(files)
+        with open(args.output, 'w') as out:
+            if args.format == 'ninja':
+                write_ninja(out, results)
+            else:
+                write_make(out, results, providers)
+    except OSError as e:
+        parser.exit(1, '{}: error: {}\n'.format(parser.prog, e))
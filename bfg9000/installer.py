@@ -0,0 +1,423 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .app_version import version
+from .arguments import parser as argparse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Install a build's files as described by an install plan (a JSON file written
+# when configuring the build). Files are copied concurrently, and any files
+# whose destinations are already up to date are skipped. The installed files
+# are recorded in an install manifest so that we can tell which files are up to
+# date next time, and so that `uninstall` can remove everything we installed.
+# Files with post-install fixups (e.g. setting the rpath of an executable) are
+# fixed up right after they're copied, so files that were already up to date
+# are left alone.
+
+plan_version = 2
+manifest_version = 1
+
+copy_modes = ('copy', 'reflink', 'hardlink')
+
+_data_mode = 0o644
+
+# The most files to pass to a single fixup command at once, to keep from
+# running into command-line length limits.
+_fixup_batch_size = 64
+
+# The ioctl request to clone a file's extents on Linux (used by btrfs, XFS,
+# and others), i.e. `_IOW(0x94, 9, int)`.
+_FICLONE = 0x40049409
+
+# Errors meaning that a file can't be cloned or linked to its destination, in
+# which case we should just fall back to copying it.
+_unsupported_errnos = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EPERM, errno.EMLINK,
+    errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF,
+}
+
+
+class InstallError(Exception):
+    pass
+
+
+def write_plan(out, entries):
+    json.dump({'version': plan_version, 'entries': entries}, out, indent=2)
+
+
+def read_plan(filename):
+    with open(filename) as f:
+        data = json.load(f)
+    if data.get('version') != plan_version:
+        raise InstallError('unsupported install plan version {!r}'
+                           .format(data.get('version')))
+    return data['entries']
+
+
+def read_manifest(filename):
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        # A corrupt manifest just means we can't trust anything in it.
+        return {}
+    if data.get('version') != manifest_version:
+        return {}
+    return data['files']
+
+
+def write_manifest(filename, files):
+    dirname = os.path.dirname(filename) or '.'
+    with tempfile.NamedTemporaryFile('w', dir=dirname, delete=False) as f:
+        json.dump({'version': manifest_version, 'files': files}, f,
+                  indent=2, sort_keys=True)
+    os.replace(f.name, filename)
+
+
+def signature(filename):
+    try:
+        st = os.lstat(filename)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def file_hash(filename):
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def _clone(src_fd, dst_fd):
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+        return True
+    except OSError as e:
+        if e.errno not in _unsupported_errnos:
+            raise
+        return False
+
+
+def _copy_range(src_fd, dst_fd, size):
+    # `copy_file_range` copies the data within the kernel, and filesystems
+    # that support it (e.g. NFS, or XFS/btrfs on newer kernels) will share the
+    # underlying extents instead of duplicating them.
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is None:
+        return False
+
+    copied = 0
+    try:
+        while copied < size:
+            n = copy_file_range(src_fd, dst_fd, size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        if copied or e.errno not in _unsupported_errnos:
+            raise
+        return False
+    return True
+
+
+def reflink_file(src, dst):
+    # Copy the data of `src` to `dst`, sharing its storage via copy-on-write
+    # where the filesystem allows it, and falling back to a plain copy
+    # otherwise (e.g. across filesystems).
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        if ( not _clone(src_fd, dst_fd) and
+             not _copy_range(src_fd, dst_fd, os.fstat(src_fd).st_size) ):
+            shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+    shutil.copystat(src, dst)
+
+
+def hardlink_file(src, dst):
+    # Hard link `dst` to `src`, returning False if that's not possible, e.g.
+    # because they're on different filesystems.
+    try:
+        os.link(src, dst)
+        return True
+    except OSError as e:
+        if e.errno not in _unsupported_errnos:
+            raise
+        return False
+
+
+class Installer:
+    def __init__(self, roots, manifest, *, target_roots={}, checksum=False,
+                 mode='reflink'):
+        if mode not in copy_modes:
+            raise InstallError('unrecognized copy mode {!r}'.format(mode))
+        self.roots = roots
+        self.target_roots = target_roots
+        self.manifest = manifest
+        self.checksum = checksum
+        self.mode = mode
+
+    def resolve(self, path, target=False):
+        # Target roots are where the install roots will be on the installed
+        # system, i.e. without DESTDIR. These are used in fixups (e.g. for
+        # rpaths).
+        root, suffix = path
+        if root == 'absolute':
+            return suffix
+        try:
+            base = (self.target_roots if target else self.roots)[root]
+        except KeyError:
+            raise InstallError('unknown root {!r}'.format(root))
+        return os.path.join(base, suffix) if suffix else base
+
+    def resolve_arg(self, arg):
+        if isinstance(arg, list):
+            return ''.join(self.resolve_arg(i) for i in arg)
+        elif isinstance(arg, dict):
+            return self.resolve(arg['path'], arg.get('target', False))
+        return arg
+
+    def up_to_date(self, src, dst, recorded, fixup=False):
+        src_sig, dst_sig = signature(src), signature(dst)
+        if src_sig is None:
+            raise InstallError('{!r} does not exist'.format(src))
+        if dst_sig is None:
+            return False
+
+        if os.path.islink(src) or os.path.islink(dst):
+            return ( os.path.islink(src) and os.path.islink(dst) and
+                     os.readlink(src) == os.readlink(dst) )
+
+        # If the destination hasn't changed since we last installed it, and
+        # neither has the source, we can skip it. This accounts for any
+        # post-install fixups that modified the destination.
+        if recorded and recorded == {'src': src_sig, 'dst': dst_sig}:
+            return True
+
+        # Otherwise, check if the destination is a faithful copy of the source.
+        # If the file needs fixing up, a faithful copy isn't what we want.
+        if fixup:
+            return False
+        if src_sig[0] != dst_sig[0]:
+            return False
+        if src_sig[1] == dst_sig[1]:
+            return True
+        return self.checksum and file_hash(src) == file_hash(dst)
+
+    def _can_hardlink(self, kind, src, fixup):
+        # Files that get modified after installation (or whose permissions we
+        # need to change) must be copied so that we leave the original alone.
+        if self.mode != 'hardlink' or fixup:
+            return False
+        return kind != 'data' or (os.stat(src).st_mode & 0o7777) == _data_mode
+
+    def copy(self, kind, src, dst, fixup=False):
+        # Copy to a temporary file and then move it into place so that we
+        # don't clobber a running executable or leave a partial file behind.
+        dirname = os.path.dirname(dst)
+        os.makedirs(dirname, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dirname,
+                                   prefix='.' + os.path.basename(dst))
+        os.close(fd)
+        try:
+            if os.path.islink(src):
+                # Preserve symlinks (e.g. for versioned shared libraries).
+                os.remove(tmp)
+                os.symlink(os.readlink(src), tmp)
+            else:
+                linked = False
+                if self._can_hardlink(kind, src, fixup):
+                    os.remove(tmp)
+                    linked = hardlink_file(src, tmp)
+                if not linked:
+                    if self.mode == 'copy':
+                        shutil.copy2(src, tmp)
+                    else:
+                        reflink_file(src, tmp)
+                    if kind == 'data':
+                        os.chmod(tmp, _data_mode)
+            os.replace(tmp, dst)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _install_one(self, entry, manifest):
+        dst = self.resolve(entry['dst'])
+        if entry['kind'] == 'directory':
+            os.makedirs(dst, exist_ok=True)
+            return None
+
+        src = self.resolve(entry['src'])
+        fixup = 'fixup' in entry
+        if self.up_to_date(src, dst, manifest.get(dst), fixup):
+            return False
+        self.copy(entry['kind'], src, dst, fixup)
+        return True
+
+    def _fixup_commands(self, entries):
+        # Group the fixups by command (i.e. by tool and arguments), so that
+        # tools that can fix up several files at once only run once per group.
+        groups = OrderedDict()
+        for i in entries:
+            fixup = i['fixup']
+            command = tuple(self.resolve_arg(j) for j in fixup['command'])
+            groups.setdefault((command, fixup.get('batch', False)),
+                              []).append(self.resolve(i['dst']))
+
+        for (command, batch), files in groups.items():
+            size = _fixup_batch_size if batch else 1
+            for n in range(0, len(files), size):
+                yield list(command) + files[n:n + size]
+
+    def fixup(self, entries, jobs=None):
+        def run(command):
+            try:
+                subprocess.run(command, check=True)
+            except subprocess.CalledProcessError as e:
+                raise InstallError('command {!r} failed with exit status {}'
+                                   .format(' '.join(e.cmd), e.returncode))
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(run, self._fixup_commands(entries)))
+
+    def install(self, entries, jobs=None):
+        manifest = read_manifest(self.manifest)
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(
+                lambda i: self._install_one(i, manifest), entries
+            ))
+
+        # Only fix up the files we just copied; anything that was already up
+        # to date was fixed up when it was installed.
+        self.fixup([i for i, copied in zip(entries, results)
+                    if copied and 'fixup' in i], jobs)
+        self.record(entries, manifest)
+        return (sum(1 for i in results if i),
+                sum(1 for i in results if i is False))
+
+    def record(self, entries, manifest=None):
+        if manifest is None:
+            manifest = read_manifest(self.manifest)
+        for i in entries:
+            if i['kind'] == 'directory':
+                continue
+            dst = self.resolve(i['dst'])
+            manifest[dst] = {'src': signature(self.resolve(i['src'])),
+                             'dst': signature(dst)}
+        write_manifest(self.manifest, manifest)
+
+    def _owns(self, filename):
+        # Check if a file is inside one of our install roots. This lets us
+        # leave alone files installed with a different DESTDIR.
+        for k, v in self.roots.items():
+            if k not in ('srcdir', 'builddir'):
+                if filename.startswith(os.path.join(v, '')):
+                    return True
+        return False
+
+    def uninstall(self, entries):
+        manifest = read_manifest(self.manifest)
+        files = set(i for i in manifest if self._owns(i))
+        files.update(self.resolve(i['dst']) for i in entries
+                     if i['kind'] != 'directory')
+
+        removed = 0
+        for i in sorted(files):
+            manifest.pop(i, None)
+            try:
+                os.remove(i)
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+        if manifest:
+            write_manifest(self.manifest, manifest)
+        else:
+            try:
+                os.remove(self.manifest)
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+def _rerun_with_sudo(args):
+    # If we don't have permission to install somewhere, try again as root.
+    # This lets users install builds without running the whole build as root.
+    if os.name != 'posix' or os.geteuid() == 0:
+        return
+    sudo = shutil.which('sudo')
+    if sudo:
+        os.execv(sudo, [sudo, sys.argv[0], '--no-sudo'] + args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='bfg9000-install',
+        description='Install (or uninstall) the files listed in an install ' +
+                    'plan.'
+    )
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + version)
+    parser.add_argument('-m', '--manifest', required=True, metavar='FILE',
+                        help='the install manifest to read and update ' +
+                        '(required)')
+    parser.add_argument('-r', '--root', nargs=2, action='append', default=[],
+                        metavar=('NAME', 'PATH'),
+                        help='the path to use for the root NAME')
+    parser.add_argument('-t', '--target-root', nargs=2, action='append',
+                        default=[], metavar=('NAME', 'PATH'),
+                        help='the path to use for the root NAME on the ' +
+                        'installed system (i.e. without DESTDIR)')
+    parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                        help='the number of files to copy at once')
+    parser.add_argument('-c', '--checksum', action='store_true',
+                        help='compare file contents to determine if ' +
+                        'destinations are up to date')
+    parser.add_argument('--mode', choices=copy_modes,
+                        default=os.environ.get('INSTALL_MODE', 'reflink'),
+                        help='how to copy files: copy, reflink (copy-on-' +
+                        'write where possible), or hardlink (hard link ' +
+                        'where possible) (default: %(default)s)')
+    parser.add_argument('--no-sudo', action='store_false', dest='sudo',
+                        help="don't rerun with sudo if permission is denied")
+    parser.add_argument('action', choices=['install', 'uninstall'],
+                        help='the action to perform')
+    parser.add_argument('plan', metavar='PLAN', help='the install plan')
+    args = parser.parse_args()
+
+    roots = dict(args.root)
+    roots.setdefault('builddir', os.curdir)
+
+    try:
+        installer = Installer(roots, args.manifest,
+                              target_roots=dict(args.target_root),
+                              checksum=args.checksum, mode=args.mode)
+        entries = read_plan(args.plan)
+        if args.action == 'install':
+            copied, skipped = installer.install(entries, args.jobs)
+            print('installed {} file(s), {} up to date'
+                  .format(copied, skipped))
+        else:
+            installer.uninstall(entries)
+    except (InstallError, OSError) as e:
+        if ( args.sudo and isinstance(e, OSError) and
+             e.errno in (errno.EACCES, errno.EPERM) ):
+            _rerun_with_sudo(sys.argv[1:])
+        parser.exit(1, '{}: error: {}\n'.format(parser.prog, e))
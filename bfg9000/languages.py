@@ -111,18 +111,32 @@ class _Definer:
         return inner
 
 
-class Languages:
-    def __init__(self):
+class _Registry:
+    def __init__(self, loader=None):
+        self._loader = loader
+
+    def _load(self):
+        # Call our loader (if any) the first time anything is looked up.
+        if self._loader:
+            loader, self._loader = self._loader, None
+            loader()
+
+
+class Languages(_Registry):
+    def __init__(self, loader=None):
+        super().__init__(loader)
         self._langs = {}
         self._ext2lang = {}
 
     def __getitem__(self, name):
+        self._load()
         try:
             return self._langs[name]
         except KeyError:
             raise ValueError('unrecognized language {!r}'.format(name))
 
     def __contains__(self, name):
+        self._load()
         return name in self._langs
 
     def _add(self, info):
@@ -140,13 +154,14 @@ class Languages:
         return lang if langkind == kind else None
 
     def extinfo(self, ext):
+        self._load()
         return self._ext2lang.get(ext, (None, None))
 
     def make(self, name, *, src_lang=None):
         return _Definer(self, _LanguageInfo, name, src_lang=src_lang)
 
 
-class Formats:
+class Formats(_Registry):
     class _ModeDefiner(_Definer):
         def __init__(self, *args, **kwargs):
             super().__init__(*args, children={}, **kwargs)
@@ -157,10 +172,12 @@ class Formats:
         def make(self, name):
             return _Definer(self, _FormatModeInfo, name)
 
-    def __init__(self):
+    def __init__(self, loader=None):
+        super().__init__(loader)
         self._formats = {}
 
     def __getitem__(self, name):
+        self._load()
         try:
             return self._formats[name]
         except KeyError:
@@ -173,5 +190,13 @@ class Formats:
         return self._ModeDefiner(self, _FormatInfo, name, src_lang=src_lang)
 
 
-known_langs = Languages()
-known_formats = Formats()
+def _load_tools():
+    # Languages and formats are defined by the modules for their tools, so
+    # import those when we first need them instead of importing every tool up
+    # front.
+    from .tools import init_languages
+    init_languages()
+
+
+known_langs = Languages(_load_tools)
+known_formats = Formats(_load_tools)
@@ -1,10 +1,15 @@
 import functools
+import json
+import os
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
 from itertools import chain
 
 from .iterutils import isiterable, iterate
 
-__all__ = ['convert_each', 'convert_one', 'hashify', 'identity', 'memoize',
-           'objectify']
+__all__ = ['CacheInfo', 'convert_each', 'convert_one', 'hashify', 'identity',
+           'instance_vars', 'memoize', 'objectify', 'persistent_caches',
+           'summarize_caches']
 
 
 def identity(x):
@@ -37,6 +42,19 @@ def convert_each(kwargs, key, fn, **fn_kwargs):
     kwargs[key] = [fn(i, **fn_kwargs) for i in iterate(kwargs.get(key))]
 
 
+def instance_vars(obj):
+    # Like `vars(obj)`, but also include attributes stored in `__slots__`.
+    result = {}
+    for cls in reversed(type(obj).__mro__):
+        for i in cls.__dict__.get('__slots__', ()):
+            try:
+                result[i] = getattr(obj, i)
+            except AttributeError:
+                pass
+    result.update(getattr(obj, '__dict__', {}))
+    return result
+
+
 def hashify(thing):
     if isinstance(thing, dict):
         return frozenset((hashify(k), hashify(v)) for k, v in thing.items())
@@ -45,19 +63,131 @@ def hashify(thing):
     return thing
 
 
-def memoize(fn):
-    cache = {}
+CacheInfo = namedtuple('CacheInfo', ['name', 'hits', 'misses', 'maxsize',
+                                     'size'])
+
+_caches = []
+_persistent = None
+_persistent_version = 1
+
+_kwargs_mark = object()
+_unhashable_mark = object()
+_missing = object()
+
+
+def _make_key(args, kwargs):
+    # Most memoized functions take hashable arguments, so try using them
+    # directly before falling back to the (much slower) `hashify`.
+    key = args
+    if kwargs:
+        key += (_kwargs_mark,) + tuple(kwargs.items())
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return (_unhashable_mark, hashify(args), hashify(kwargs))
+
+
+def memoize(fn=None, *, maxsize=None, persist=None):
+    # Cache the results of `fn`. If `maxsize` is set, only keep that many of
+    # the most-recently-used results. If `persist` is set, it's called with the
+    # same arguments as `fn` to get a JSON-serializable key (or None) under
+    # which to save the result across runs; see `persistent_caches`. In this
+    # case, `fn`'s results must be JSON-serializable too.
+    if fn is None:
+        return lambda fn: memoize(fn, maxsize=maxsize, persist=persist)
+
+    name = '{}.{}'.format(fn.__module__, fn.__qualname__)
+    cache = OrderedDict() if maxsize else {}
+    stats = [0, 0]
+
+    def lookup_persistent(args, kwargs):
+        if not persist or _persistent is None:
+            return None, _missing
+        key = persist(*args, **kwargs)
+        if key is None:
+            return None, _missing
+        key = json.dumps(key, sort_keys=True)
+        return key, _persistent[0].get(name, {}).get(key, _missing)
 
     @functools.wraps(fn)
     def wrapper(*args, **kwargs):
-        key = (hashify(args), hashify(kwargs))
-        if key in cache:
-            return cache[key]
-        result = cache[key] = fn(*args, **kwargs)
+        key = _make_key(args, kwargs)
+        try:
+            result = cache[key]
+        except KeyError:
+            pass
+        else:
+            stats[0] += 1
+            if maxsize:
+                cache.move_to_end(key)
+            return result
+
+        pkey, result = lookup_persistent(args, kwargs)
+        if result is not _missing:
+            stats[0] += 1
+        else:
+            stats[1] += 1
+            result = fn(*args, **kwargs)
+        if pkey is not None:
+            _persistent[1].setdefault(name, {})[pkey] = result
+
+        cache[key] = result
+        if maxsize and len(cache) > maxsize:
+            cache.popitem(last=False)
         return result
 
     def reset():
         cache.clear()
+        stats[:] = [0, 0]
+
+    def cache_info():
+        return CacheInfo(name, stats[0], stats[1], maxsize, len(cache))
 
     wrapper._reset = reset
+    wrapper.cache_info = cache_info
+    _caches.append(cache_info)
     return wrapper
+
+
+def summarize_caches():
+    infos = [i() for i in _caches]
+    infos = [i for i in infos if i.hits or i.misses]
+    if not infos:
+        return []
+
+    lines = ['memoize summary: {} hits, {} misses'.format(
+        sum(i.hits for i in infos), sum(i.misses for i in infos)
+    )]
+    for i in sorted(infos, key=lambda x: x.hits + x.misses, reverse=True):
+        lines.append('  {}: {} hits, {} misses, {} entries{}'.format(
+            i.name, i.hits, i.misses, i.size,
+            ' (max {})'.format(i.maxsize) if i.maxsize else ''
+        ))
+    return lines
+
+
+@contextmanager
+def persistent_caches(filename):
+    # Load the results of memoized functions with `persist` set from
+    # `filename`, and save the ones used this time back to it afterwards. Only
+    # results that were used are saved so that stale ones don't pile up.
+    global _persistent
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+        if data['version'] != _persistent_version:
+            raise ValueError('version mismatch')
+        loaded = data['caches']
+    except (OSError, ValueError, TypeError, KeyError):
+        loaded = {}
+
+    _persistent = (loaded, {})
+    try:
+        yield
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w') as f:
+            json.dump({'version': _persistent_version,
+                       'caches': _persistent[1]}, f, separators=(',', ':'))
+    finally:
+        _persistent = None
@@ -12,15 +12,50 @@ from .file_types import *
 from .platforms.framework import Framework
 
 
+def _option_key(option):
+    # Get a hashable key for an option such that options with equal keys match
+    # each other. If the option's fields aren't hashable (or it has custom
+    # matching logic), return None.
+    if getattr(type(option), 'matches', None) is not Option.matches:
+        return None
+    try:
+        # Variadic fields are stored as lists, so convert them to tuples.
+        key = (type(option), tuple(
+            tuple(v) if isinstance(v, list) else v
+            for v in (getattr(option, i) for i in option.__slots__)
+        ))
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
 class option_list:
+    # Every compile and link step has a few of these, so keep them small. Most
+    # are empty or short, so only create the key index once it's needed.
+    __slots__ = ('_options', '_keys')
+
     def __init__(self, *args):
         self._options = []
+        self._keys = None
         self.collect(*args)
 
     def append(self, option):
-        if ( isinstance(option, safe_str.stringy_types) or
-             not any(option.matches(i) for i in self._options) ):
+        if isinstance(option, safe_str.stringy_types):
             self._options.append(option)
+            return
+
+        key = _option_key(option)
+        if key is None:
+            if any(option.matches(i) for i in self._options):
+                return
+        elif self._keys is None:
+            self._keys = {key}
+        elif key in self._keys:
+            return
+        else:
+            self._keys.add(key)
+        self._options.append(option)
 
     def extend(self, options):
         for i in options:
@@ -35,7 +70,10 @@ class option_list:
                 self.append(i)
 
     def copy(self):
-        return option_list(self._options)
+        result = option_list()
+        result._options = self._options[:]
+        result._keys = None if self._keys is None else self._keys.copy()
+        return result
 
     def filter(self, type):
         return option_list(i for i in self._options if isinstance(i, type))
@@ -53,6 +91,10 @@ class option_list:
 
     def __setitem__(self, key, value):
         self._options[key] = value
+        self._keys = set(filter(None, (
+            _option_key(i) for i in self._options
+            if not isinstance(i, safe_str.stringy_types)
+        ))) or None
 
     def __eq__(self, rhs):
         return type(self) == type(rhs) and self._options == rhs._options
@@ -79,37 +121,121 @@ class option_list:
         return self
 
 
+def _notify_owner(method):
+    def inner(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        owner = self._owner
+        if owner is not None and owner._closure is not None:
+            owner.invalidate()
+        return result
+    return inner
+
+
+class _forward_option_list(option_list):
+    # An option_list that tells the ForwardOptions holding it when it changes.
+    __slots__ = ('_owner',)
+
+    def __init__(self, options=(), owner=None):
+        self._owner = None
+        super().__init__(options)
+        self._owner = owner
+
+    append = _notify_owner(option_list.append)
+    __setitem__ = _notify_owner(option_list.__setitem__)
+
+    @_notify_owner
+    def extend(self, options):
+        for i in options:
+            option_list.append(self, i)
+
+    def __eq__(self, rhs):
+        return isinstance(rhs, option_list) and self._options == rhs._options
+
+
+class _forward_list(list):
+    # Likewise, a list that tells the ForwardOptions holding it when it
+    # changes.
+    __slots__ = ('_owner',)
+
+    def __init__(self, items=(), owner=None):
+        super().__init__(items)
+        self._owner = owner
+
+    append = _notify_owner(list.append)
+    extend = _notify_owner(list.extend)
+    insert = _notify_owner(list.insert)
+    pop = _notify_owner(list.pop)
+    remove = _notify_owner(list.remove)
+    clear = _notify_owner(list.clear)
+    sort = _notify_owner(list.sort)
+    reverse = _notify_owner(list.reverse)
+    __setitem__ = _notify_owner(list.__setitem__)
+    __delitem__ = _notify_owner(list.__delitem__)
+    __iadd__ = _notify_owner(list.__iadd__)
+
+
 class ForwardOptions:
-    __slots__ = ['compile_options', 'link_options', 'libs', 'packages']
+    _fields = ('compile_options', 'link_options', 'libs', 'packages')
+    __slots__ = _fields + ('_closure', '_dependents')
 
     def __init__(self, *, compile_options=None, link_options=None, libs=None,
                  packages=None):
-        self.compile_options = compile_options or option_list()
-        self.link_options = link_options or option_list()
-        self.libs = libs or []
-        self.packages = packages or []
+        self._closure = None
+        # The ForwardOptions whose cached closures include ours, by id.
+        self._dependents = {}
+
+        self.compile_options = _forward_option_list(compile_options or (),
+                                                    self)
+        self.link_options = _forward_option_list(link_options or (), self)
+        self.libs = _forward_list(libs or (), self)
+        self.packages = _forward_list(packages or (), self)
 
     def update(self, rhs):
-        for i in self.__slots__:
+        for i in self._fields:
             getattr(self, i).extend(getattr(rhs, i))
 
+    def invalidate(self):
+        # Our closure is out of date, and so is the closure of everything that
+        # forwards us. Push that out now so that checking the cache in
+        # `closure()` is cheap. Nodes without a closure have already been
+        # invalidated (along with their dependents), so we can stop there.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._closure is None:
+                continue
+            node._closure = None
+            stack.extend(node._dependents.values())
+            node._dependents = {}
+
+    def closure(self):
+        # Get the forward options from this object and, recursively, from all
+        # the libs it forwards. Since many link steps can share the same libs,
+        # cache the result so we only merge each library's options once.
+        if self._closure is None:
+            result = ForwardOptions()
+            result.update(self)
+            for i in self.libs:
+                forward_opts = getattr(i, 'forward_opts', None)
+                if forward_opts:
+                    result.update(forward_opts.closure())
+                    forward_opts._dependents[id(self)] = self
+            self._closure = result
+        return self._closure
+
     def __eq__(self, rhs):
-        return all(getattr(self, i) == getattr(rhs, i) for i in self.__slots__)
+        return all(getattr(self, i) == getattr(rhs, i) for i in self._fields)
 
     def __repr__(self):
-        return repr({i: getattr(self, i) for i in self.__slots__})
+        return repr({i: getattr(self, i) for i in self._fields})
 
     @classmethod
     def recurse(cls, libs):
-        def do_recurse(result, libs):
-            for i in libs:
-                forward_opts = getattr(i, 'forward_opts', None)
-                if forward_opts:
-                    result.update(forward_opts)
-                    do_recurse(result, forward_opts.libs)
-
         result = cls()
-        do_recurse(result, libs)
+        for i in libs:
+            forward_opts = getattr(i, 'forward_opts', None)
+            if forward_opts:
+                result.update(forward_opts.closure())
         return result
 
 
@@ -1,5 +1,7 @@
 import functools
 import os
+import stat
+import tempfile
 from contextlib import contextmanager
 
 from .platforms.basepath import BasePath, Root, InstallRoot, DestDir  # noqa
@@ -68,6 +70,37 @@ def samefile(path1, path2, variables=None):
                             path2.string(variables))
 
 
+class DirectoryIndex:
+    # Check if files exist by listing the directories they'd be in once and
+    # looking them up there. This saves a lot of `stat` calls when searching
+    # for many files across the same directories (e.g. system libraries). It
+    # assumes that the directories don't change while we're using the index.
+    def __init__(self):
+        self._listings = {}
+
+    def _listing(self, dirname):
+        try:
+            return self._listings[dirname]
+        except KeyError:
+            pass
+
+        try:
+            with os.scandir(dirname) as it:
+                result = {os.path.normcase(i.name) for i in it}
+        except OSError:
+            result = frozenset()
+        self._listings[dirname] = result
+        return result
+
+    def exists(self, path, variables=None):
+        filename = path.string(variables)
+        dirname, basename = os.path.split(filename)
+        if os.path.normcase(basename) not in self._listing(dirname):
+            return False
+        # The entry could be a broken symlink, so make sure it really exists.
+        return os.path.exists(filename)
+
+
 def listdir(path, variables=None):
     dirs, nondirs = [], []
     try:
@@ -105,3 +138,37 @@ def pushd(dirname, makedirs=False, mode=0o777, exist_ok=False):
         yield
     finally:
         os.chdir(old)
+
+
+def write_if_changed(path, data, variables=None):
+    # Write `data` (a string or bytes) to `path`, but only if its contents
+    # would change. This keeps the file's timestamp the same otherwise so that
+    # build tools don't reload or rebuild anything unnecessarily. Returns True
+    # if the file was written.
+    filename = path.string(variables)
+    binary = isinstance(data, bytes)
+    try:
+        with open(filename, 'rb' if binary else 'r') as f:
+            if f.read() == data:
+                return False
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except (OSError, ValueError):
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    # Write to a temporary file and then move it into place so that nothing
+    # ever sees a partially-written file.
+    dirname = os.path.dirname(filename) or '.'
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dirname,
+                               prefix='.' + os.path.basename(filename))
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w') as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return True
@@ -2,9 +2,9 @@ import platform
 import re
 import subprocess
 from collections import namedtuple
-from pkg_resources import get_entry_info
 
 from ..objutils import memoize
+from ..plugins import iter_entry_points, load_object
 from ..versioning import SpecifierSet, Version
 
 __all__ = ['known_native_object_formats', 'known_platforms', 'parse_triplet',
@@ -27,6 +27,29 @@ _platform_genus = {
 
 _triplet_abi = {'android', 'eabi', 'elf', 'gnu', 'macho'}
 
+# The built-in platform types for each platform genus. Any other genus is
+# looked up via the installed entry points.
+_builtin_platforms = {
+    'host': {
+        'cygwin': 'bfg9000.platforms.cygwin:CygwinHostPlatform',
+        'darwin': 'bfg9000.platforms.posix:DarwinHostPlatform',
+        'linux': 'bfg9000.platforms.posix:PosixHostPlatform',
+        'msdos': 'bfg9000.platforms.windows:WindowsTargetPlatform',
+        'posix': 'bfg9000.platforms.posix:PosixHostPlatform',
+        'win9x': 'bfg9000.platforms.windows:WindowsHostPlatform',
+        'winnt': 'bfg9000.platforms.windows:WindowsHostPlatform',
+    },
+    'target': {
+        'cygwin': 'bfg9000.platforms.cygwin:CygwinTargetPlatform',
+        'darwin': 'bfg9000.platforms.posix:DarwinTargetPlatform',
+        'linux': 'bfg9000.platforms.posix:PosixTargetPlatform',
+        'msdos': 'bfg9000.platforms.windows:WindowsTargetPlatform',
+        'posix': 'bfg9000.platforms.posix:PosixTargetPlatform',
+        'win9x': 'bfg9000.platforms.windows:WindowsTargetPlatform',
+        'winnt': 'bfg9000.platforms.windows:WindowsTargetPlatform',
+    },
+}
+
 
 def parse_triplet(s, default_vendor='unknown'):
     def _result(arch, vendor_sys, abi=None):
@@ -133,15 +156,24 @@ class Platform:
         return not self == rhs
 
 
+def _get_platform_type(kind, genus):
+    builtins = _builtin_platforms[kind]
+    if genus in builtins:
+        return load_object(builtins[genus])
+
+    entry_point = 'bfg9000.platforms.{}'.format(kind)
+    for i in iter_entry_points(entry_point):
+        if i.name == genus:
+            return i.load()
+
+    # Fall back to a generic POSIX system if we don't recognize the platform
+    # name.
+    return load_object(builtins['posix'])
+
+
 @memoize
 def _get_platform_info(kind, genus, species, arch):
-    entry_point = 'bfg9000.platforms.{}'.format(kind)
-    entry = get_entry_info('bfg9000', entry_point, genus)
-    if entry is None:
-        # Fall back to a generic POSIX system if we don't recognize the
-        # platform name.
-        entry = get_entry_info('bfg9000', entry_point, 'posix')
-    return entry.load()(genus, species, arch)
+    return _get_platform_type(kind, genus)(genus, species, arch)
 
 
 def _platform_info(kind, name=None, arch=None):
@@ -0,0 +1,33 @@
+import importlib
+
+__all__ = ['iter_entry_points', 'load_object']
+
+
+def _entry_points():
+    # importlib.metadata is fairly slow to import, so only do so when we
+    # actually need to look up third-party plugins.
+    from importlib.metadata import entry_points
+    return entry_points()
+
+
+def iter_entry_points(group):
+    try:
+        eps = _entry_points()
+    except ImportError:  # pragma: no cover
+        # Python < 3.8 doesn't have importlib.metadata, so fall back to
+        # pkg_resources (which is much slower to import).
+        from pkg_resources import iter_entry_points
+        return iter_entry_points(group)
+
+    if hasattr(eps, 'select'):
+        return iter(eps.select(group=group))
+    return iter(eps.get(group, []))  # pragma: no cover
+
+
+def load_object(spec):
+    # Load an object from a `module:attr` string, just like an entry point.
+    module, _, attrs = spec.partition(':')
+    result = importlib.import_module(module)
+    for i in attrs.split('.') if attrs else []:
+        result = getattr(result, i)
+    return result
@@ -0,0 +1,140 @@
+import functools
+import time
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+
+from . import objutils
+
+__all__ = ['caller', 'memoize', 'Probe', 'ProbeLog', 'record', 'reset',
+           'summarize', 'timed']
+
+
+class Probe(namedtuple('Probe', ['kind', 'raw_command', 'caller', 'duration',
+                                 'cached'])):
+    # `raw_command` can also be a function returning the command, so that
+    # callers don't have to build it unless it's actually shown.
+    __slots__ = ()
+
+    @property
+    def command(self):
+        if callable(self.raw_command):
+            return self.raw_command()
+        return self.raw_command
+
+
+class ProbeLog:
+    def __init__(self):
+        self.probes = []
+        self._callers = []
+
+    @property
+    def current_caller(self):
+        return self._callers[-1] if self._callers else None
+
+    @contextmanager
+    def caller(self, name):
+        self._callers.append(name)
+        try:
+            yield
+        finally:
+            self._callers.pop()
+
+    def record(self, kind, command, duration=0, cached=False):
+        self.probes.append(Probe(kind, command, self.current_caller, duration,
+                                 cached))
+
+    @contextmanager
+    def timed(self, kind, command):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, command, time.perf_counter() - start)
+
+    def summarize(self, verbose=False):
+        if not self.probes:
+            return []
+
+        by_caller = OrderedDict()
+        for i in self.probes:
+            by_caller.setdefault(i.caller, []).append(i)
+
+        def describe(probes):
+            spawned = [i for i in probes if not i.cached]
+            return '{} probes in {:.3f}s ({} cached)'.format(
+                len(spawned), sum(i.duration for i in spawned),
+                len(probes) - len(spawned)
+            )
+
+        def total(probes):
+            return sum(i.duration for i in probes)
+
+        lines = ['probe summary: ' + describe(self.probes)]
+        for name, probes in sorted(by_caller.items(), reverse=True,
+                                   key=lambda x: total(x[1])):
+            lines.append('  {}: {}'.format(name or '<unknown>',
+                                           describe(probes)))
+            if verbose:
+                for i in sorted(probes, key=lambda x: x.duration,
+                                reverse=True):
+                    lines.append('    {:>8} {:<5} {}'.format(
+                        'cached' if i.cached else
+                        '{:.3f}s'.format(i.duration), i.kind, i.command
+                    ))
+        return lines
+
+
+_log = ProbeLog()
+
+
+def caller(name):
+    return _log.caller(name)
+
+
+def record(kind, command, duration=0, cached=False):
+    _log.record(kind, command, duration, cached)
+
+
+def timed(kind, command):
+    return _log.timed(kind, command)
+
+
+def summarize(verbose=False):
+    return _log.summarize(verbose)
+
+
+def reset():
+    global _log
+    _log = ProbeLog()
+    return _log
+
+
+def memoize(fn=None, **memoize_kwargs):
+    # Like `objutils.memoize`, but record a cached probe whenever we return a
+    # result from the cache. This is meant for methods, so `self` is omitted
+    # from the recorded command.
+    if fn is None:
+        return lambda fn: memoize(fn, **memoize_kwargs)
+
+    misses = [0]
+
+    @functools.wraps(fn)
+    def miss(*args, **kwargs):
+        misses[0] += 1
+        return fn(*args, **kwargs)
+
+    memoized = objutils.memoize(miss, **memoize_kwargs)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        before = misses[0]
+        result = memoized(*args, **kwargs)
+        if misses[0] == before:
+            record('call', '{}{}'.format(
+                fn.__qualname__, objutils.hashify(args[1:])
+            ), cached=True)
+        return result
+
+    wrapper._reset = memoized._reset
+    wrapper.cache_info = memoized.cache_info
+    return wrapper
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+__all__ = ['enabled', 'Profiler', 'span', 'start', 'stop']
+
+_profiler = None
+
+
+class Profiler:
+    def __init__(self):
+        self.events = []
+        self._start = time.perf_counter()
+
+    def _now(self):
+        # Trace events use timestamps in microseconds.
+        return (time.perf_counter() - self._start) * 1000000
+
+    @contextmanager
+    def span(self, name, category, **kwargs):
+        start = self._now()
+        try:
+            yield
+        finally:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start,
+                'dur': self._now() - start,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+            }
+            if kwargs:
+                event['args'] = {k: str(v) for k, v in kwargs.items()}
+            self.events.append(event)
+
+    def to_json(self):
+        return {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+        }
+
+    def write(self, out):
+        json.dump(self.to_json(), out)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+
+_null_span = _NullSpan()
+
+
+def start():
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def stop():
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def enabled():
+    return _profiler is not None
+
+
+def span(name, category, **kwargs):
+    if _profiler is None:
+        return _null_span
+    return _profiler.span(name, category, **kwargs)
@@ -0,0 +1,72 @@
+import errno
+import os
+import stat
+import subprocess
+import sys
+
+from .app_version import version
+from .arguments import parser as argparse
+from .installer import file_hash
+
+# Run a command that generates some files (e.g. a code generator like `moc` or
+# `yacc`), and then restore the timestamps of any outputs whose contents didn't
+# change. When used with Ninja's `restat`, this prevents regenerating a file
+# from rebuilding everything that depends on it if nothing actually changed.
+
+
+def snapshot(outputs):
+    result = {}
+    for i in outputs:
+        try:
+            st = os.stat(i)
+        except FileNotFoundError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            result[i] = (st.st_atime_ns, st.st_mtime_ns, st.st_size,
+                         file_hash(i))
+    return result
+
+
+def restore(snap):
+    restored = []
+    for name, (atime, mtime, size, digest) in snap.items():
+        try:
+            st = os.stat(name)
+        except FileNotFoundError:
+            continue
+        if st.st_size == size and file_hash(name) == digest:
+            os.utime(name, ns=(atime, mtime))
+            restored.append(name)
+    return restored
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='bfg9000-restat',
+        usage='%(prog)s OUTPUT... -- COMMAND...',
+        description='Run a command, and then restore the timestamps of any ' +
+                    "of its outputs whose contents didn't change."
+    )
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + version)
+    parser.add_argument('output', nargs='+', metavar='OUTPUT',
+                        help='the files generated by the command')
+
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    command = argv[split + 1:]
+    if len(command) == 0:
+        parser.error('command required')
+
+    snap = snapshot(args.output)
+    try:
+        returncode = subprocess.run(command).returncode
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            parser.exit(66, 'command not found: {}\n'.format(command[0]))
+        raise  # pragma: no cover
+
+    if returncode == 0:
+        restore(snap)
+    return returncode
@@ -19,6 +19,8 @@ class safe_string:
 
 
 class safe_string_ops:
+    __slots__ = ()
+
     def __add__(self, rhs):
         return jbos(safe_str(self), safe_str(rhs))
 
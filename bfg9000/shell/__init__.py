@@ -3,6 +3,7 @@ import subprocess
 from enum import Enum
 
 from .list import shell_list  # noqa
+from .. import probes, profiler
 from ..iterutils import listify
 from ..path import BasePath, Path
 from ..platforms.host import platform_info
@@ -15,6 +16,12 @@ else:
 
 CalledProcessError = subprocess.CalledProcessError
 
+# The longest list of file arguments (in characters) we'll put directly on a
+# command line in a build script. Past this, we pass them via response files or
+# split the command up, staying well clear of the OS's limits (e.g. 8191
+# characters for cmd.exe).
+max_files_length = 4096
+
 
 class Mode(Enum):
     normal = None
@@ -29,12 +36,42 @@ def split_paths(s, sep=os.pathsep):
     return s.split(sep)
 
 
+def _file_length(file):
+    # Phony files (e.g. aliases) have plain strings for their paths.
+    return len(getattr(file.path, 'suffix', file.path)) + 1
+
+
+def files_length(files):
+    return sum(_file_length(i) for i in files)
+
+
+def chunk_files(files, max_length=None):
+    if max_length is None:
+        max_length = max_files_length
+
+    chunk, length = [], 0
+    for i in files:
+        size = _file_length(i)
+        if chunk and length + size > max_length:
+            yield chunk
+            chunk, length = [], 0
+        chunk.append(i)
+        length += size
+    if chunk:
+        yield chunk
+
+
 def which(names, env=os.environ, base_dirs=None, resolve=False,
           kind='executable'):
     names = listify(names)
     if len(names) == 0:
         raise TypeError('must supply at least one name')
 
+    with probes.timed('which', ', '.join('{!r}'.format(i) for i in names)):
+        return _which(names, env, base_dirs, resolve, kind)
+
+
+def _which(names, env, base_dirs, resolve, kind):
     paths = split_paths(env.get('PATH', os.defpath))
     exts = ['']
     if platform_info().has_path_ext:
@@ -76,6 +113,16 @@ def convert_args(args, base_dirs=None):
     return [convert(i) for i in args]
 
 
+def _command_name(args):
+    if isinstance(args, str):
+        args = args.split(' ', 1)
+    return os.path.basename(args[0]) if args else ''
+
+
+def _command_line(args):
+    return args if isinstance(args, str) else join(args)
+
+
 def execute(args, *, shell=False, env=None, base_dirs=None, stdout=Mode.normal,
             stderr=Mode.normal, returncode=0):
     if not shell:
@@ -84,10 +131,20 @@ def execute(args, *, shell=False, env=None, base_dirs=None, stdout=Mode.normal,
     def conv_mode(mode):
         return mode.value if isinstance(mode, Mode) else mode
 
-    proc = subprocess.run(
-        args, universal_newlines=True, shell=shell, env=env,
-        stdout=conv_mode(stdout), stderr=conv_mode(stderr)
-    )
+    def command_line():
+        return _command_line(args)
+
+    if profiler.enabled():
+        span = profiler.span(_command_name(args), 'execute',
+                             command=command_line())
+    else:
+        span = profiler.span(_command_name(args), 'execute')
+
+    with span, probes.timed('exec', command_line):
+        proc = subprocess.run(
+            args, universal_newlines=True, shell=shell, env=env,
+            stdout=conv_mode(stdout), stderr=conv_mode(stderr)
+        )
     if not (returncode == 'any' or
             (returncode == 'fail' and proc.returncode != 0) or
             proc.returncode in listify(returncode)):
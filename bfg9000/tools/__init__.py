@@ -8,14 +8,96 @@ _builders = {}
 _tools = {}
 _tool_runners = {}
 
+# The modules defining each builder, tool, and tool runner. This lets us import
+# only the modules we need when looking up a builder or tool, instead of
+# importing everything in this package up front.
+_builder_modules = {
+    'c': '.c_family',
+    'c++': '.c_family',
+    'objc': '.c_family',
+    'objc++': '.c_family',
+    'f77': '.fortran',
+    'f95': '.fortran',
+    'java': '.java',
+    'scala': '.java',
+    'lex': '.lex',
+    'qrc': '.qt',
+    'qtmoc': '.qt',
+    'qtui': '.qt',
+    'rc': '.rc',
+    'yacc': '.yacc',
+}
+
+_tool_modules = {
+    'archiver': '.internal',
+    'bfg9000': '.internal',
+    'copy': '.copy_file',
+    'cxxmoduledep': '.internal',
+    'depfixer': '.internal',
+    'doppel': '.doppel',
+    'fortrandep': '.internal',
+    'hardlink': '.copy_file',
+    'install_name_tool': '.install_name_tool',
+    'installer': '.internal',
+    'jvmoutput': '.internal',
+    'lua': '.scripts',
+    'mkdir_p': '.mkdir_p',
+    'patchelf': '.patchelf',
+    'perl': '.scripts',
+    'pkg_config': '.pkg_config',
+    'python': '.scripts',
+    'rccdep': '.internal',
+    'reflink': '.copy_file',
+    'restat': '.internal',
+    'rm': '.rm',
+    'ruby': '.scripts',
+    'setenv': '.setenv',
+    'symlink': '.copy_file',
+}
+
+_tool_runner_modules = {
+    'lua': '.scripts',
+    'perl': '.scripts',
+    'python': '.scripts',
+    'ruby': '.scripts',
+}
+
+
+# The modules defining languages and formats. These are imported the first
+# time a language or format is looked up; see `bfg9000.languages`.
+_language_modules = [
+    '.c_family',
+    '.fortran',
+    '.java',
+    '.lex',
+    '.qt',
+    '.rc',
+    '.scripts',
+    '.yacc',
+]
+
+
+@memoize
+def init_languages():
+    for i in _language_modules:
+        importlib.import_module(i, __package__)
+
 
 @memoize
 def init():
-    # Import all the packages in this directory so their hooks get run.
+    # Import all the packages in this directory so their hooks get run. This
+    # is only necessary to define all the known languages; builders and tools
+    # are imported lazily as needed.
     for _, name, _ in pkgutil.walk_packages(__path__, '.'):
         importlib.import_module(name, __package__)
 
 
+def _lazy_get(registry, modules, name):
+    if name not in registry and name in modules:
+        importlib.import_module(modules[name], __package__)
+    return registry[name]
+
+
 def builder(*args):
     if len(args) == 0:  # pragma: no cover
         raise TypeError('must provide at least one language')
@@ -30,7 +112,7 @@ def builder(*args):
 
 def get_builder(env, lang):
     try:
-        fn, multi = _builders[lang]
+        fn, multi = _lazy_get(_builders, _builder_modules, lang)
     except KeyError:
         raise ToolNotFoundError('unknown language {!r}'.format(lang))
     return fn(env, lang) if multi else fn(env)
@@ -47,13 +129,14 @@ def tool(name, lang=None):
 
 def get_tool(env, name):
     try:
-        return _tools[name](env)
+        fn = _lazy_get(_tools, _tool_modules, name)
     except KeyError:
         raise ToolNotFoundError('unknown tool {!r}'.format(name))
+    return fn(env)
 
 
 def get_tool_runner(lang):
     try:
-        return _tool_runners[lang]
+        return _lazy_get(_tool_runners, _tool_runner_modules, lang)
     except KeyError:
         raise ToolNotFoundError('unknown tool runner {!r}'.format(lang))
@@ -1,17 +1,16 @@
 import os
 from itertools import chain
 
-from .. import options as opts, safe_str, shell
+from .. import options as opts, probes, safe_str, shell
 from .common import library_macro, SimpleBuildCommand
 from ..file_types import StaticLibrary
 from ..iterutils import iterate
-from ..objutils import memoize
 from ..path import Path
 from ..versioning import detect_version
 
 
 class ArLinker(SimpleBuildCommand):
-    @memoize
+    @probes.memoize
     def _check_version(self):
         try:
             output = self.env.execute(
@@ -76,6 +75,13 @@ class ArLinker(SimpleBuildCommand):
             cmd, iterate(flags), [output], iterate(input)
         ))
 
+    def rspfile_arg(self, rspfile):
+        # GNU ar supports response files, but other implementations (e.g.
+        # macOS's) generally don't.
+        if self.brand == 'gnu':
+            return safe_str.jbos('@', rspfile)
+        return None
+
     def output_file(self, name, step):
         head, tail = os.path.split(name)
         path = os.path.join(head, 'lib' + tail + '.a')
@@ -13,7 +13,8 @@ with known_langs.make('c') as x:
 
 with known_langs.make('c++') as x:
     x.vars(compiler='CXX', flags='CXXFLAGS')
-    x.exts(source=['.cpp', '.cc', '.cp', '.cxx', '.CPP', '.c++', '.C'],
+    x.exts(source=['.cpp', '.cc', '.cp', '.cxx', '.CPP', '.c++', '.C',
+                   '.cppm', '.ixx', '.mpp', '.cxxm', '.c++m'],
            header=['.hpp', '.hh', '.hp', '.hxx', '.HPP', '.h++', '.H'])
     x.auxexts(header=['.h'])
 
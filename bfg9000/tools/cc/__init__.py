@@ -195,7 +195,7 @@ class CcPackageResolver:
         for base in search_dirs:
             if base.root != Root.absolute:
                 raise ValueError('expected an absolute path')
-            if exists(base.append(name)):
+            if self.env.dir_index.exists(base.append(name)):
                 return HeaderDirectory(base, None, system=True)
 
         raise PackageResolutionError("unable to find header '{}'".format(name))
@@ -227,7 +227,7 @@ class CcPackageResolver:
                 raise ValueError('expected an absolute path')
             for libname, libkind, extra_kwargs in libnames:
                 fullpath = base.append(libname)
-                if exists(fullpath):
+                if self.env.dir_index.exists(fullpath):
                     return libkind(fullpath, format=self.builder.object_format,
                                    **extra_kwargs)
 
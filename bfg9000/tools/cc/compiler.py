@@ -4,7 +4,7 @@ from ... import options as opts, safe_str
 from .flags import optimize_flags
 from ..common import BuildCommand
 from ...file_types import ObjectFile, PrecompiledHeader
-from ...iterutils import iterate
+from ...iterutils import iterate, listify
 from ...path import Path
 from ...versioning import SpecifierSet
 
@@ -14,6 +14,10 @@ class CcBaseCompiler(BuildCommand):
     def deps_flavor(self):
         return None if self.lang in ('f77', 'f95') else 'gcc'
 
+    @property
+    def module_flavor(self):
+        return 'fortran' if self.lang in ('f77', 'f95') else None
+
     @property
     def needs_libs(self):
         return False
@@ -25,12 +29,17 @@ class CcBaseCompiler(BuildCommand):
     def search_dirs(self, strict=False):
         return self.env.variables.getpaths('CPATH')
 
-    def _call(self, cmd, input, output, deps=None, flags=None):
+    def _call(self, cmd, input, output, deps=None, flags=None, modules=False):
         result = list(chain(
-            cmd, self._always_flags, iterate(flags), ['-c', input]
+            cmd, self._always_flags, iterate(flags),
+            ['-fmodules-ts'] if modules else [], ['-c', input]
         ))
         if deps:
             result.extend(['-MMD', '-MF', deps])
+            # Don't write rules for module interfaces to the depfile; we get
+            # those from scanning instead, and Ninja can't parse them anyway.
+            if modules:
+                result.append('-Mno-modules')
         result.extend(['-o', output])
         return result
 
@@ -117,6 +126,27 @@ class CcCompiler(CcBaseCompiler):
     def accepts_pch(self):
         return True
 
+    @property
+    def module_flavor(self):
+        # GCC 14 added support for scanning C++ sources for the modules they
+        # provide and require, using the P1689 format.
+        if ( self.lang == 'c++' and self.brand == 'gcc' and self.version and
+             self.version in SpecifierSet('>=14') ):
+            return 'p1689'
+        return super().module_flavor
+
+    def scan_modules(self, input, output, target, deps=None, flags=None, *,
+                     cmd=None):
+        result = list(chain(
+            listify(cmd or self), self._always_flags, iterate(flags),
+            ['-fmodules-ts', '-E', input]
+        ))
+        if deps:
+            result.extend(['-MT', output, '-MMD', '-MF', deps])
+        result.extend(['-fdeps-format=p1689r5', '-fdeps-file=' + output,
+                       '-fdeps-target=' + target, '-o', output + '.ii'])
+        return result
+
     def default_name(self, input, step):
         return input.path.stripext().suffix
 
@@ -107,6 +107,9 @@ class CcLinker(BuildCommand):
             iterate(libs), ['-o', output]
         ))
 
+    def rspfile_arg(self, rspfile):
+        return safe_str.jbos('@', rspfile)
+
     @property
     def _always_flags(self):
         if self.builder.object_format == 'mach-o':
@@ -149,6 +149,11 @@ class BuildCommand(Command):
     def post_install(self, options, output, step):
         return None
 
+    def rspfile_arg(self, rspfile):
+        # The argument to pass a response file containing this command's
+        # inputs, or None if the command doesn't support response files.
+        return None
+
 
 class SimpleBuildCommand(BuildCommand):
     def __init__(self, builder, env, *, command, flags):
@@ -1,5 +1,6 @@
 from . import tool
 from .common import SimpleCommand
+from ..safe_str import shell_literal
 
 
 class LinkCommand(SimpleCommand):
@@ -37,6 +38,12 @@ class Hardlink(LinkCommand):
         super().__init__(env, name='hardlink', env_var='HARDLINK',
                          default=default)
 
+    def _call(self, cmd, input, output):
+        # Hard links can't cross filesystems, so fall back to copying the
+        # file if we can't link it.
+        return (super()._call(cmd, input, output) + [shell_literal('||')] +
+                self.env.tool('copy')(input, output))
+
 
 @tool('copy')
 class Copy(SimpleCommand):
@@ -47,3 +54,19 @@ class Copy(SimpleCommand):
 
     def _call(self, cmd, input, output):
         return cmd + [input, output]
+
+
+@tool('reflink')
+class Reflink(SimpleCommand):
+    def __init__(self, env):
+        if env.host_platform.family == 'windows':
+            default = 'cmd /c copy'
+        elif env.host_platform.genus == 'linux':
+            default = 'cp -f --reflink=auto'
+        else:
+            default = 'cp -f'
+        super().__init__(env, name='reflink', env_var='REFLINK',
+                         default=default)
+
+    def _call(self, cmd, input, output):
+        return cmd + [input, output]
@@ -1,9 +1,26 @@
 from . import tool
-from .common import SimpleCommand
+from .common import not_buildroot, SimpleCommand
+from ..iterutils import listify
 from ..safe_str import shell_literal
 from ..shell import shell_list
 
 
+@tool('archiver')
+class Archiver(SimpleCommand):
+    def __init__(self, env):
+        super().__init__(env, name='archiver', env_var='ARCHIVER',
+                         default=env.bfgdir.append('bfg9000-archive'))
+
+    def _call(self, cmd, manifest, output, directory=None, format=None,
+              dest_prefix=None):
+        result = cmd + ['-f', format]
+        if not_buildroot(directory):
+            result.extend(['-C', directory])
+        if dest_prefix:
+            result.extend(['-P', dest_prefix])
+        return result + [manifest, output]
+
+
 @tool('bfg9000')
 class Bfg9000(SimpleCommand):
     def __init__(self, env):
@@ -14,6 +31,16 @@ class Bfg9000(SimpleCommand):
         return cmd + ['refresh', builddir]
 
 
+@tool('cxxmoduledep')
+class CxxModuleDep(SimpleCommand):
+    def __init__(self, env):
+        super().__init__(env, name='cxxmoduledep', env_var='CXXMODULEDEP',
+                         default=env.bfgdir.append('bfg9000-cxxmoduledep'))
+
+    def _call(self, cmd, files, output, format='ninja'):
+        return cmd + ['-f', format, '-o', output] + listify(files)
+
+
 @tool('depfixer')
 class Depfixer(SimpleCommand):
     def __init__(self, env):
@@ -25,6 +52,31 @@ class Depfixer(SimpleCommand):
                                  shell_literal('>>'), depfile])
 
 
+@tool('fortrandep')
+class FortranDep(SimpleCommand):
+    def __init__(self, env):
+        super().__init__(env, name='fortrandep', env_var='FORTRANDEP',
+                         default=env.bfgdir.append('bfg9000-fortrandep'))
+
+    def _call(self, cmd, files, output, format='ninja'):
+        return cmd + ['-f', format, '-o', output] + listify(files)
+
+
+@tool('installer')
+class Installer(SimpleCommand):
+    def __init__(self, env):
+        super().__init__(env, name='installer', env_var='INSTALLER',
+                         default=env.bfgdir.append('bfg9000-install'))
+
+    def _call(self, cmd, action, plan, manifest, roots=[], target_roots=[]):
+        result = cmd + ['-m', manifest]
+        for name, root in roots:
+            result.extend(['-r', name, root])
+        for name, root in target_roots:
+            result.extend(['-t', name, root])
+        return result + [action, plan]
+
+
 @tool('jvmoutput')
 class JvmOutput(SimpleCommand):
     def __init__(self, env):
@@ -43,3 +95,15 @@ class RccDep(SimpleCommand):
 
     def _call(self, cmd, subcmd, depfile):
         return cmd + subcmd + ['-d', depfile]
+
+
+@tool('restat')
+class Restat(SimpleCommand):
+    def __init__(self, env):
+        # Don't name our command variable `restat`, since that's a reserved
+        # variable in Ninja rules.
+        super().__init__(env, name='restat_cmd', env_var='RESTAT',
+                         default=env.bfgdir.append('bfg9000-restat'))
+
+    def _call(self, cmd, subcmd, outputs):
+        return cmd + listify(outputs) + ['--'] + subcmd
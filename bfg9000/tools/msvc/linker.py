@@ -58,6 +58,9 @@ class MsvcLinker(BuildCommand):
             iterate(libs), ['/OUT:' + output]
         ))
 
+    def rspfile_arg(self, rspfile):
+        return safe_str.jbos('@', rspfile)
+
     @property
     def _always_flags(self):
         return ['/nologo']
@@ -215,6 +218,9 @@ class MsvcStaticLinker(SimpleBuildCommand):
             cmd, iterate(flags), iterate(input), ['/OUT:' + output]
         ))
 
+    def rspfile_arg(self, rspfile):
+        return safe_str.jbos('@', rspfile)
+
     def compile_options(self, step):
         return self.forwarded_compile_options(step)
 
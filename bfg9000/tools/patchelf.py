@@ -8,6 +8,9 @@ from ..path import BasePath, InstallRoot, Root
 
 @tool('patchelf')
 class PatchElf(SimpleCommand):
+    # patchelf can apply the same changes to several files at once.
+    batch_files = True
+
     def __init__(self, env):
         super().__init__(env, name='patchelf', env_var='PATCHELF',
                          default='patchelf')
@@ -4,7 +4,7 @@ import subprocess
 
 from . import tool
 from .common import SimpleCommand
-from .. import log, options as opts, shell
+from .. import log, options as opts, probes, shell
 from ..exceptions import PackageResolutionError, PackageVersionError
 from ..objutils import memoize
 from ..packages import Package, PackageKind
@@ -51,6 +51,51 @@ class PkgConfig(SimpleCommand):
             result.append('--msvc-syntax')
         return result
 
+    @memoize
+    def _default_path(self):
+        try:
+            return shell.split_paths(self.env.execute(
+                self.command + ['--variable=pc_path', 'pkg-config'],
+                stdout=shell.Mode.pipe, stderr=shell.Mode.devnull
+            ).strip())
+        except (OSError, shell.CalledProcessError):
+            return None
+
+    @staticmethod
+    @memoize
+    def _path_stamp(path):
+        # Get the latest modification time of a directory and the `.pc` files
+        # in it, so we can tell when a package has been changed.
+        try:
+            stamp = os.stat(path).st_mtime_ns
+            for i in os.scandir(path):
+                if i.name.endswith('.pc'):
+                    stamp = max(stamp, i.stat().st_mtime_ns)
+            return stamp
+        except OSError:
+            return None
+
+    def _persist_key(self, command, extra_env=None):
+        # pkg-config's results depend on its environment variables and on the
+        # `.pc` files it can find, so include all of those in the key.
+        env = dict(self.env.variables, **(extra_env or {}))
+        if 'PKG_CONFIG_LIBDIR' in env:
+            path = shell.split_paths(env['PKG_CONFIG_LIBDIR'])
+        else:
+            path = self._default_path()
+            if path is None:
+                return None
+        path = shell.split_paths(env.get('PKG_CONFIG_PATH')) + path
+
+        return [command,
+                {k: v for k, v in env.items() if k.startswith('PKG_CONFIG')},
+                [[i, self._path_stamp(i)] for i in path]]
+
+    @probes.memoize(persist=_persist_key)
+    def _execute(self, command, extra_env=None):
+        return self.env.execute(command, stdout=shell.Mode.pipe,
+                                stderr=shell.Mode.devnull, extra_env=extra_env)
+
     def run(self, name, type, *args, extra_env=None, installed=None, **kwargs):
         if installed is True:
             extra_env = dict(PKG_CONFIG_DISABLE_UNINSTALLED='1',
@@ -58,8 +103,9 @@ class PkgConfig(SimpleCommand):
         elif installed is False:
             name += '-uninstalled'
 
-        result = super().run(name, type, *args, extra_env=extra_env,
-                             **kwargs).strip()
+        command = self.convert_args(self(name, type, *args, **kwargs),
+                                    lambda x: x.command)
+        result = self._execute(command, extra_env).strip()
         if self._options[type][1]:
             return self._options[type][1](result)
         return result
@@ -83,10 +129,11 @@ class PkgConfigPackage(Package):
         self.specifier = specifier
         self.static = kind == PackageKind.static
 
-    @memoize
+    @probes.memoize(maxsize=1024)
     def _call(self, *args, extra_env=None, **kwargs):
         final_env = dict(**self._env, **extra_env) if extra_env else self._env
-        return self._pkg_config.run(*args, extra_env=final_env, **kwargs)
+        with probes.caller('package {!r}'.format(self.name)):
+            return self._pkg_config.run(*args, extra_env=final_env, **kwargs)
 
     def _get_rpaths(self):
         extra_env = {'PKG_CONFIG_ALLOW_SYSTEM_LIBS': '1'}
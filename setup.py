@@ -178,9 +178,14 @@ setup(
         'console_scripts': [
             'bfg9000=bfg9000.driver:main',
             '9k=bfg9000.driver:simple_main',
+            'bfg9000-archive=bfg9000.archiver:main',
+            'bfg9000-cxxmoduledep=bfg9000.cxxmoduledep:main',
             'bfg9000-depfixer=bfg9000.depfixer:main',
+            'bfg9000-fortrandep=bfg9000.fortrandep:main',
+            'bfg9000-install=bfg9000.installer:main',
             'bfg9000-jvmoutput=bfg9000.jvmoutput:main',
             'bfg9000-rccdep=bfg9000.rccdep:main',
+            'bfg9000-restat=bfg9000.restat:main',
         ],
         'bfg9000.backends': [
             'make=bfg9000.backends.make.writer',
@@ -2,6 +2,7 @@ import functools
 import itertools
 import unittest
 
+from bfg9000 import tools
 from bfg9000.environment import Environment, EnvVarDict
 from bfg9000.path import abspath, InstallRoot
 
@@ -10,6 +11,10 @@ __all__ = ['load_tests', 'make_env', 'parameterize_tests', 'skip_if',
 
 
 def make_env(platform=None, clear_variables=False, variables={}):
+    # bfg9000 only imports tools as needed, but tests often use tools (and the
+    # builtins they depend on) directly, so make sure they're all defined.
+    tools.init()
+
     args = (abspath('bfgdir'), None, None, abspath('srcdir'),
             abspath('builddir'))
     if platform:
@@ -0,0 +1,81 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+__all__ = ['Benchmark', 'main', 'peak_rss_command', 'python_cmd', 'time_call',
+           'time_command']
+
+
+def python_cmd(module, func='main'):
+    # Run an entry point via the current Python interpreter so that we
+    # benchmark the same installation the tests are using.
+    return [sys.executable, '-c', (
+        'import sys; from {0} import {1}; sys.exit({1}())'.format(module, func)
+    )]
+
+
+def time_command(args, repeat, input=None):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, input=input, universal_newlines=True,
+                       stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def peak_rss_command(args, repeat):
+    # Get the peak resident set size (in bytes) of each run. This uses
+    # `os.wait4`, so it only works on POSIX systems.
+    scale = 1 if sys.platform == 'darwin' else 1024
+    sizes = []
+    for i in range(repeat):
+        proc = subprocess.Popen(args, stdout=subprocess.DEVNULL)
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.WEXITSTATUS(status)
+        if not os.WIFEXITED(status) or proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, args)
+        sizes.append(usage.ru_maxrss * scale)
+    return sizes
+
+
+def time_call(fn, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+class Benchmark:
+    def __init__(self, name, fn, unit='ms', scale=1000):
+        self.name = name
+        self.fn = fn
+        self.unit = unit
+        self.scale = scale
+
+    def run(self, repeat):
+        values = [i * self.scale for i in self.fn(repeat)]
+        return min(values), statistics.median(values)
+
+
+def main(description, benchmarks, default_repeat=10):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-r', '--repeat', type=int, default=default_repeat,
+                        help='number of times to run each benchmark ' +
+                        '(default: %(default)s)')
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help='benchmarks to run (default: all)')
+    args = parser.parse_args()
+
+    for b in benchmarks:
+        if args.names and b.name not in args.names:
+            continue
+        best, median = b.run(args.repeat)
+        print('{0:<24} best: {1:8.1f} {3:<3} median: {2:8.1f} {3}'.format(
+            b.name, best, median, b.unit
+        ))
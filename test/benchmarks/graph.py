@@ -0,0 +1,43 @@
+# Measure how long it takes to configure a project with a large build graph.
+# Run this via `python -m test.benchmarks.graph` from the root of the source
+# tree.
+
+import os
+import tempfile
+
+from . import Benchmark, main, python_cmd, time_command
+
+bfg9000 = python_cmd('bfg9000.driver')
+
+build_bfg = """
+srcs = ['src{{}}.c'.format(i) for i in range({count})]
+objs = object_files(srcs)
+for i in srcs:
+    objs[i]
+executable('prog', objs)
+"""
+
+
+def bench_configure(count):
+    def bench(repeat):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            srcdir = os.path.join(tmpdir, 'src')
+            os.mkdir(srcdir)
+            with open(os.path.join(srcdir, 'build.bfg'), 'w') as f:
+                f.write(build_bfg.format(count=count))
+
+            return time_command(bfg9000 + [
+                'configure-into', '--backend=make', srcdir,
+                os.path.join(tmpdir, 'build')
+            ], repeat)
+    return bench
+
+
+benchmarks = [
+    Benchmark('configure 1000 objects', bench_configure(1000)),
+    Benchmark('configure 10000 objects', bench_configure(10000)),
+]
+
+if __name__ == '__main__':
+    main('measure configuration time for large build graphs', benchmarks,
+         default_repeat=3)
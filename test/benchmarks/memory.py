@@ -0,0 +1,45 @@
+# Measure how much memory it takes to configure a project with a large number
+# of files. Run this via `python -m test.benchmarks.memory` from the root of
+# the source tree.
+
+import os
+import tempfile
+
+from . import Benchmark, main, peak_rss_command, python_cmd
+
+bfg9000 = python_cmd('bfg9000.driver')
+
+build_bfg = """
+srcs = ['dir{{}}/src{{}}.c'.format(i // 100, i) for i in range({count})]
+lib = static_library('lib', srcs[1:])
+executable('prog', srcs[:1], libs=[lib])
+"""
+
+
+def bench_configure(count, backend):
+    def bench(repeat):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            srcdir = os.path.join(tmpdir, 'src')
+            os.mkdir(srcdir)
+            with open(os.path.join(srcdir, 'build.bfg'), 'w') as f:
+                f.write(build_bfg.format(count=count))
+
+            return peak_rss_command(bfg9000 + [
+                'configure-into', '--backend=' + backend, srcdir,
+                os.path.join(tmpdir, 'build')
+            ], repeat)
+    return bench
+
+
+benchmarks = [
+    Benchmark('configure 10000 files', bench_configure(10000, 'make'),
+              'MiB', 1 / 2**20),
+    Benchmark('configure 100000 files', bench_configure(100000, 'make'),
+              'MiB', 1 / 2**20),
+    Benchmark('configure 100000 (ninja)', bench_configure(100000, 'ninja'),
+              'MiB', 1 / 2**20),
+]
+
+if __name__ == '__main__':
+    main('measure peak memory usage when configuring large projects',
+         benchmarks, default_repeat=1)
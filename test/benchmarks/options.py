@@ -0,0 +1,45 @@
+# Measure how long it takes to build up large option lists. Run this via
+# `python -m test.benchmarks.options` from the root of the source tree.
+
+from . import Benchmark, main, time_call
+
+from bfg9000 import options as opts
+from bfg9000.file_types import HeaderDirectory
+from bfg9000.path import Path
+
+count = 5000
+
+include_dirs = [opts.include_dir(HeaderDirectory(Path('include{}'.format(i))))
+                for i in range(count)]
+defines = [opts.define('NAME{}'.format(i), str(i)) for i in range(count)]
+
+
+def bench_collect(repeat):
+    return time_call(lambda: opts.option_list(include_dirs, defines), repeat)
+
+
+def bench_duplicates(repeat):
+    return time_call(lambda: opts.option_list(include_dirs, include_dirs),
+                     repeat)
+
+
+def bench_add(repeat):
+    lists = [opts.option_list(include_dirs[i:i + 100])
+             for i in range(0, count, 50)]
+
+    def add():
+        result = opts.option_list()
+        for i in lists:
+            result += i
+    return time_call(add, repeat)
+
+
+benchmarks = [
+    Benchmark('collect {} options'.format(count * 2), bench_collect),
+    Benchmark('collect duplicates', bench_duplicates),
+    Benchmark('add overlapping lists', bench_add),
+]
+
+if __name__ == '__main__':
+    main('measure the performance of option lists', benchmarks,
+         default_repeat=3)
@@ -0,0 +1,39 @@
+# Measure the startup time of bfg9000's command-line tools. Run this via
+# `python -m test.benchmarks.startup` from the root of the source tree.
+
+import tempfile
+
+from . import Benchmark, main, python_cmd, time_command
+
+from bfg9000.environment import Environment
+from bfg9000.path import abspath, InstallRoot
+
+bfg9000 = python_cmd('bfg9000.driver')
+depfixer = python_cmd('bfg9000.depfixer')
+
+depfile = 'foo.o: foo.c foo.h \\\n  bar.h\n'
+
+
+def make_builddir(path):
+    env = Environment(abspath(path), 'make', None, abspath('.'),
+                      abspath(path))
+    env.finalize({InstallRoot.prefix: abspath('prefix')}, (True, False))
+    env.save(path)
+
+
+def bench_env(repeat):
+    with tempfile.TemporaryDirectory() as builddir:
+        make_builddir(builddir)
+        return time_command(bfg9000 + ['env', builddir], repeat)
+
+
+benchmarks = [
+    Benchmark('bfg9000 --version',
+              lambda n: time_command(bfg9000 + ['--version'], n)),
+    Benchmark('bfg9000 env', bench_env),
+    Benchmark('bfg9000-depfixer',
+              lambda n: time_command(depfixer, n, input=depfile)),
+]
+
+if __name__ == '__main__':
+    main('measure the startup time of bfg9000', benchmarks)
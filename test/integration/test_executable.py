@@ -1,3 +1,4 @@
+import glob
 import tarfile
 from os.path import join as pjoin
 
@@ -24,16 +25,21 @@ class TestExecutable(IntegrationTest):
 
         self.clean()
         files = {
-            'ninja': {'.bfg_environ', '.ninja_deps', '.ninja_log',
-                      'build.ninja'},
-            'make': {'.bfg_environ', 'Makefile', pjoin('simple.int', '.dir')},
+            'ninja': {'.bfg_environ', '.bfg_dist_manifest', '.bfg_graph',
+                      '.ninja_deps', '.ninja_log', 'build.ninja'},
+            'make': {'.bfg_environ', '.bfg_dist_manifest', '.bfg_graph',
+                     'Makefile', 'Makefile.stamp',
+                     pjoin('simple.int', '.dir')},
             'msbuild': {
-                '.bfg_environ', '.bfg_uuid', 'simple.sln',
+                '.bfg_environ', '.bfg_graph', '.bfg_uuid', 'simple.sln',
                 pjoin('simple', 'simple.vcxproj'),
                 pjoin('simple', 'Default', 'simple.Build.CppClean.log')
             },
         }
-        self.assertDirectory('.', files[self.backend])
+        # Compiled build scripts are cached under a hash of their path.
+        cached = set(glob.glob(pjoin('.bfg_cache', '*.bfgc')))
+        cached.add(pjoin('.bfg_cache', 'memoize.json'))
+        self.assertDirectory('.', files[self.backend] | cached)
 
     @skip_if_backend('msbuild')
     def test_dist(self):
@@ -63,6 +63,15 @@ class TestInstall(IntegrationTest):
             'hello from static a!\nhello from static b!\n'
         )
 
+    @skip_if_backend('msbuild')
+    def test_reinstall(self):
+        self.build('install')
+        header = pjoin(self.includedir, 'myproject', 'shared_a.hpp')
+        mtime = os.stat(header).st_mtime_ns
+        self.build('install')
+        self._check_installed()
+        self.assertEqual(os.stat(header).st_mtime_ns, mtime)
+
     @skip_if_backend('msbuild')
     def test_uninstall(self):
         self.build('install')
@@ -8,6 +8,7 @@ from bfg9000.backends.make.syntax import *
 from bfg9000.backends.make.syntax import syntax_string
 from bfg9000.file_types import File
 from bfg9000.platforms.host import platform_info
+from bfg9000.versioning import Version
 
 esc_colon = ':' if platform_info().family == 'windows' else '\\:'
 
@@ -558,6 +559,13 @@ class TestSilent(TestCase):
         self.assertIs(Silent(v).data, v)
 
 
+class TestFeatures(TestCase):
+    def test_supported(self):
+        self.assertTrue(features.supported('file_function', Version('4.0')))
+        self.assertFalse(features.supported('file_function', Version('3.81')))
+        self.assertFalse(features.supported('file_function', None))
+
+
 class TestMakefile(TestCase):
     def setUp(self):
         self.makefile = Makefile('build.bfg')
@@ -679,6 +687,20 @@ class TestMakefile(TestCase):
         self.assertEqual(out.stream.getvalue(),
                          'empty-target:\n\n')
 
+        self.makefile.rule(['group1', 'group2'], recipe=['cmd'], grouped=True)
+        out = self.makefile.writer(StringIO())
+        self.makefile._write_rule(out, self.makefile._rules[-1])
+        self.assertEqual(out.stream.getvalue(),
+                         'group1 group2 &:\n'
+                         '\tcmd\n\n')
+
+        self.makefile.rule('group3', recipe=['cmd'], grouped=True)
+        out = self.makefile.writer(StringIO())
+        self.makefile._write_rule(out, self.makefile._rules[-1])
+        self.assertEqual(out.stream.getvalue(),
+                         'group3:\n'
+                         '\tcmd\n\n')
+
         # Test duplicate targets.
         self.assertRaises(ValueError, self.makefile.rule, 'target')
         self.assertRaises(ValueError, self.makefile.rule,
@@ -716,3 +738,46 @@ class TestMakefile(TestCase):
             'include inc1\n'
             '-include inc2\n'
         )
+
+    def test_write_pattern_rules(self):
+        Path = path.Path
+        makefile = Makefile('build.bfg', gnu=True, pattern_rules=True)
+        out = StringIO()
+        makefile.write(out)
+        base_makefile = out.getvalue()
+
+        out = StringIO()
+        for i in ('foo', 'bar', 'sub/baz', 'sub/quux'):
+            makefile.rule(Path(i + '.o'), [Path(i + '.c', path.Root.srcdir)],
+                          [Path(i).parent().append('.dir')],
+                          Call('RULE_CC'), {'CFLAGS': '-O2'})
+        makefile.rule(Path('other.o'), [Path('other.c', path.Root.srcdir)],
+                      recipe=Call('RULE_CC'))
+        makefile.rule(Path('lib'), [Path('foo.o'), Path('bar.o')],
+                      recipe=['link'])
+        makefile.write(out)
+
+        self.assertEqual(
+            out.getvalue(),
+            base_makefile +
+            'foo.o bar.o: CFLAGS := -O2\n'
+            'foo.o bar.o: %.o: $(srcdir)/%.c | .dir ; $(call RULE_CC)\n\n'
+            'sub/baz.o sub/quux.o: CFLAGS := -O2\n'
+            'sub/baz.o sub/quux.o: sub/%.o: $(srcdir)/sub/%.c | sub/.dir ; '
+            '$(call RULE_CC)\n\n'
+            'other.o: $(srcdir)/other.c ; $(call RULE_CC)\n\n'
+            'lib: foo.o bar.o\n'
+            '\tlink\n\n'
+        )
+
+    def test_write_pattern_rules_non_gnu(self):
+        Path = path.Path
+        makefile = Makefile('build.bfg', pattern_rules=True)
+        for i in ('foo', 'bar'):
+            makefile.rule(Path(i + '.o'), [Path(i + '.c', path.Root.srcdir)],
+                          recipe=Call('RULE_CC'))
+        out = StringIO()
+        makefile.write(out)
+        self.assertIn('foo.o: $(srcdir)/foo.c ; $(call RULE_CC)\n\n'
+                      'bar.o: $(srcdir)/bar.c ; $(call RULE_CC)\n\n',
+                      out.getvalue())
@@ -1,8 +1,14 @@
+import os
+import tempfile
 from unittest import mock
 
 from ... import *
 
-from bfg9000.backends.make.writer import version
+from bfg9000.backends.make.syntax import Makefile
+from bfg9000.backends.make.writer import (discovered_deps, multitarget_rule,
+                                          version)
+from bfg9000.build_inputs import BuildInputs
+from bfg9000.path import Path, Root
 from bfg9000.versioning import Version
 
 
@@ -35,3 +41,60 @@ class TestMakeVersion(TestCase):
         with mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_bad_execute):  # noqa
             self.assertEqual(version({}), None)
+
+
+class TestMultitargetRule(TestCase):
+    def setUp(self):
+        self.build_inputs = BuildInputs(make_env(),
+                                        Path('build.bfg', Root.srcdir))
+        self.makefile = Makefile(None)
+
+    def test_single(self):
+        env = AttrDict(backend_version=Version('4.3'))
+        multitarget_rule(self.build_inputs, self.makefile, env, ['foo'],
+                         ['dep'], recipe=['cmd'])
+        self.assertEqual(len(self.makefile._rules), 1)
+        self.assertEqual(self.makefile._rules[0].targets, ['foo'])
+        self.assertEqual(self.makefile._rules[0].grouped, False)
+
+    def test_grouped(self):
+        env = AttrDict(backend_version=Version('4.3'))
+        multitarget_rule(self.build_inputs, self.makefile, env,
+                         ['foo', 'bar'], ['dep'], recipe=['cmd'])
+        self.assertEqual(len(self.makefile._rules), 1)
+        rule = self.makefile._rules[0]
+        self.assertEqual(rule.targets, ['foo', 'bar'])
+        self.assertEqual(rule.deps, ['dep'])
+        self.assertEqual(rule.recipe, ['cmd'])
+        self.assertEqual(rule.grouped, True)
+        self.assertEqual(list(self.build_inputs.targets()), [])
+
+    def test_stamp(self):
+        env = AttrDict(backend_version=Version('4.2'))
+        multitarget_rule(self.build_inputs, self.makefile, env,
+                         [Path('foo'), Path('bar')], ['dep'], recipe=['cmd'])
+        self.assertEqual(len(self.makefile._rules), 2)
+        stamp = Path('foo.stamp')
+        self.assertEqual(self.makefile._rules[0].targets,
+                         [Path('foo'), Path('bar')])
+        self.assertEqual(self.makefile._rules[0].deps, [stamp])
+        self.assertEqual(self.makefile._rules[1].targets, [stamp])
+        self.assertEqual(self.makefile._rules[1].grouped, False)
+        self.assertEqual([i.path for i in self.build_inputs.targets()],
+                         [stamp])
+
+
+class TestDiscoveredDeps(TestCase):
+    def test_discovered_deps(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.mkdir(os.path.join(tmpdir, 'sub'))
+            with open(os.path.join(tmpdir, 'foo.o.d'), 'w') as f:
+                f.write('foo.o: ../foo.c ../foo.h\n')
+            with open(os.path.join(tmpdir, 'sub', 'bar.o.d'), 'w') as f:
+                f.write('bar.o: ../bar.c')
+
+            env = AttrDict(builddir=Path(tmpdir, Root.absolute))
+            self.assertEqual(
+                discovered_deps(env, ['foo.o', 'sub/bar.o', 'baz.o']),
+                {'foo.o': ['../foo.c', '../foo.h']}
+            )
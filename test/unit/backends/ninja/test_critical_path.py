@@ -0,0 +1,181 @@
+import os
+import tempfile
+from io import StringIO
+
+from ... import *
+
+from bfg9000 import build_graph
+from bfg9000.backends.ninja import critical_path
+from bfg9000.backends.ninja.syntax import NinjaFile
+from bfg9000.file_types import ObjectFile, SourceFile
+from bfg9000.path import Path, Root
+
+
+def ninja_log(*entries, version=5):
+    return ''.join(
+        ['# ninja log v{}\n'.format(version)] +
+        ['{}\t{}\t0\t{}\tdeadbeef\n'.format(start, end, output)
+         for start, end, output in entries]
+    )
+
+
+class TestReadLog(TestCase):
+    def read(self, data):
+        return critical_path.read_log(StringIO(data))
+
+    def test_empty(self):
+        self.assertEqual(self.read(''), {})
+        self.assertEqual(self.read(ninja_log()), {})
+
+    def test_entries(self):
+        self.assertEqual(self.read(ninja_log(
+            (0, 1500, 'foo.o'), (10, 250, 'bar.o'), (1500, 1600, 'prog')
+        )), {'foo.o': 1.5, 'bar.o': 0.24, 'prog': 0.1})
+
+    def test_latest(self):
+        self.assertEqual(self.read(ninja_log(
+            (0, 1500, 'foo.o'), (0, 500, 'foo.o')
+        )), {'foo.o': 0.5})
+
+    def test_invalid(self):
+        self.assertEqual(self.read(ninja_log((0, 1, 'foo.o'), version=4)),
+                         {})
+        self.assertEqual(self.read('garbage\n'), {})
+        self.assertEqual(self.read(
+            ninja_log((0, 1000, 'foo.o')) + 'x\ty\t0\tbar.o\thash\nbad\n'
+        ), {'foo.o': 1})
+
+
+class TestLoadLog(TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, '.ninja_log')
+            self.assertEqual(critical_path.load_log(filename), {})
+
+            with open(filename, 'w') as f:
+                f.write(ninja_log((0, 1000, 'foo.o')))
+            self.assertEqual(critical_path.load_log(filename), {'foo.o': 1})
+
+
+class TestStamp(TestCase):
+    def test_stamp(self):
+        digest = critical_path.digest('build foo: cc\n')
+        self.assertEqual(digest, critical_path.digest('build foo: cc\n'))
+        self.assertNotEqual(digest, critical_path.digest('build bar: cc\n'))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'build.ninja')
+            self.assertEqual(critical_path.read_stamp(filename), None)
+
+            with open(filename, 'w') as f:
+                f.write('build foo: cc\n')
+            self.assertEqual(critical_path.read_stamp(filename), None)
+
+            with open(filename, 'w') as f:
+                f.write(critical_path.stamp('build foo: cc\n', digest))
+            self.assertEqual(critical_path.read_stamp(filename), digest)
+
+
+class TestCriticalPath(TestCase):
+    def setUp(self):
+        self.ninjafile = NinjaFile('build.bfg')
+        self.ninjafile.rule('cc', 'cc')
+        self.ninjafile.rule('ld', 'ld')
+
+        def obj(name):
+            src = SourceFile(Path(name + '.c', Root.srcdir), 'c')
+            result = ObjectFile(Path(name + '.o'), 'elf', 'c')
+            self.ninjafile.build(result, 'cc', src)
+            return result
+
+        self.small, self.big, self.other = obj('small'), obj('big'), \
+            obj('other')
+        self.ninjafile.build(Path('libfoo.so'), 'ld', [self.big, self.other])
+        self.ninjafile.build(Path('prog'), 'ld',
+                             [self.small, Path('libfoo.so')])
+        self.ninjafile.build('all', 'phony', [Path('prog')])
+        self.timings = {'small.o': 1, 'big.o': 5, 'other.o': 2,
+                        'libfoo.so': 3, 'prog': 1}
+
+    def outputs(self, builds):
+        return [i.outputs[0] for i in builds]
+
+    def test_weigh(self):
+        weights, successors, durations = critical_path.weigh(
+            self.ninjafile.builds(), self.timings
+        )
+        self.assertEqual(weights, [2, 9, 6, 4, 1, 0])
+        self.assertEqual(successors, [4, 3, 3, 4, 5, None])
+        self.assertEqual(durations, [1, 5, 2, 3, 1, 0])
+
+    def test_weigh_unknown(self):
+        del self.timings['other.o']
+        weights, successors, durations = critical_path.weigh(
+            self.ninjafile.builds(), self.timings
+        )
+        self.assertEqual(durations, [1, 5, 2.5, 3, 1, 0])
+
+    def test_schedule(self):
+        critical_path.schedule(self.ninjafile, self.timings)
+        self.assertEqual(self.outputs(self.ninjafile.builds()), [
+            self.big, self.other, Path('libfoo.so'), self.small, Path('prog'),
+            'all',
+        ])
+
+    def test_schedule_fragments(self):
+        with self.ninjafile.fragment(Path('sub/build.ninja')):
+            self.ninjafile.build(Path('sub/quick.o'), 'cc')
+            self.ninjafile.build(Path('sub/slow.o'), 'cc')
+        self.timings.update({'sub/quick.o': 1, 'sub/slow.o': 10})
+
+        critical_path.schedule(self.ninjafile, self.timings)
+        self.assertEqual(self.outputs(self.ninjafile.builds()), [
+            self.big, self.other, Path('libfoo.so'), self.small, Path('prog'),
+            'all', Path('sub/slow.o'), Path('sub/quick.o'),
+        ])
+
+    def test_analyze(self):
+        report = critical_path.analyze(self.ninjafile.builds(), self.timings)
+        self.assertEqual(report, critical_path.Report(
+            [('big.o', 5), ('libfoo.so', 3), ('prog', 1)], 9, 12
+        ))
+
+    def test_analyze_empty(self):
+        self.assertEqual(critical_path.analyze([], {}),
+                         critical_path.Report([], 0, 0))
+
+
+class TestGraphBuilds(TestCase):
+    def test_analyze(self):
+        def node(*args):
+            return list(Path(*args).to_json())
+
+        graph = build_graph.BuildGraph({
+            'version': build_graph.version,
+            'nodes': [node('foo.c', Root.srcdir), node('foo.o'),
+                      node('bar.c', Root.srcdir), node('bar.o'), node('prog'),
+                      'all'],
+            'sources': [0, 2],
+            'bootstrap': [],
+            'edges': [
+                {'type': 'CompileSource', 'outputs': [1], 'inputs': [0],
+                 'options': []},
+                {'type': 'CompileSource', 'outputs': [3], 'inputs': [2],
+                 'options': []},
+                {'type': 'DynamicLink', 'outputs': [4], 'inputs': [1, 3],
+                 'options': []},
+                {'type': 'Alias', 'outputs': [5], 'inputs': [4],
+                 'options': []},
+            ],
+            'tests': [],
+            'test_deps': [],
+        })
+        builds = critical_path.graph_builds(graph)
+        self.assertEqual([i.rule for i in builds], [
+            'CompileSource', 'CompileSource', 'DynamicLink', 'phony',
+        ])
+        self.assertEqual(
+            critical_path.analyze(builds, {'foo.o': 2, 'bar.o': 1,
+                                           'prog': 1}),
+            critical_path.Report([('foo.o', 2), ('prog', 1)], 3, 4)
+        )
@@ -281,6 +281,17 @@ class TestNinjaFile(TestCase):
                          '  pool = console\n'
                          '  restat = 1\n')
 
+        self.ninjafile.rule('rsp_rule', ['cmd', '@out.rsp'],
+                            rspfile='out.rsp', rspfile_content=var('in'))
+        out = self.ninjafile.writer(StringIO())
+        self.ninjafile._write_rule(out, 'rsp_rule',
+                                   self.ninjafile._rules['rsp_rule'])
+        self.assertEqual(out.stream.getvalue(),
+                         'rule rsp_rule\n'
+                         '  command = cmd @out.rsp\n'
+                         '  rspfile = out.rsp\n'
+                         '  rspfile_content = ${in}\n')
+
         # Test duplicate rules.
         self.assertRaises(ValueError, self.ninjafile.rule, 'my_rule', ['cmd'])
 
@@ -288,6 +299,8 @@ class TestNinjaFile(TestCase):
         self.assertRaises(ValueError, self.ninjafile.rule, 'my_rule!', ['cmd'])
         self.assertRaises(ValueError, self.ninjafile.rule, 'pool_rule',
                           ['cmd'], pool='pool')
+        self.assertRaises(ValueError, self.ninjafile.rule, 'rsp_rule2',
+                          ['cmd'], rspfile='out.rsp')
 
     def test_build(self):
         self.ninjafile.rule('my_rule', ['cmd'])
@@ -347,3 +360,95 @@ class TestNinjaFile(TestCase):
             'build output: my_rule\n\n'
             'default output\n'
         )
+
+    def test_write_shared_variables(self):
+        out = StringIO()
+        self.ninjafile.write(out)
+        base_ninjafile = out.getvalue()
+
+        out = StringIO()
+        self.ninjafile.variable('flags_1', 'foo')
+        self.ninjafile.rule('my_rule', ['cmd'])
+        flags = [var('global_flags'), '-O2', '-DFOO']
+        self.ninjafile.build('a', 'my_rule', variables={'flags': flags})
+        self.ninjafile.build('b', 'my_rule', variables={
+            'flags': flags, 'short': 'x'
+        })
+        self.ninjafile.build('c', 'my_rule', variables={
+            'flags': [var('global_flags'), '-O0'], 'short': 'x'
+        })
+        # Variables that refer to other variables on the same build can't be
+        # shared.
+        for i in ('d', 'e'):
+            self.ninjafile.build(i, 'my_rule', variables={
+                'out2': 'foo', 'flags': [var('out2'), '-O2', '-DFOO']
+            })
+        self.ninjafile.write(out)
+
+        self.assertEqual(
+            out.getvalue(),
+            base_ninjafile +
+            'flags_1 = foo\n\n'
+            'rule my_rule\n'
+            '  command = cmd\n\n'
+            'flags_2 = ${global_flags} -O2 -DFOO\n\n'
+            'build a: my_rule\n'
+            '  flags = ${flags_2}\n\n'
+            'build b: my_rule\n'
+            '  flags = ${flags_2}\n'
+            '  short = x\n\n'
+            'build c: my_rule\n'
+            '  flags = ${global_flags} -O0\n'
+            '  short = x\n\n'
+            'build d: my_rule\n'
+            '  out2 = foo\n'
+            '  flags = ${out2} -O2 -DFOO\n\n'
+            'build e: my_rule\n'
+            '  out2 = foo\n'
+            '  flags = ${out2} -O2 -DFOO\n\n'
+        )
+
+    def test_write_fragments(self):
+        self.ninjafile.variable('var', 'foo')
+        self.ninjafile.rule('my_rule', ['cmd'])
+        self.ninjafile.build('output', 'my_rule')
+        with self.ninjafile.fragment(path.Path('sub/build.ninja'),
+                                     'sub/build.bfg'):
+            self.assertFalse(self.ninjafile.has_rule('sub_rule'))
+            self.ninjafile.rule('sub_rule', ['cmd'])
+            self.ninjafile.build('sub/output', 'sub_rule',
+                                 inputs=['output'])
+        self.ninjafile.default('sub/output')
+
+        # Builds in fragments still can't conflict with other builds.
+        with self.ninjafile.fragment(path.Path('sub/build.ninja')):
+            self.assertRaises(ValueError, self.ninjafile.build, 'output',
+                              'my_rule')
+
+        self.assertEqual(list(self.ninjafile.fragments()),
+                         [path.Path('sub/build.ninja')])
+
+        out = StringIO()
+        self.ninjafile.write(out)
+        self.assertEqual(
+            out.getvalue().split('\n\n', 1)[1],
+            'var = foo\n\n'
+            'rule my_rule\n'
+            '  command = cmd\n\n'
+            'rule sub_rule\n'
+            '  command = cmd\n\n'
+            'build output: my_rule\n\n'
+            'subninja sub/build.ninja\n\n'
+            'default sub/output\n'
+        )
+
+        out = StringIO()
+        self.ninjafile.write_fragment(out, path.Path('sub/build.ninja'))
+        self.assertEqual(
+            out.getvalue(),
+            '# Do not edit this file! It was automatically generated by '
+            'bfg9000.\n'
+            '# Instead, you should edit the source file that created this:\n'
+            '# sub/build.bfg\n\n'
+            'build sub/output: sub_rule output\n\n'
+        )
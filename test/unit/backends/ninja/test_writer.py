@@ -1,8 +1,14 @@
+import os
+import tempfile
 from unittest import mock
 
 from ... import *
 
-from bfg9000.backends.ninja.writer import version
+from bfg9000.backends.ninja import critical_path
+from bfg9000.backends.ninja.syntax import NinjaFile
+from bfg9000.backends.ninja.writer import (_fragment_path, discovered_deps,
+                                           version, write)
+from bfg9000.path import Path, Root
 from bfg9000.versioning import Version
 
 
@@ -28,3 +34,102 @@ class TestNinjaVersion(TestCase):
         with mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_bad_execute):  # noqa
             self.assertEqual(version({}), None)
+
+
+class TestDiscoveredDeps(TestCase):
+    env = AttrDict(builddir=Path('/build', Root.absolute), variables={},
+                   getvar=lambda key, default=None: default)
+
+    def test_discovered_deps(self):
+        output = ('foo.o: #deps 2, deps mtime 123 (VALID)\n'
+                  '    ../foo.c\n'
+                  '    ../foo.h\n'
+                  '\n'
+                  'bar.o: #deps 1, deps mtime 456 (STALE)\n'
+                  '    ../bar.c\n'
+                  '\n')
+        with mock.patch('bfg9000.shell.which', return_value=['ninja']), \
+             mock.patch('bfg9000.shell.execute',
+                        return_value=output) as m:  # noqa
+            self.assertEqual(discovered_deps(self.env, ['foo.o', 'baz.o']),
+                             {'foo.o': ['../foo.c', '../foo.h']})
+            self.assertEqual(m.call_args[0][0][-2:], ['-t', 'deps'])
+
+    def test_not_found(self):
+        with mock.patch('bfg9000.shell.which', mock_bad_which):
+            self.assertEqual(discovered_deps(self.env, ['foo.o']), {})
+
+    def test_bad_execute(self):
+        with mock.patch('bfg9000.shell.which', return_value=['ninja']), \
+             mock.patch('bfg9000.shell.execute', mock_bad_execute):  # noqa
+            self.assertEqual(discovered_deps(self.env, ['foo.o']), {})
+
+
+class TestFragments(TestCase):
+    def test_fragment_path(self):
+        build_inputs = AttrDict(bfgpath=Path('build.bfg', Root.srcdir))
+        self.assertEqual(_fragment_path(build_inputs, build_inputs.bfgpath),
+                         None)
+        self.assertEqual(
+            _fragment_path(build_inputs, Path('sub/dir/build.bfg',
+                                              Root.srcdir)),
+            Path('sub/dir/build.ninja')
+        )
+
+
+class TestWrite(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.env = AttrDict(base_dirs={
+            Root.srcdir: '/src', Root.builddir: self.tmpdir.name,
+        })
+        self.filename = os.path.join(self.tmpdir.name, 'build.ninja')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def ninjafile(self, *extra):
+        ninjafile = NinjaFile('build.bfg')
+        ninjafile.rule('cc', 'cc')
+        for i in ('quick.o', 'slow.o') + extra:
+            ninjafile.build(Path(i), 'cc')
+        return ninjafile
+
+    def write(self, ninjafile, timings):
+        with mock.patch('bfg9000.backends.ninja.writer.generate',
+                        return_value=ninjafile), \
+             mock.patch('bfg9000.backends.ninja.critical_path.load_log',
+                        return_value=timings):  # noqa
+            write(self.env, None)
+        with open(self.filename) as f:
+            return f.read()
+
+    def builds(self, data):
+        return [i.split(':')[0][6:] for i in data.splitlines()
+                if i.startswith('build ')]
+
+    def test_no_timings(self):
+        data = self.write(self.ninjafile(), {})
+        self.assertEqual(self.builds(data), ['quick.o', 'slow.o'])
+        self.assertEqual(critical_path.read_stamp(self.filename), None)
+
+    def test_schedule(self):
+        data = self.write(self.ninjafile(), {'quick.o': 1, 'slow.o': 10})
+        self.assertEqual(self.builds(data), ['slow.o', 'quick.o'])
+        self.assertNotEqual(critical_path.read_stamp(self.filename), None)
+
+    def test_timings_changed(self):
+        self.write(self.ninjafile(), {'quick.o': 1, 'slow.o': 10})
+        mtime = os.stat(self.filename).st_mtime_ns
+        os.utime(self.filename, ns=(mtime - 10**9, mtime - 10**9))
+
+        data = self.write(self.ninjafile(), {'quick.o': 10, 'slow.o': 1})
+        self.assertEqual(self.builds(data), ['slow.o', 'quick.o'])
+        self.assertEqual(os.stat(self.filename).st_mtime_ns,
+                         mtime - 10**9)
+
+    def test_builds_changed(self):
+        self.write(self.ninjafile(), {'quick.o': 1, 'slow.o': 10})
+        data = self.write(self.ninjafile('new.o'),
+                          {'quick.o': 10, 'slow.o': 1})
+        self.assertEqual(self.builds(data), ['quick.o', 'new.o', 'slow.o'])
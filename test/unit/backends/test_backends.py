@@ -0,0 +1,110 @@
+from unittest import mock
+
+from .. import *
+
+from bfg9000 import backends
+
+
+class MockEntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        return self.value
+
+
+class MockBackend:
+    def __init__(self, priority):
+        self.priority = priority
+
+
+class BackendTestCase(TestCase):
+    def setUp(self):
+        self._reset()
+
+    def tearDown(self):
+        self._reset()
+
+    @staticmethod
+    def _reset():
+        for i in (backends._plugin_backends, backends.list_backend_names,
+                  backends.get_backend, backends.backend_version):
+            i._reset()
+
+    def mock_plugins(self, plugins=[]):
+        return mock.patch('bfg9000.backends.iter_entry_points',
+                          return_value=plugins)
+
+
+class TestGetBackend(BackendTestCase):
+    def test_builtin(self):
+        with self.mock_plugins():
+            for name in ('ninja', 'make'):
+                backend = backends.get_backend(name)
+                self.assertTrue(name in backend.__name__)
+
+    def test_builtin_priority(self):
+        with self.mock_plugins():
+            for name, (_, priority) in backends._builtin_backends.items():
+                try:
+                    backend = backends.get_backend(name)
+                except ImportError:  # pragma: no cover
+                    continue
+                self.assertEqual(backend.priority, priority)
+
+    def test_plugin(self):
+        plugin = MockBackend(0)
+        with self.mock_plugins([MockEntryPoint('plugin', plugin)]):
+            self.assertIs(backends.get_backend('plugin'), plugin)
+
+    def test_unknown(self):
+        with self.mock_plugins():
+            self.assertRaises(ValueError, backends.get_backend, 'unknown')
+
+
+class TestListBackendNames(BackendTestCase):
+    def test_builtins(self):
+        with self.mock_plugins():
+            self.assertEqual(backends.list_backend_names(),
+                             ['ninja', 'make', 'msbuild'])
+
+    def test_plugins(self):
+        plugins = [MockEntryPoint('ninja', None),
+                   MockEntryPoint('low', MockBackend(0)),
+                   MockEntryPoint('high', MockBackend(5))]
+        with self.mock_plugins(plugins):
+            self.assertEqual(backends.list_backend_names(),
+                             ['high', 'ninja', 'make', 'msbuild', 'low'])
+
+    def test_backend_names(self):
+        names = backends.BackendNames()
+        with self.mock_plugins([MockEntryPoint('plugin', MockBackend(0))]):
+            self.assertTrue('ninja' in names)
+            self.assertTrue('plugin' in names)
+            self.assertFalse('unknown' in names)
+            self.assertEqual(list(names),
+                             ['ninja', 'make', 'msbuild', 'plugin'])
+
+    def test_builtin_no_plugin_scan(self):
+        with self.mock_plugins() as m:
+            self.assertTrue('make' in backends.BackendNames())
+            backends.get_backend('make')
+            m.assert_not_called()
+
+
+class TestDefaultBackend(BackendTestCase):
+    def test_first_installed(self):
+        versions = {'ninja': None, 'make': '4.0', 'msbuild': '1.0'}
+        with self.mock_plugins(), \
+             mock.patch('bfg9000.backends.backend_version',
+                        side_effect=lambda x: versions[x]) as m:  # noqa
+            self.assertEqual(backends.default_backend(), 'make')
+            self.assertEqual(m.call_args_list,
+                             [mock.call('ninja'), mock.call('make')])
+
+    def test_none_installed(self):
+        with self.mock_plugins(), \
+             mock.patch('bfg9000.backends.backend_version',
+                        return_value=None):  # noqa
+            self.assertEqual(backends.default_backend(), 'ninja')
@@ -3,6 +3,7 @@ from .. import AttrDict, make_env, TestCase  # noqa
 from bfg9000 import file_types
 from bfg9000.builtins import builtin
 from bfg9000.build_inputs import BuildInputs
+from bfg9000.objutils import instance_vars
 from bfg9000.path import Path, Root
 
 
@@ -18,7 +19,7 @@ class FileTest(TestCase):
         seen.add(id(a))
 
         self.assertEqual(type(a), type(b))
-        keys = ((set(a.__dict__.keys()) | set(b.__dict__.keys())) -
+        keys = ((set(instance_vars(a)) | set(instance_vars(b))) -
                 exclude - {'creator', 'post_install'})
 
         for i in keys:
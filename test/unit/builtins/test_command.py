@@ -464,3 +464,16 @@ class TestNinjaBackend(BuiltinTest):
             output=[result], rule='command', inputs=[], implicit=['PHONY'],
             order_only=None, variables={'cmd': ['echo', 'foo']}
         )
+
+    def test_restat(self):
+        ninjafile = mock.Mock()
+        result = self.context['build_step']('foo.c', cmd=['gen', 'foo.c'],
+                                            restat=True)
+        _command.ninja_command(result.creator, self.build, ninjafile, self.env)
+        ninjafile.build.assert_called_once_with(
+            output=[result], rule='command', inputs=[], implicit=[],
+            order_only=None, variables={
+                'cmd': ['gen', 'foo.c'], 'restat': '1',
+                'description': 'build => foo.c',
+            }
+        )
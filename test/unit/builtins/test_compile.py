@@ -3,6 +3,7 @@ from unittest import mock
 
 from .common import AlwaysEqual, AttrDict, BuiltinTest
 from .. import make_env
+from ..tools.cc.common import mock_execute as cc_mock_execute
 
 from bfg9000 import file_types, options as opts
 from bfg9000.backends.make import syntax as make
@@ -13,6 +14,7 @@ from bfg9000.iterutils import listify, unlistify
 from bfg9000.packages import CommonPackage
 from bfg9000.path import Path, Root
 from bfg9000.tools.msvc import MsvcBuilder
+from bfg9000.versioning import Version
 
 MockCompile = namedtuple('MockCompile', ['file'])
 
@@ -25,6 +27,43 @@ def mock_execute(*args, **kwargs):
     return 'version'
 
 
+def mock_execute_cc(args, **kwargs):
+    if args[-1] == '--version':
+        return 'version'
+    return cc_mock_execute(args, **kwargs)
+
+
+def mock_execute_gcc(args, **kwargs):
+    if args[-1] == '--version':
+        return ('g++ (GCC) 14.1.0\n' +
+                'Copyright (C) 2024 Free Software Foundation, Inc.\n')
+    return cc_mock_execute(args, **kwargs)
+
+
+def cxx_module_objects(context, names=('foo.cppm', 'main.cpp')):
+    result = []
+    with mock.patch('bfg9000.shell.which', mock_which), \
+         mock.patch('bfg9000.shell.execute', mock_execute_gcc):  # noqa
+        for i in names:
+            src = context['source_file'](i)
+            result.append((src, context['object_file'](file=src)))
+    return result
+
+
+def ninja_strings(ninjafile, rule):
+    return [i for i in ninjafile._rules[rule].command if isinstance(i, str)]
+
+
+def fortran_objects(context):
+    with mock.patch('bfg9000.shell.which', mock_which), \
+         mock.patch('bfg9000.shell.execute', mock_execute_cc):  # noqa
+        src1 = context['source_file']('foo.f90')
+        obj1 = context['object_file'](file=src1)
+        src2 = context['source_file']('bar.f90')
+        obj2 = context['object_file'](file=src2)
+    return (src1, obj1), (src2, obj2)
+
+
 class CompileTest(BuiltinTest):
     def output_file(self, name, step={}, lang='c++', mode=None, extra={}):
         compiler = getattr(self.env.builder(lang), mode or self.mode)
@@ -177,6 +216,10 @@ class TestObjectFile(CompileTest):
             file_types.HeaderDirectory(Path('include', Root.srcdir))
         ])
         self.assertEqual(result.creator.include_deps, [hdr])
+        self.assertEqual(result.creator.inputs,
+                         [result.creator.file, hdr])
+        self.assertEqual(list(self.build.dependents(hdr.path)),
+                         [result.creator])
 
         inc = self.context['header_directory']('include')
         inc.creator = 'foo'
@@ -208,7 +251,6 @@ class TestObjectFile(CompileTest):
 
     def test_pch(self):
         pch = file_types.PrecompiledHeader(Path('pch', Root.builddir), 'c')
-        pch.object_file = 'foo'
 
         result = self.context['object_file'](file='main.cpp', pch=pch)
         self.assertIs(result.creator.pch, pch)
@@ -254,6 +296,14 @@ class TestObjectFile(CompileTest):
         self.assertSameFile(result, self.output_file('main'))
         self.assertEqual(result.creator.extra_deps, [dep])
 
+        src = result.creator.file
+        self.assertEqual(result.creator.inputs, [src, dep])
+        self.assertIs(self.build.creator(result.path), result.creator)
+        self.assertEqual(list(self.build.dependents(src.path)),
+                         [result.creator])
+        self.assertEqual(list(self.build.dependents(dep.path)),
+                         [result.creator])
+
     def test_make_no_name_or_file(self):
         self.assertRaises(TypeError, self.context['object_file'])
 
@@ -676,6 +726,58 @@ class TestMakeBackend(BuiltinTest):
             mvar.assert_any_call('GLOBAL_CXXFLAGS', ['/Zi'],
                                  make.Section.flags, True)
 
+    def test_fortran_deps(self):
+        makefile = make.Makefile(None)
+        (src1, obj1), (src2, obj2) = fortran_objects(self.context)
+        with mock.patch('logging.log'):
+            compile.make_compile(obj1.creator, self.build, makefile, self.env)
+            compile.make_compile(obj2.creator, self.build, makefile, self.env)
+
+        deps = compile.fortran_deps
+        rules = [i for i in makefile._rules if i.targets == [deps]]
+        self.assertEqual(len(rules), 1)
+        self.assertEqual(rules[0].deps, [src1, src2])
+        self.assertEqual(makefile._includes, [(deps, True)])
+        self.assertIn(deps, [i.path for i in self.build.targets()])
+
+    def test_cxx_modules(self):
+        makefile = make.Makefile(None)
+        (src1, obj1), (src2, obj2) = cxx_module_objects(self.context)
+        with mock.patch('logging.log'):
+            compile.make_compile(obj1.creator, self.build, makefile, self.env)
+            compile.make_compile(obj2.creator, self.build, makefile, self.env)
+
+        ddi1, ddi2 = Path('foo.o.ddi'), Path('main.o.ddi')
+        deps = compile.cxx_module_deps
+        rules = {tuple(i.targets): i for i in makefile._rules}
+        self.assertEqual(rules[ddi1, ].deps, [src1])
+        self.assertEqual(rules[ddi2, ].deps, [src2])
+        self.assertEqual(rules[deps, ].deps, [ddi1, ddi2])
+        self.assertEqual(makefile._includes, [
+            (Path('foo.o.d'), True), (Path('foo.o.ddi.d'), True), (deps, True),
+            (Path('main.o.d'), True), (Path('main.o.ddi.d'), True),
+        ])
+
+        targets = [i.path for i in self.build.targets()]
+        for i in (ddi1, ddi2, deps):
+            self.assertIn(i, targets)
+
+        defines = dict(makefile._defines)
+        self.assertIn('-fmodules-ts', defines[make.var('RULE_CXX')][0])
+        self.assertIn('-fdeps-format=p1689r5',
+                      defines[make.var('RULE_CXX_SCAN')][0])
+
+    def test_cxx_no_modules(self):
+        makefile = make.Makefile(None)
+        (src, obj), = cxx_module_objects(self.context, ['main.cpp'])
+        with mock.patch('logging.log'):
+            compile.make_compile(obj.creator, self.build, makefile, self.env)
+
+        self.assertEqual(len(makefile._rules), 1)
+        self.assertEqual(makefile._includes, [(Path('main.o.d'), True)])
+        self.assertNotIn('-fmodules-ts',
+                         dict(makefile._defines)[make.var('RULE_CXX')][0])
+
 
 class TestNinjaBackend(BuiltinTest):
     def test_simple(self):
@@ -688,7 +790,7 @@ class TestNinjaBackend(BuiltinTest):
                                   self.env)
             mbuild.assert_called_once_with(
                 output=[result], rule='cxx', inputs=[src], implicit=[],
-                variables=AlwaysEqual(),
+                order_only=[], variables=AlwaysEqual(),
             )
 
     def test_extra_deps(self):
@@ -702,7 +804,7 @@ class TestNinjaBackend(BuiltinTest):
                                   self.env)
             mbuild.assert_called_once_with(
                 output=[result], rule='cxx', inputs=[src], implicit=[dep],
-                variables=AlwaysEqual(),
+                order_only=[], variables=AlwaysEqual(),
             )
 
     def test_local_options(self):
@@ -722,9 +824,105 @@ class TestNinjaBackend(BuiltinTest):
             compile.ninja_compile(result.creator, build, ninjafile, env)
             mbuild.assert_called_once_with(
                 output=[result], rule='cxx', inputs=[src], implicit=[],
-                variables={ninja.var('cxxflags'): [
+                order_only=[], variables={ninja.var('cxxflags'): [
                     ninja.var('global_cxxflags'), '/MTd'
                 ]},
             )
             mvar.assert_any_call('global_cxxflags', ['/Zi'],
                                  ninja.Section.flags, True)
+
+    def test_generated_source(self):
+        with mock.patch('bfg9000.shell.which', mock_which), \
+             mock.patch('bfg9000.shell.execute', mock_execute):  # noqa
+            result = self.context['generated_source'](file='file.qrc')
+
+        ninjafile = ninja.NinjaFile(None)
+        with mock.patch.object(ninja.NinjaFile, 'build'):
+            compile.ninja_compile(result.creator, self.build, ninjafile,
+                                  self.env)
+        rule = ninjafile._rules['rcc']
+        self.assertTrue(rule.restat)
+        self.assertEqual(rule.command[0], ninja.var('restat_cmd'))
+
+    def test_object_file_no_restat(self):
+        ninjafile = ninja.NinjaFile(None)
+        src = self.context['source_file']('main.cpp')
+        result = self.context['object_file'](file=src)
+
+        with mock.patch.object(ninja.NinjaFile, 'build'):
+            compile.ninja_compile(result.creator, self.build, ninjafile,
+                                  self.env)
+        self.assertFalse(ninjafile._rules['cxx'].restat)
+
+    def test_fortran_dyndep(self):
+        self.env.backend_version = Version('1.10')
+        ninjafile = ninja.NinjaFile(None)
+        (src1, obj1), (src2, obj2) = fortran_objects(self.context)
+        compile.ninja_compile(obj1.creator, self.build, ninjafile, self.env)
+        compile.ninja_compile(obj2.creator, self.build, ninjafile, self.env)
+
+        deps = compile.fortran_deps
+        self.assertEqual(len(ninjafile._builds), 3)
+        dyndep, build1, build2 = ninjafile._builds
+        self.assertEqual(dyndep.outputs, [deps])
+        self.assertEqual(dyndep.rule, 'fortrandep')
+        self.assertEqual(dyndep.inputs, [src1, src2])
+
+        for build, obj in ((build1, obj1), (build2, obj2)):
+            self.assertEqual(build.outputs, [obj])
+            self.assertEqual(build.order_only, [deps])
+            self.assertEqual(build.variables[ninja.var('dyndep')], deps)
+            self.assertEqual(build.variables[ninja.var('restat')], '1')
+
+    def test_fortran_no_dyndep(self):
+        self.env.backend_version = Version('1.9')
+        ninjafile = ninja.NinjaFile(None)
+        (src1, obj1), _ = fortran_objects(self.context)
+        compile.ninja_compile(obj1.creator, self.build, ninjafile, self.env)
+
+        self.assertEqual(len(ninjafile._builds), 1)
+        self.assertEqual(ninjafile._builds[0].order_only, [])
+        self.assertNotIn(ninja.var('dyndep'), ninjafile._builds[0].variables)
+
+    def test_cxx_modules(self):
+        self.env.backend_version = Version('1.10')
+        ninjafile = ninja.NinjaFile(None)
+        (src1, obj1), (src2, obj2) = cxx_module_objects(self.context)
+        compile.ninja_compile(obj1.creator, self.build, ninjafile, self.env)
+        compile.ninja_compile(obj2.creator, self.build, ninjafile, self.env)
+
+        ddi1, ddi2 = Path('foo.o.ddi'), Path('main.o.ddi')
+        deps = compile.cxx_module_deps
+        self.assertEqual(len(ninjafile._builds), 5)
+        scan1, dyndep, build1, scan2, build2 = ninjafile._builds
+        self.assertEqual(dyndep.outputs, [deps])
+        self.assertEqual(dyndep.rule, 'cxxmoduledep')
+        self.assertEqual(dyndep.inputs, [ddi1, ddi2])
+
+        for scan, ddi, src, obj in ((scan1, ddi1, src1, obj1),
+                                    (scan2, ddi2, src2, obj2)):
+            self.assertEqual(scan.outputs, [ddi])
+            self.assertEqual(scan.rule, 'cxx_scan')
+            self.assertEqual(scan.inputs, [src])
+            self.assertEqual(scan.variables[ninja.var('target')], obj)
+
+        for build, obj in ((build1, obj1), (build2, obj2)):
+            self.assertEqual(build.outputs, [obj])
+            self.assertEqual(build.order_only, [deps])
+            self.assertEqual(build.variables[ninja.var('dyndep')], deps)
+            self.assertNotIn(ninja.var('restat'), build.variables)
+
+        self.assertIn('-fmodules-ts', ninja_strings(ninjafile, 'cxx'))
+        self.assertIn('-fdeps-format=p1689r5',
+                      ninja_strings(ninjafile, 'cxx_scan'))
+
+    def test_cxx_no_modules(self):
+        self.env.backend_version = Version('1.10')
+        ninjafile = ninja.NinjaFile(None)
+        (src, obj), = cxx_module_objects(self.context, ['main.cpp'])
+        compile.ninja_compile(obj.creator, self.build, ninjafile, self.env)
+
+        self.assertEqual(len(ninjafile._builds), 1)
+        self.assertEqual(ninjafile._builds[0].order_only, [])
+        self.assertNotIn('-fmodules-ts', ninja_strings(ninjafile, 'cxx'))
+        self.assertNotIn('cxx_scan', ninjafile._rules)
@@ -96,6 +96,7 @@ class TestCopyFile(BuiltinTest):
         result = self.context['copy_file'](file='file.txt', extra_deps=[dep])
         self.assertSameFile(result, expected)
         self.assertEqual(result.creator.extra_deps, [dep])
+        self.assertEqual(result.creator.inputs, [result.creator.file, dep])
 
     def test_invalid_mode(self):
         self.assertRaises(ValueError, self.context['copy_file'],
@@ -216,3 +217,15 @@ class TestNinjaBackend(BuiltinTest):
             output=[result], rule='cp', inputs=src, implicit=[dep],
             variables={}
         )
+
+    def test_modes(self):
+        src = self.context['generic_file']('file.txt')
+        for mode in ('reflink', 'hardlink'):
+            ninjafile = mock.Mock()
+            result = self.context['copy_file'](mode + '.txt', src, mode=mode)
+            _copy_file.ninja_copy_file(result.creator, self.build, ninjafile,
+                                       self.env)
+            ninjafile.build.assert_called_once_with(
+                output=[result], rule=mode, inputs=src, implicit=[],
+                variables={}
+            )
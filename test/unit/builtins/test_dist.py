@@ -1,6 +1,10 @@
+import json
+from unittest import mock
+
 from .common import BuiltinTest
 
-from bfg9000.builtins import dist, file_types, regenerate, version  # noqa
+from bfg9000.builtins import (dist, file_types, project, regenerate,  # noqa
+                              version)
 from bfg9000.path import Path, Root
 from bfg9000.file_types import File, Directory
 
@@ -55,3 +59,23 @@ class TestExtraDist(BuiltinTest):
             File(Path('build.bfg', Root.srcdir)),
             File(Path('dir/file', Root.srcdir)),
         ])
+
+
+class TestDistCommand(BuiltinTest):
+    def test_command(self):
+        self.context['project']('foo', version='1.0')
+        archiver = self.env.tool('archiver')
+        self.assertEqual(
+            dist._dist_command('gzip', self.build, None, self.env),
+            [archiver, '-f', 'gzip', '-C', Path('.', Root.srcdir), '-P',
+             'foo-1.0', Path('.bfg_dist_manifest'), Path('foo-1.0.tar.gz')]
+        )
+
+    def test_manifest(self):
+        self.context['extra_dist'](files='file')
+        with mock.patch('bfg9000.builtins.dist.write_if_changed') as m:
+            dist._write_dist_manifest(self.build, self.env)
+        out = m.call_args[0][1]
+        self.assertEqual(json.loads(out), {
+            'version': 1, 'files': ['build.bfg', 'file'],
+        })
@@ -570,3 +570,22 @@ class TestFindFilesOld(FindTestCase):
             self.assertFound(self.find('dir', 'sub', flat=True),
                              [Directory(srcpath('dir/sub'))])
             self.assertEqual(m.call_count, 1)
+
+
+class TestWriteDepfile(BuiltinTest):
+    def depfile(self, seen_dirs, makeify=False):
+        with mock.patch('bfg9000.builtins.find.write_if_changed') as m:
+            find.write_depfile(self.env, Path('.bfg_find_deps'),
+                               Path('build.ninja'), seen_dirs, makeify)
+        return m.call_args[0][1]
+
+    def test_write(self):
+        dirs = [srcpath('dir/sub'), srcpath('dir'), srcpath('.')]
+        srcdir = self.env.srcdir.string()
+        self.assertEqual(self.depfile(dirs), 'build.ninja: {} {} {}\n'.format(
+            srcdir, os.path.join(srcdir, 'dir'),
+            os.path.join(srcdir, 'dir', 'sub')
+        ))
+        self.assertEqual(self.depfile(dirs), self.depfile(reversed(dirs)))
+        self.assertEqual(self.depfile(dirs, True),
+                         self.depfile(reversed(dirs), True))
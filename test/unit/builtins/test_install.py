@@ -1,8 +1,10 @@
+import json
 from collections import namedtuple
 from unittest import mock
 
 from .common import AlwaysEqual, BuiltinTest, FileTest
 
+from bfg9000 import safe_str
 from bfg9000.backends.make import syntax as make
 from bfg9000.backends.ninja import syntax as ninja
 from bfg9000.builtins import (compile, default, install, link,  # noqa
@@ -221,6 +223,130 @@ class TestInstallify(FileTest):
         self.assertRaises(ValueError, install.installify, exe)
 
 
+class TestInstallPlan(BuiltinTest):
+    def test_file(self):
+        exe = self.context['executable']('exe', 'main.cpp')
+        self.context['install'](exe)
+        self.assertEqual(install._install_plan(self.build['install']), [
+            {'kind': 'program', 'src': ['builddir', exe.path.suffix],
+             'dst': ['bindir', exe.path.suffix]},
+        ])
+
+    def test_fixup(self):
+        exe = self.context['executable']('exe', 'main.cpp')
+        lib = self.context['shared_library']('lib', 'lib.cpp')
+        self.context['install'](exe, lib)
+
+        def fixup(install_outputs):
+            libdir = install_outputs.target[lib].path.parent()
+            return ['fixup', '--rpath', safe_str.jbos('$ORIGIN:', libdir),
+                    install_outputs.host[exe].path]
+
+        exe.post_install = fixup
+        lib.post_install = None
+        self.assertEqual(install._install_plan(self.build['install'])[0], {
+            'kind': 'program', 'src': ['builddir', exe.path.suffix],
+            'dst': ['bindir', exe.path.suffix],
+            'fixup': {'command': ['fixup', '--rpath', [
+                '$ORIGIN:', {'path': ['libdir', ''], 'target': True},
+            ]], 'batch': False},
+        })
+
+    def test_fixup_tool(self):
+        exe = self.context['executable']('exe', 'main.cpp')
+        patchelf = self.env.tool('patchelf')
+        exe.post_install = lambda install_outputs: patchelf(
+            install_outputs.host[exe].path, [Path('/lib', Root.absolute)]
+        )
+        self.context['install'](exe)
+        self.assertEqual(install._install_plan(self.build['install']), [
+            {'kind': 'program', 'src': ['builddir', exe.path.suffix],
+             'dst': ['bindir', exe.path.suffix],
+             'fixup': {'command': patchelf.command + [
+                 '--set-rpath', {'path': ['absolute', '/lib']},
+             ], 'batch': True}},
+        ])
+
+    def test_fixup_wrong_file(self):
+        exe = self.context['executable']('exe', 'main.cpp')
+        exe.post_install = lambda install_outputs: ['fixup', exe]
+        self.context['install'](exe)
+        with self.assertRaises(ValueError):
+            install._install_plan(self.build['install'])
+
+    def test_directory(self):
+        files = [HeaderFile(Path('dir/file.hpp', Root.srcdir), 'c++'),
+                 HeaderFile(Path('dir/sub/file.hpp', Root.srcdir), 'c++')]
+        src = HeaderDirectory(Path('dir', Root.srcdir), files)
+        self.context['install'](src)
+        self.assertEqual(install._install_plan(self.build['install']), [
+            {'kind': 'data', 'src': ['srcdir', 'dir/file.hpp'],
+             'dst': ['includedir', 'file.hpp']},
+            {'kind': 'data', 'src': ['srcdir', 'dir/sub/file.hpp'],
+             'dst': ['includedir', 'sub/file.hpp']},
+        ])
+
+    def test_directory_no_files(self):
+        src = HeaderDirectory(Path('dir', Root.srcdir))
+        self.context['install'](src)
+        with mock.patch('warnings.warn') as mwarn:
+            self.assertEqual(install._install_plan(self.build['install']), [
+                {'kind': 'directory', 'dst': ['includedir', '']},
+            ])
+            mwarn.assert_called_once()
+
+    def test_write(self):
+        exe = self.context['executable']('exe', 'main.cpp')
+        self.context['install'](exe)
+
+        with mock.patch('bfg9000.path.write_if_changed') as m:
+            install_cmds, uninstall_cmds = install._install_commands(
+                self.build['install'], self.env
+            )
+        out = m.call_args[0][1]
+        self.assertEqual(json.loads(out), {
+            'version': 2,
+            'entries': install._install_plan(self.build['install']),
+        })
+
+        def cmd(action):
+            return [self.env.tool('installer'), '-m',
+                    Path('.bfg_install_manifest'),
+                    '-r', 'srcdir', Path('', Root.srcdir),
+                    '-r', 'prefix', Path('', InstallRoot.prefix, True),
+                    '-r', 'exec_prefix', Path('', InstallRoot.exec_prefix,
+                                              True),
+                    '-r', 'bindir', Path('', InstallRoot.bindir, True),
+                    '-r', 'libdir', Path('', InstallRoot.libdir, True),
+                    '-r', 'includedir', Path('', InstallRoot.includedir,
+                                             True),
+                    action, Path('.bfg_install_plan')]
+
+        self.assertEqual(install_cmds, [cmd('install')])
+        self.assertEqual(uninstall_cmds, [cmd('uninstall')])
+
+    def test_write_fixup(self):
+        exe = self.context['executable']('exe', 'main.cpp')
+        exe.post_install = lambda install_outputs: [
+            'fixup', install_outputs.host[exe].path
+        ]
+        self.context['install'](exe)
+
+        with mock.patch('bfg9000.path.write_if_changed'):
+            install_cmds, uninstall_cmds = install._install_commands(
+                self.build['install'], self.env
+            )
+
+        # The fixups run inside the installer, which needs to know where the
+        # install roots will be on the installed system.
+        self.assertEqual(len(install_cmds), 1)
+        cmd = install_cmds[0]
+        self.assertEqual(cmd[-2:], ['install', Path('.bfg_install_plan')])
+        i = cmd.index('-t')
+        self.assertEqual(cmd[i:i + 3],
+                         ['-t', 'prefix', Path('', InstallRoot.prefix)])
+
+
 class TestMakeBackend(BuiltinTest):
     def test_no_install(self):
         makefile = make.Makefile(None)
@@ -237,6 +363,7 @@ class TestMakeBackend(BuiltinTest):
         self.context['install'](exe)
 
         with mock.patch.object(make.Makefile, 'rule') as mrule, \
+             mock.patch('bfg9000.path.write_if_changed'), \
              mock.patch('logging.log'):  # noqa
             install.make_install_rule(self.build, makefile, self.env)
             self.assertEqual(mrule.mock_calls, [
@@ -264,6 +391,7 @@ class TestNinjaBackend(BuiltinTest):
         with mock.patch.object(ninja.NinjaFile, 'build') as mbuild, \
              mock.patch.object(ninja.NinjaFile, 'has_build',
                                return_value=True), \
+             mock.patch('bfg9000.path.write_if_changed'), \
              mock.patch('logging.log'):  # noqa
             install.ninja_install_rule(self.build, ninjafile, self.env)
             self.assertEqual(mbuild.mock_calls, [
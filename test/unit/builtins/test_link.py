@@ -10,6 +10,7 @@ from bfg9000.environment import LibraryMode
 from bfg9000.iterutils import listify, unlistify
 from bfg9000.packages import CommonPackage
 from bfg9000.path import Path, Root
+from bfg9000.versioning import Version
 
 
 class LinkTest(BuiltinTest):
@@ -201,6 +202,8 @@ class TestExecutable(LinkTest):
         self.assertSameFile(result.creator.files[0],
                             self.object_file('exe.int/main'))
         self.assertEqual(result.creator.extra_deps, [dep])
+        self.assertEqual(result.creator.inputs,
+                         [result.creator.files[0], dep])
 
     def test_extra_compile_deps(self):
         dep = self.context['generic_file']('dep.txt')
@@ -897,6 +900,29 @@ class TestMakeBackend(BuiltinTest):
         mrule.assert_called_once_with(result, [obj, dep], [], AlwaysEqual(),
                                       self._variables(), None)
 
+    def test_rspfile(self):
+        obj = self.context['object_file']('main.o')
+        result = self.context['executable']('exe', obj)
+        linker = result.creator.linker
+
+        self.env.backend_version = Version('4.3')
+        makefile = make.Makefile(None)
+        with mock.patch('bfg9000.shell.max_files_length', 0), \
+             mock.patch.object(make.Makefile, 'rule'):
+            link.make_link(result.creator, self.build, makefile, self.env)
+        rsp_var = make.var('RULE_{}_RSP'.format(linker.rule_name.upper()))
+        self.assertTrue(makefile.has_variable(rsp_var))
+        self.assertIn(result.path.addext('.rsp'),
+                      [i.path for i in self.build.targets()])
+
+        # Older versions of Make can't write response files.
+        self.env.backend_version = Version('3.81')
+        makefile = make.Makefile(None)
+        with mock.patch('bfg9000.shell.max_files_length', 0), \
+             mock.patch.object(make.Makefile, 'rule'):
+            link.make_link(result.creator, self.build, makefile, self.env)
+        self.assertFalse(makefile.has_variable(rsp_var))
+
 
 class TestNinjaBackend(BuiltinTest):
     def _variables(self, lang='c++'):
@@ -932,6 +958,22 @@ class TestNinjaBackend(BuiltinTest):
             variables=self._variables()
         )
 
+    def test_rspfile(self):
+        obj = self.context['object_file']('main.o')
+        result = self.context['executable']('exe', obj)
+
+        ninjafile = ninja.NinjaFile(None)
+        with mock.patch('bfg9000.shell.max_files_length', 0), \
+             mock.patch.object(ninja.NinjaFile, 'build') as mbuild:
+            link.ninja_link(result.creator, self.build, ninjafile, self.env)
+
+        self.assertTrue(ninjafile.has_rule('cc_link_rsp'))
+        self.assertFalse(ninjafile.has_rule('cc_link'))
+        mbuild.assert_called_once_with(
+            output=[result], rule='cc_link_rsp', inputs=[obj], implicit=[],
+            variables=self._variables()
+        )
+
 
 class TestMsbuildBackend(BuiltinTest):
     def setUp(self):
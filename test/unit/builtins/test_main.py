@@ -1,5 +1,5 @@
 from .common import BuiltinTest
-from bfg9000 import builtins
+from bfg9000 import builtins, profiler
 from bfg9000.builtins.builtin import BuildContext
 
 
@@ -9,3 +9,16 @@ class TestBuiltin(BuiltinTest):
         context = BuildContext(self.env, self.build, None)
         self.assertTrue('project' in context.builtins)
         self.assertTrue('executable' in context.builtins)
+
+    def test_profile(self):
+        builtins.init()
+        p = profiler.start()
+        try:
+            build, context = self._make_context(self.env)
+            context['source_file']('main.cpp')
+        finally:
+            profiler.stop()
+        # Builtins called by other builtins are recorded too, so the outermost
+        # builtin is the last one to finish.
+        self.assertEqual({i['cat'] for i in p.events}, {'builtin'})
+        self.assertEqual(p.events[-1]['name'], 'source_file')
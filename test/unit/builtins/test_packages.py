@@ -211,7 +211,8 @@ class TestBoostPackage(TestCase):
                         return_value=Version('1.23')), \
              mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_execute), \
-             mock.patch('bfg9000.tools.cc.exists', mock_exists):  # noqa
+             mock.patch('bfg9000.tools.cc.exists', mock_exists), \
+             mock.patch.object(env.dir_index, 'exists', mock_exists):  # noqa
             pkg = context['boost_package']('thread')
             self.assertEqual(pkg.name, 'boost(thread)')
             self.assertEqual(pkg.version, Version('1.23'))
@@ -237,7 +238,8 @@ class TestBoostPackage(TestCase):
                         return_value=Version('1.23')), \
              mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_execute), \
-             mock.patch('bfg9000.tools.msvc.exists', mock_exists):  # noqa
+             mock.patch('bfg9000.tools.msvc.exists', mock_exists), \
+             mock.patch.object(env.dir_index, 'exists', mock_exists):  # noqa
             pkg = context['boost_package']('thread')
             self.assertEqual(pkg.name, 'boost(thread)')
             self.assertEqual(pkg.version, Version('1.23'))
@@ -3,6 +3,8 @@ from unittest import mock
 from .. import *
 
 from bfg9000 import platforms
+from bfg9000.platforms import core
+from bfg9000.platforms.posix import PosixHostPlatform, PosixTargetPlatform
 
 
 class TestPlatformName(TestCase):
@@ -130,3 +132,23 @@ class TestParseTriplet(TestCase):
         self.assertRaises(ValueError, parse_triplet, 'x86_64-gnu')
         self.assertRaises(ValueError, parse_triplet, 'x86_64-linux-gnu-extra')
         self.assertRaises(ValueError, parse_triplet, 'i686-pc-linux-gnu-extra')
+
+
+class TestGetPlatformType(TestCase):
+    def test_builtin(self):
+        self.assertIs(core._get_platform_type('target', 'linux'),
+                      PosixTargetPlatform)
+
+    def test_plugin(self):
+        entry = mock.MagicMock()
+        entry.name = 'goofy'
+        with mock.patch('bfg9000.platforms.core.iter_entry_points',
+                        return_value=[entry]):
+            self.assertIs(core._get_platform_type('host', 'goofy'),
+                          entry.load.return_value)
+
+    def test_unknown(self):
+        with mock.patch('bfg9000.platforms.core.iter_entry_points',
+                        return_value=[]):
+            self.assertIs(core._get_platform_type('host', 'goofy'),
+                          PosixHostPlatform)
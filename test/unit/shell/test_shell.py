@@ -1,12 +1,15 @@
+import os
 import sys
 from unittest import mock
 
 from .. import *
 
-from bfg9000.path import Root
+from bfg9000 import probes, profiler
+from bfg9000.file_types import File, Phony
+from bfg9000.path import Path, Root
 from bfg9000.safe_str import jbos
-from bfg9000.shell import (CalledProcessError, convert_args, execute, Mode,
-                           split_paths, which)
+from bfg9000.shell import (CalledProcessError, chunk_files, convert_args,
+                           execute, files_length, Mode, split_paths, which)
 
 base_dirs = {
     Root.srcdir: '$(srcdir)',
@@ -25,6 +28,33 @@ class TestSplitPaths(TestCase):
         self.assertEqual(split_paths('foo:bar', ':'), ['foo', 'bar'])
 
 
+class TestChunkFiles(TestCase):
+    def setUp(self):
+        self.files = [File(Path(i)) for i in ('foo', 'bar', 'quux')]
+
+    def test_files_length(self):
+        self.assertEqual(files_length([]), 0)
+        self.assertEqual(files_length(self.files), 13)
+
+    def test_single_chunk(self):
+        self.assertEqual(list(chunk_files(self.files)), [self.files])
+
+    def test_multiple_chunks(self):
+        self.assertEqual(list(chunk_files(self.files, 8)),
+                         [self.files[0:2], self.files[2:]])
+        self.assertEqual(list(chunk_files(self.files, 1)),
+                         [[i] for i in self.files])
+
+    def test_empty(self):
+        self.assertEqual(list(chunk_files([])), [])
+
+    def test_phony(self):
+        files = self.files + [Phony('phony')]
+        self.assertEqual(files_length(files), 19)
+        self.assertEqual(list(chunk_files(files, 14)),
+                         [files[0:3], files[3:]])
+
+
 class TestWhich(TestCase):
     def setUp(self):
         self.env = {'PATH': '/usr/bin{}/usr/local/bin'.format(os.pathsep)}
@@ -143,3 +173,29 @@ class TestExecute(TestCase):
     def test_shell(self):
         self.assertEqual(execute('echo hello', shell=True, stdout=Mode.pipe),
                          'hello\n')
+
+    def test_profile(self):
+        p = profiler.start()
+        try:
+            execute([sys.executable, '-c', 'exit()'])
+            execute('echo hello', shell=True, stdout=Mode.pipe)
+        finally:
+            profiler.stop()
+
+        self.assertEqual([(i['name'], i['cat']) for i in p.events], [
+            (os.path.basename(sys.executable), 'execute'),
+            ('echo', 'execute'),
+        ])
+        self.assertEqual(p.events[1]['args'], {'command': 'echo hello'})
+
+    def test_no_profile(self):
+        with mock.patch('bfg9000.shell._command_line') as m:
+            execute([sys.executable, '-c', 'exit()'])
+        m.assert_not_called()
+
+    def test_probes(self):
+        log = probes.reset()
+        with probes.caller('caller'):
+            execute('echo hello', shell=True, stdout=Mode.pipe)
+        self.assertEqual([(i.kind, i.command, i.caller) for i in log.probes],
+                         [('exec', 'echo hello', 'caller')])
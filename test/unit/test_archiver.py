@@ -0,0 +1,176 @@
+import gzip
+import json
+import os
+import stat
+import tarfile
+import tempfile
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+from . import *
+
+from bfg9000 import archiver
+
+
+class TestBlockCompressor(TestCase):
+    def test_compress(self):
+        out = BytesIO()
+        compressor = archiver.BlockCompressor(
+            out, archiver._compressors['gzip'], jobs=2, block_size=4
+        )
+        compressor.write(b'hello, ')
+        compressor.write(b'world!')
+        compressor.close()
+        self.assertEqual(gzip.decompress(out.getvalue()), b'hello, world!')
+
+    def test_jobs_independent(self):
+        data = os.urandom(1024) * 64
+
+        def compress(jobs):
+            out = BytesIO()
+            compressor = archiver.BlockCompressor(
+                out, archiver._compressors['gzip'], jobs=jobs,
+                block_size=1000
+            )
+            compressor.write(data)
+            compressor.close()
+            return out.getvalue()
+
+        self.assertEqual(compress(1), compress(4))
+
+    def test_empty(self):
+        out = BytesIO()
+        compressor = archiver.BlockCompressor(
+            out, archiver._compressors['gzip']
+        )
+        compressor.close()
+        self.assertEqual(gzip.decompress(out.getvalue()), b'')
+
+
+class TestArchiver(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.srcdir = os.path.join(self.tmpdir.name, 'src')
+        os.mkdir(self.srcdir)
+        self.write_src('build.bfg', 'project("foo")')
+        self.write_src('src/main.cpp', 'int main() {}')
+        script = self.write_src('script.sh', 'echo hi')
+        os.chmod(script, 0o775)
+
+        self.files = ['src/main.cpp', 'build.bfg', 'src', 'script.sh']
+        self.archiver = archiver.Archiver(self.srcdir, 'foo-1.0')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_src(self, name, data):
+        path = os.path.join(self.srcdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(data)
+        return path
+
+    def output(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_tar(self):
+        for fmt, mode in (('gzip', 'r:gz'), ('bzip2', 'r:bz2'),
+                          ('xz', 'r:xz')):
+            output = self.output('foo.tar')
+            self.archiver.archive(self.files, output, fmt)
+            with tarfile.open(output, mode) as t:
+                self.assertEqual(t.getnames(), [
+                    'foo-1.0/build.bfg', 'foo-1.0/script.sh', 'foo-1.0/src',
+                    'foo-1.0/src/main.cpp',
+                ])
+                info = t.getmember('foo-1.0/script.sh')
+                self.assertEqual(info.mode, 0o755)
+                self.assertEqual((info.uid, info.gid), (0, 0))
+                self.assertEqual(t.getmember('foo-1.0/build.bfg').mode,
+                                 0o644)
+                self.assertTrue(t.getmember('foo-1.0/src').isdir())
+                self.assertEqual(
+                    t.extractfile('foo-1.0/src/main.cpp').read(),
+                    b'int main() {}'
+                )
+
+    def test_zip(self):
+        output = self.output('foo.zip')
+        self.archiver.archive(self.files, output, 'zip')
+        with zipfile.ZipFile(output) as z:
+            self.assertEqual(z.namelist(), [
+                'foo-1.0/build.bfg', 'foo-1.0/script.sh', 'foo-1.0/src/',
+                'foo-1.0/src/main.cpp',
+            ])
+            info = z.getinfo('foo-1.0/script.sh')
+            self.assertEqual(stat.S_IMODE(info.external_attr >> 16), 0o755)
+            self.assertEqual(z.read('foo-1.0/src/main.cpp'), b'int main() {}')
+
+    def test_no_prefix(self):
+        output = self.output('foo.tar.gz')
+        archiver.Archiver(self.srcdir).archive(['build.bfg'], output, 'gzip')
+        with tarfile.open(output) as t:
+            self.assertEqual(t.getnames(), ['build.bfg'])
+
+    def test_reproducible(self):
+        for fmt in archiver.formats:
+            first, second = self.output('first'), self.output('second')
+            self.archiver.archive(self.files, first, fmt)
+            self.archiver.archive(list(reversed(self.files)), second, fmt)
+            with open(first, 'rb') as f, open(second, 'rb') as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_epoch(self):
+        output = self.output('foo.tar.gz')
+        archiver.Archiver(self.srcdir, epoch=1000).archive(
+            ['build.bfg'], output, 'gzip'
+        )
+        with tarfile.open(output) as t:
+            self.assertEqual(t.getmember('build.bfg').mtime, 1000)
+
+        output = self.output('foo.zip')
+        archiver.Archiver(self.srcdir, epoch=1000).archive(
+            ['build.bfg'], output, 'zip'
+        )
+        with zipfile.ZipFile(output) as z:
+            self.assertEqual(z.getinfo('build.bfg').date_time,
+                             (1980, 1, 1, 0, 0, 0))
+
+    def test_missing(self):
+        output = self.output('foo.tar.gz')
+        with self.assertRaises(archiver.ArchiveError):
+            self.archiver.archive(['nonexist'], output, 'gzip')
+        self.assertFalse(os.path.exists(output))
+        self.assertEqual(os.listdir(self.tmpdir.name), ['src'])
+
+    def test_invalid_format(self):
+        with self.assertRaises(archiver.ArchiveError):
+            self.archiver.archive(self.files, self.output('foo'), 'unknown')
+
+
+class TestManifest(TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'manifest')
+            with open(filename, 'w') as f:
+                archiver.write_manifest(f, ['foo', 'bar/baz'])
+            self.assertEqual(archiver.read_manifest(filename),
+                             ['foo', 'bar/baz'])
+
+    def test_bad_version(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'manifest')
+            with open(filename, 'w') as f:
+                json.dump({'version': 999, 'files': []}, f)
+            with self.assertRaises(archiver.ArchiveError):
+                archiver.read_manifest(filename)
+
+    def test_source_date_epoch(self):
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1234'}):
+            self.assertEqual(archiver.source_date_epoch(), 1234)
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': 'bad'}):
+            with self.assertRaises(archiver.ArchiveError):
+                archiver.source_date_epoch()
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': ''}):
+            self.assertEqual(archiver.source_date_epoch(), None)
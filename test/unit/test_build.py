@@ -0,0 +1,74 @@
+import os
+import tempfile
+from unittest import mock
+
+from . import *
+
+from bfg9000 import build
+
+
+class TestCompileScript(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmpdir.name, build.cachedir)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_code(self, code):
+        scope = {}
+        exec(code, scope)
+        return scope['x']
+
+    def test_no_cache(self):
+        code = build._compile_script('x = 1', 'build.bfg')
+        self.assertEqual(self.run_code(code), 1)
+        self.assertEqual(code.co_filename, 'build.bfg')
+
+    def test_cache(self):
+        code = build._compile_script('x = 1', 'build.bfg', self.cache)
+        self.assertEqual(self.run_code(code), 1)
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+
+        with mock.patch('builtins.compile') as m:
+            code = build._compile_script('x = 1', 'build.bfg', self.cache)
+            m.assert_not_called()
+        self.assertEqual(self.run_code(code), 1)
+        self.assertEqual(code.co_filename, 'build.bfg')
+
+    def test_cache_changed_source(self):
+        build._compile_script('x = 1', 'build.bfg', self.cache)
+        code = build._compile_script('x = 2', 'build.bfg', self.cache)
+        self.assertEqual(self.run_code(code), 2)
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+
+    def test_cache_changed_version(self):
+        build._compile_script('x = 1', 'build.bfg', self.cache)
+        with mock.patch('bfg9000.build.bfg_version', '999.0'), \
+             mock.patch('builtins.compile', wraps=compile) as m:  # noqa
+            code = build._compile_script('x = 1', 'build.bfg', self.cache)
+            m.assert_called_once()
+        self.assertEqual(self.run_code(code), 1)
+
+    def test_cache_multiple_files(self):
+        build._compile_script('x = 1', 'build.bfg', self.cache)
+        code = build._compile_script('x = 1', 'sub/build.bfg', self.cache)
+        self.assertEqual(code.co_filename, 'sub/build.bfg')
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+
+    def test_corrupt_cache(self):
+        build._compile_script('x = 1', 'build.bfg', self.cache)
+        cachefile = os.path.join(self.cache, os.listdir(self.cache)[0])
+        with open(cachefile, 'r+b') as f:
+            f.seek(len(build._cache_header('x = 1')))
+            f.write(b'garbage')
+            f.truncate()
+
+        code = build._compile_script('x = 1', 'build.bfg', self.cache)
+        self.assertEqual(self.run_code(code), 1)
+
+    def test_unwritable_cache(self):
+        with mock.patch('os.makedirs', side_effect=OSError()):
+            code = build._compile_script('x = 1', 'build.bfg', self.cache)
+        self.assertEqual(self.run_code(code), 1)
+        self.assertFalse(os.path.exists(self.cache))
@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from .builtins.common import AttrDict, BuiltinTest
+
+from bfg9000 import build_graph
+from bfg9000.builtins import (compile, default, link, packages,  # noqa
+                              project, tests)
+from bfg9000.path import Path, Root
+
+
+class TestBuildGraph(BuiltinTest):
+    def setUp(self):
+        super().setUp()
+        with mock.patch('logging.log'):
+            self.src1 = self.context['source_file']('foo.cpp')
+            self.src2 = self.context['source_file']('bar.cpp')
+            self.obj1 = self.context['object_file'](file=self.src1)
+            self.obj2 = self.context['object_file'](file=self.src2)
+            self.prog = self.context['executable']('prog', files=[self.obj1])
+            self.other = self.context['executable']('other',
+                                                    files=[self.obj2])
+
+            self.context['test'](self.prog)
+            driver = self.context['test_driver'](['driver', self.other])
+            self.context['test'](['child'], driver=driver)
+
+    def graph(self):
+        # Round-trip through JSON to make sure the snapshot is serializable.
+        data = json.loads(json.dumps(build_graph.snapshot(self.build)))
+        return build_graph.BuildGraph(data)
+
+    def index(self, graph, node):
+        return graph.nodes.index(node.path)
+
+    def test_snapshot(self):
+        data = json.loads(json.dumps(build_graph.snapshot(self.build)))
+        self.assertEqual(data['version'], build_graph.version)
+        self.assertEqual(
+            [data['nodes'][i] for i in data['sources']],
+            [list(i.path.to_json()) for i in self.build.sources()]
+        )
+        self.assertEqual([i['type'] for i in data['edges']],
+                         ['CompileSource', 'CompileSource', 'DynamicLink',
+                          'DynamicLink'])
+        self.assertEqual([i['command'] for i in data['tests']],
+                         [['prog'], ['driver', 'other'], ['child']])
+        self.assertEqual([i['parent'] for i in data['tests']],
+                         [None, None, 1])
+
+    def test_creator(self):
+        graph = self.graph()
+        edge = graph.creator(self.index(graph, self.obj1))
+        self.assertEqual(edge['type'], 'CompileSource')
+        self.assertEqual(edge['inputs'], [self.index(graph, self.src1)])
+        self.assertEqual(graph.creator(self.index(graph, self.src1)), None)
+
+    def test_dependents(self):
+        graph = self.graph()
+        self.assertEqual(graph.dependents(self.index(graph, self.src1)), [
+            self.index(graph, self.obj1), self.index(graph, self.prog)
+        ])
+        self.assertEqual(graph.dependents(self.index(graph, self.prog)), [])
+
+    def test_covering_tests(self):
+        graph = self.graph()
+        self.assertEqual(graph.covering_tests(self.index(graph, self.src1)),
+                         [0])
+        self.assertEqual(graph.covering_tests(self.index(graph, self.src2)),
+                         [1, 2])
+        self.assertEqual(graph.covering_tests(
+            graph.nodes.index(Path('build.bfg', Root.srcdir))
+        ), [])
+
+    def test_covering_tests_deps(self):
+        self.context['test_deps'](self.obj2)
+        graph = self.graph()
+        self.assertEqual(graph.covering_tests(self.index(graph, self.src2)),
+                         [0, 1, 2])
+
+    def test_affected(self):
+        graph = self.graph()
+        self.assertEqual(graph.affected([self.index(graph, self.src1)]),
+                         ([self.index(graph, self.prog)], [0]))
+        self.assertEqual(graph.affected([self.index(graph, self.src2)]),
+                         ([self.index(graph, self.other)], [1, 2]))
+        self.assertEqual(graph.affected([self.index(graph, self.obj1),
+                                         self.index(graph, self.obj2)]),
+                         ([self.index(graph, self.prog),
+                           self.index(graph, self.other)], [0, 1, 2]))
+        self.assertEqual(graph.affected([]), ([], []))
+
+    def test_affected_bootstrap(self):
+        graph = self.graph()
+        bfgfile = graph.nodes.index(Path('build.bfg', Root.srcdir))
+        self.assertEqual(graph.bootstrap, [bfgfile])
+        self.assertEqual(graph.affected([bfgfile]),
+                         ([self.index(graph, self.prog),
+                           self.index(graph, self.other)], [0, 1, 2]))
+
+    def test_affected_bootstrap_all_tests(self):
+        with mock.patch('logging.log'):
+            self.context['test'](['echo'])
+        graph = self.graph()
+        bfgfile = graph.nodes.index(Path('build.bfg', Root.srcdir))
+        self.assertEqual(graph.affected([bfgfile]),
+                         ([self.index(graph, self.prog),
+                           self.index(graph, self.other)], [0, 1, 2, 3]))
+
+    def test_affected_driver_sources(self):
+        with mock.patch('logging.log'), \
+             mock.patch('bfg9000.shell.which', return_value=['python']):
+            script = self.context['source_file']('script.py')
+            data = self.context['generic_file']('test_data.txt')
+            driver = self.context['test_driver'](script)
+            self.context['test'](data, driver=driver)
+        graph = self.graph()
+
+        self.assertEqual(graph.tests[3]['command'], ['python', 'script.py'])
+        self.assertEqual(graph.tests[4]['command'], ['test_data.txt'])
+        self.assertEqual(graph.affected([self.index(graph, script)]),
+                         ([], [3, 4]))
+        self.assertEqual(graph.affected([self.index(graph, data)]),
+                         ([], [4]))
+
+    def test_affected_include_deps(self):
+        with mock.patch('logging.log'):
+            header = self.context['header_file']('foo.hpp')
+            obj = self.context['object_file'](
+                file=self.context['source_file']('baz.cpp'),
+                includes=[header]
+            )
+            lib = self.context['static_library']('lib', files=[obj])
+        graph = self.graph()
+        self.assertEqual(graph.affected([self.index(graph, header)]),
+                         ([self.index(graph, lib)], []))
+
+    def test_find(self):
+        graph = self.graph()
+        base_dirs = self.env.base_dirs
+        self.assertEqual(
+            graph.find(self.src1.path.string(base_dirs), base_dirs),
+            self.index(graph, self.src1)
+        )
+        self.assertEqual(
+            graph.find(self.obj1.path.string(base_dirs), base_dirs),
+            self.index(graph, self.obj1)
+        )
+        self.assertEqual(graph.find('nonexist', base_dirs), None)
+
+    def test_version_mismatch(self):
+        with self.assertRaises(build_graph.GraphVersionError):
+            build_graph.BuildGraph({'version': 0})
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = AttrDict(base_dirs={Root.builddir: Path(tmpdir)})
+            build_graph.save(self.build, env)
+            self.assertTrue(os.path.exists(
+                os.path.join(tmpdir, build_graph.graphfile)
+            ))
+            graph = build_graph.BuildGraph.load(tmpdir)
+            self.assertEqual(graph.nodes, self.graph().nodes)
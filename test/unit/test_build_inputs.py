@@ -68,3 +68,69 @@ class TestEdge(TestCase):
         output = file_types.File(Path('file.txt'))
         self.assertEdge(Edge(self.build, output, description='desc'),
                         output, description='desc')
+
+
+class TestBuildInputs(TestCase):
+    def setUp(self):
+        self.env = make_env()
+        self.build = BuildInputs(self.env, Path('build.bfg'))
+
+    def test_add_source(self):
+        src = file_types.File(Path('src.txt', Root.srcdir))
+        self.assertIs(self.build.add_source(src), src)
+        self.assertIs(self.build.node(src.path), src)
+        self.assertEqual(self.build.creator(src.path), None)
+        self.assertEqual(list(self.build.sources()),
+                         [file_types.File(Path('build.bfg')), src])
+
+    def test_add_edge(self):
+        dep = file_types.File(Path('dep.txt', Root.srcdir))
+        output = [file_types.File(Path('foo.txt')),
+                  file_types.File(Path('bar.txt'))]
+        edge = Edge(self.build, output, extra_deps=dep)
+
+        self.assertEqual(list(self.build.edges()), [edge])
+        self.assertEqual(list(self.build.targets()), output)
+        self.assertEqual(edge.inputs, [dep])
+        for i in output:
+            self.assertIs(self.build.node(i.path), i)
+            self.assertIs(self.build.creator(i.path), edge)
+        self.assertEqual(list(self.build.dependents(dep.path)), [edge])
+        self.assertEqual(list(self.build.dependents(output[0].path)), [])
+
+    def test_edges_by_kind(self):
+        class MyEdge(Edge):
+            pass
+
+        edge = Edge(self.build, file_types.File(Path('foo.txt')))
+        my_edge = MyEdge(self.build, file_types.File(Path('bar.txt')))
+
+        self.assertEqual(list(self.build.edges(Edge)), [edge, my_edge])
+        self.assertEqual(list(self.build.edges(MyEdge)), [my_edge])
+        self.assertEqual(list(self.build.edges(BuildInputs)), [])
+
+    def test_module(self):
+        root = Edge(self.build, file_types.File(Path('root.txt')))
+        with self.build.push_module(Path('build.bfg', Root.srcdir)):
+            with self.build.push_module(Path('sub/build.bfg', Root.srcdir)):
+                sub = Edge(self.build, file_types.File(Path('sub.txt')))
+            top = Edge(self.build, file_types.File(Path('top.txt')))
+
+        self.assertEqual(self.build.module(root), Path('build.bfg'))
+        self.assertEqual(self.build.module(sub),
+                         Path('sub/build.bfg', Root.srcdir))
+        self.assertEqual(self.build.module(top),
+                         Path('build.bfg', Root.srcdir))
+
+    def test_add_target(self):
+        target = file_types.File(Path('target.txt'))
+        self.assertIs(self.build.add_target(target), target)
+        self.assertIs(self.build.node(target.path), target)
+        self.assertEqual(self.build.creator(target.path), None)
+        self.assertEqual(list(self.build.targets()), [target])
+
+    def test_missing(self):
+        path = Path('missing.txt')
+        self.assertEqual(self.build.node(path), None)
+        self.assertEqual(self.build.creator(path), None)
+        self.assertEqual(list(self.build.dependents(path)), [])
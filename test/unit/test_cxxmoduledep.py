@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from . import *
+
+from bfg9000 import cxxmoduledep
+from bfg9000.fortrandep import ScanResult, write_make, write_ninja
+
+
+def p1689(*rules):
+    return json.dumps({'version': 0, 'revision': 0, 'rules': list(rules)})
+
+
+class TestRead(TestCase):
+    def read(self, data):
+        return cxxmoduledep.read(StringIO(data))
+
+    def test_empty(self):
+        self.assertEqual(self.read(p1689()), {})
+
+    def test_provides(self):
+        self.assertEqual(self.read(p1689({
+            'primary-output': 'foo.o',
+            'provides': [{'logical-name': 'foo', 'is-interface': True}],
+        })), {'foo.o': ScanResult(['gcm.cache/foo.gcm'])})
+
+    def test_requires(self):
+        self.assertEqual(self.read(p1689({
+            'primary-output': 'main.o',
+            'requires': [{'logical-name': 'foo'},
+                         {'logical-name': 'bar:part'}],
+        })), {'main.o': ScanResult(
+            [], ['gcm.cache/foo.gcm', 'gcm.cache/bar-part.gcm']
+        )})
+
+    def test_compiled_module_path(self):
+        self.assertEqual(self.read(p1689({
+            'primary-output': 'foo.o',
+            'provides': [{'logical-name': 'foo',
+                          'compiled-module-path': 'foo.pcm'}],
+        })), {'foo.o': ScanResult(['foo.pcm'])})
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.read('{')
+        with self.assertRaises(KeyError):
+            self.read(p1689({'provides': []}))
+
+
+class TestReadFiles(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
+            f.write(data)
+        return path
+
+    def test_read_files(self):
+        files = [
+            self.write('main.o.ddi', p1689({
+                'primary-output': 'main.o',
+                'requires': [{'logical-name': 'foo'},
+                             {'logical-name': 'std'}],
+            })),
+            self.write('foo.o.ddi', p1689({
+                'primary-output': 'foo.o',
+                'provides': [{'logical-name': 'foo'}],
+                'requires': [{'logical-name': 'foo:bar'}],
+            })),
+            self.write('foo-bar.o.ddi', p1689({
+                'primary-output': 'foo-bar.o',
+                'provides': [{'logical-name': 'foo:bar'}],
+            })),
+        ]
+        results, providers = cxxmoduledep.read_files(files)
+        self.assertEqual(results, {
+            'main.o': ScanResult([], ['gcm.cache/foo.gcm']),
+            'foo.o': ScanResult(['gcm.cache/foo.gcm'],
+                                ['gcm.cache/foo-bar.gcm']),
+            'foo-bar.o': ScanResult(['gcm.cache/foo-bar.gcm'], []),
+        })
+        self.assertEqual(providers, {'gcm.cache/foo.gcm': 'foo.o',
+                                     'gcm.cache/foo-bar.gcm': 'foo-bar.o'})
+
+        out = StringIO()
+        write_ninja(out, results)
+        self.assertEqual(out.getvalue(),
+                         'ninja_dyndep_version = 1\n'
+                         'build main.o: dyndep | gcm.cache/foo.gcm\n'
+                         'build foo.o | gcm.cache/foo.gcm: dyndep | ' +
+                         'gcm.cache/foo-bar.gcm\n'
+                         'build foo-bar.o | gcm.cache/foo-bar.gcm: dyndep\n')
+
+        out = StringIO()
+        write_make(out, results, providers)
+        self.assertEqual(out.getvalue(),
+                         'main.o: foo.o\n'
+                         'foo.o: foo-bar.o\n')
+
+    def test_missing(self):
+        missing = os.path.join(self.tmpdir.name, 'nonexist.ddi')
+        with self.assertRaises(OSError):
+            cxxmoduledep.read_files([missing])
@@ -108,3 +108,14 @@ class TestEmitDeps(TestCase):
         outstream = StringIO()
         self.assertRaises(depfixer.ParseError, depfixer.emit_deps, instream,
                           outstream)
+
+
+class TestIterDeps(TestCase):
+    def test_iter_deps(self):
+        instream = StringIO('foo: bar \\\n  baz\nqux: quux\n')
+        self.assertEqual(list(depfixer.iter_deps(instream)),
+                         ['bar', 'baz', 'quux'])
+
+    def test_empty(self):
+        self.assertEqual(list(depfixer.iter_deps(StringIO(''))), [])
+        self.assertEqual(list(depfixer.iter_deps(StringIO('foo:\n'))), [])
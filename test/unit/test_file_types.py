@@ -1,6 +1,7 @@
 from . import *
 
 from bfg9000.file_types import *
+from bfg9000.objutils import instance_vars
 from bfg9000.path import Path, Root
 
 
@@ -15,7 +16,7 @@ class FileTest(TestCase):
         seen.add(id(a))
 
         self.assertEqual(type(a), type(b))
-        keys = ((set(a.__dict__.keys()) | set(b.__dict__.keys())) -
+        keys = ((set(instance_vars(a)) | set(instance_vars(b))) -
                 getattr(a, '_clone_exclude', set())) | {'path'} | extra
 
         for i in keys:
@@ -40,6 +41,11 @@ class TestNode(TestCase):
         self.assertFalse(Node('foo') == Node('bar'))
         self.assertTrue(Node('foo') != Node('bar'))
 
+    def test_slots(self):
+        for i in (SourceFile(Path('a.c'), 'c'), ObjectFile(Path('a.o'), 'elf'),
+                  StaticLibrary(Path('a.a'), 'elf'), Phony('all')):
+            self.assertFalse(hasattr(i, '__dict__'), type(i).__name__)
+
 
 class TestFile(FileTest):
     def test_directory_path(self):
@@ -237,6 +243,10 @@ class TestStaticLibrary(FileTest):
 
 
 class TestExportFile(FileTest):
+    def test_private(self):
+        self.assertTrue(ExportFile(Path('a')).private)
+        self.assertFalse(File(Path('a')).private)
+
     def test_clone(self):
         self.assertClone(ExportFile(Path('a', Root.srcdir)),
                          ExportFile(Path('a')))
@@ -0,0 +1,112 @@
+import os
+import tempfile
+from io import StringIO
+
+from . import *
+
+from bfg9000 import fortrandep
+from bfg9000.fortrandep import ScanResult
+
+
+class TestScan(TestCase):
+    def scan(self, data):
+        return fortrandep.scan(StringIO(data))
+
+    def test_empty(self):
+        self.assertEqual(self.scan(''), ScanResult())
+
+    def test_module(self):
+        self.assertEqual(self.scan(
+            'module Foo\n'
+            'contains\n'
+            '  module procedure bar\n'
+            'end module foo\n'
+        ), ScanResult(['foo.mod']))
+
+    def test_use(self):
+        self.assertEqual(self.scan(
+            'program main\n'
+            '  use foo\n'
+            '  use :: bar, only: x\n'
+            '  use, non_intrinsic :: baz\n'
+            '  use, intrinsic :: iso_fortran_env\n'
+            '  user = 1\n'
+            'end program main\n'
+        ), ScanResult([], ['foo.mod', 'bar.mod', 'baz.mod']))
+
+    def test_own_module(self):
+        self.assertEqual(self.scan(
+            'module foo\n'
+            'end module\n'
+            'module bar\n'
+            '  use foo\n'
+            'end module\n'
+        ), ScanResult(['foo.mod', 'bar.mod']))
+
+    def test_submodule(self):
+        self.assertEqual(self.scan('submodule (foo) bar\n'),
+                         ScanResult(['foo@bar.smod'], ['foo.mod']))
+        self.assertEqual(self.scan('submodule (foo:bar) baz\n'),
+                         ScanResult(['foo@baz.smod'], ['foo@bar.smod']))
+
+    def test_comments(self):
+        self.assertEqual(self.scan(
+            '! module foo\n'
+            'module bar ! comment\n'
+            'use baz; use quux\n'
+        ), ScanResult(['bar.mod'], ['baz.mod', 'quux.mod']))
+
+
+class TestScanFiles(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
+            f.write(data)
+        return path
+
+    def test_scan_files(self):
+        files = [
+            ('main.o', self.write('main.f90', 'use foo\nuse iso_c_binding\n')),
+            ('foo.o', self.write('foo.f90', 'module foo\nuse bar\n')),
+            ('bar.o', self.write('bar.f90', 'module bar\n')),
+        ]
+        results, providers = fortrandep.scan_files(files)
+        self.assertEqual(results, {
+            'main.o': ScanResult([], ['foo.mod']),
+            'foo.o': ScanResult(['foo.mod'], ['bar.mod']),
+            'bar.o': ScanResult(['bar.mod'], []),
+        })
+        self.assertEqual(providers, {'foo.mod': 'foo.o', 'bar.mod': 'bar.o'})
+
+        out = StringIO()
+        fortrandep.write_ninja(out, results)
+        self.assertEqual(out.getvalue(),
+                         'ninja_dyndep_version = 1\n'
+                         'build main.o: dyndep | foo.mod\n'
+                         'build foo.o | foo.mod: dyndep | bar.mod\n'
+                         'build bar.o | bar.mod: dyndep\n')
+
+        out = StringIO()
+        fortrandep.write_make(out, results, providers)
+        self.assertEqual(out.getvalue(),
+                         'main.o: foo.o\n'
+                         'foo.o: bar.o\n')
+
+    def test_escape(self):
+        results = {'dir name/a:b.o': ScanResult(['$foo.mod'])}
+        out = StringIO()
+        fortrandep.write_ninja(out, results)
+        self.assertEqual(out.getvalue(),
+                         'ninja_dyndep_version = 1\n'
+                         'build dir$ name/a$:b.o | $$foo.mod: dyndep\n')
+
+    def test_missing(self):
+        missing = os.path.join(self.tmpdir.name, 'nonexist.f90')
+        with self.assertRaises(OSError):
+            fortrandep.scan_files([('foo.o', missing)])
@@ -0,0 +1,358 @@
+import errno
+import json
+import os
+import stat
+import sys
+import tempfile
+from unittest import mock
+
+from . import *
+
+from bfg9000 import installer
+
+
+class TestInstaller(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.srcdir = os.path.join(self.tmpdir.name, 'src')
+        self.prefix = os.path.join(self.tmpdir.name, 'prefix')
+        self.manifest = os.path.join(self.tmpdir.name, 'manifest')
+        os.mkdir(self.srcdir)
+
+        self.installer = installer.Installer(
+            {'srcdir': self.srcdir, 'prefix': self.prefix}, self.manifest
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_src(self, name, data='data'):
+        path = os.path.join(self.srcdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(data)
+        return path
+
+    def read_dst(self, name):
+        with open(os.path.join(self.prefix, name)) as f:
+            return f.read()
+
+    def entry(self, src, dst, kind='data'):
+        return {'kind': kind, 'src': ['srcdir', src], 'dst': ['prefix', dst]}
+
+    def test_resolve(self):
+        self.assertEqual(self.installer.resolve(['srcdir', 'foo']),
+                         os.path.join(self.srcdir, 'foo'))
+        self.assertEqual(self.installer.resolve(['srcdir', '']), self.srcdir)
+        self.assertEqual(self.installer.resolve(['absolute', '/foo']), '/foo')
+        with self.assertRaises(installer.InstallError):
+            self.installer.resolve(['libdir', 'foo'])
+
+        self.installer.target_roots = {'prefix': '/usr'}
+        self.assertEqual(self.installer.resolve(['prefix', 'lib'], True),
+                         os.path.join('/usr', 'lib'))
+        self.assertEqual(self.installer.resolve_arg(
+            ['-L', {'path': ['prefix', 'lib'], 'target': True}, ':',
+             {'path': ['srcdir', 'lib']}]
+        ), '-L' + os.path.join('/usr', 'lib') + ':' +
+            os.path.join(self.srcdir, 'lib'))
+
+    def test_install(self):
+        self.write_src('foo.txt', 'foo')
+        self.write_src('sub/bar.txt', 'bar')
+        entries = [self.entry('foo.txt', 'foo.txt'),
+                   self.entry('sub/bar.txt', 'dir/bar.txt')]
+
+        self.assertEqual(self.installer.install(entries), (2, 0))
+        self.assertEqual(self.read_dst('foo.txt'), 'foo')
+        self.assertEqual(self.read_dst('dir/bar.txt'), 'bar')
+        with open(self.manifest) as f:
+            self.assertEqual(sorted(json.load(f)['files']), [
+                os.path.join(self.prefix, 'dir/bar.txt'),
+                os.path.join(self.prefix, 'foo.txt'),
+            ])
+
+    def test_install_mode(self):
+        src = self.write_src('prog')
+        os.chmod(src, 0o755)
+        entries = [self.entry('prog', 'data', 'data'),
+                   self.entry('prog', 'prog', 'program')]
+
+        self.installer.install(entries)
+        mode = os.stat(os.path.join(self.prefix, 'data')).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o644)
+        mode = os.stat(os.path.join(self.prefix, 'prog')).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o755)
+
+    def test_install_up_to_date(self):
+        src = self.write_src('foo.txt', 'foo')
+        entries = [self.entry('foo.txt', 'foo.txt')]
+
+        self.assertEqual(self.installer.install(entries), (1, 0))
+        self.assertEqual(self.installer.install(entries), (0, 1))
+
+        # Modifying the source should cause us to reinstall.
+        self.write_src('foo.txt', 'new')
+        os.utime(src, ns=(0, 0))
+        self.assertEqual(self.installer.install(entries), (1, 0))
+        self.assertEqual(self.read_dst('foo.txt'), 'new')
+
+    def test_install_modified_dst(self):
+        self.write_src('foo.txt', 'foo')
+        entries = [self.entry('foo.txt', 'foo.txt')]
+        self.installer.install(entries)
+
+        dst = os.path.join(self.prefix, 'foo.txt')
+        with open(dst, 'w') as f:
+            f.write('bad')
+        self.assertEqual(self.installer.install(entries), (1, 0))
+        self.assertEqual(self.read_dst('foo.txt'), 'foo')
+
+        # If the destination was modified by a post-install step, we can
+        # record its new state to avoid reinstalling.
+        with open(dst, 'w') as f:
+            f.write('fixed')
+        self.installer.record(entries)
+        self.assertEqual(self.installer.install(entries), (0, 1))
+        self.assertEqual(self.read_dst('foo.txt'), 'fixed')
+
+    def test_install_checksum(self):
+        src = self.write_src('foo.txt', 'foo')
+        os.makedirs(self.prefix)
+        dst = os.path.join(self.prefix, 'foo.txt')
+        with open(dst, 'w') as f:
+            f.write('foo')
+        os.utime(src, ns=(0, 0))
+        entries = [self.entry('foo.txt', 'foo.txt')]
+
+        self.installer.checksum = True
+        self.assertEqual(self.installer.install(entries), (0, 1))
+
+    def fixup_entry(self, src, dst, log, batch=False):
+        # A fixup that appends to the installed files and logs each run.
+        script = ('import sys\n'
+                  'for i in sys.argv[2:]:\n'
+                  '    open(i, "a").write("+" + sys.argv[1])\n'
+                  'open({!r}, "a").write(" ".join(sys.argv[1:]) + "\\n")\n'
+                  .format(log))
+        return dict(self.entry(src, dst, 'program'), fixup={
+            'command': [sys.executable, '-c', script,
+                        [{'path': ['prefix', 'lib'], 'target': True}]],
+            'batch': batch,
+        })
+
+    def read_log(self, log):
+        try:
+            with open(log) as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    def test_install_fixup(self):
+        log = os.path.join(self.tmpdir.name, 'log')
+        self.installer.target_roots = {'prefix': '/usr'}
+        self.write_src('foo', 'foo')
+        self.write_src('bar', 'bar')
+        entries = [self.fixup_entry('foo', 'foo', log),
+                   self.fixup_entry('bar', 'bar', log),
+                   self.entry('foo', 'plain')]
+
+        self.assertEqual(self.installer.install(entries), (3, 0))
+        self.assertEqual(self.read_dst('foo'), 'foo+/usr/lib')
+        self.assertEqual(self.read_dst('plain'), 'foo')
+        # Fixups run in parallel, so they can finish in any order.
+        self.assertEqual(set(self.read_log(log)), {
+            '/usr/lib ' + os.path.join(self.prefix, 'foo'),
+            '/usr/lib ' + os.path.join(self.prefix, 'bar'),
+        })
+
+        # Up-to-date files aren't fixed up again.
+        self.assertEqual(self.installer.install(entries), (0, 3))
+        self.assertEqual(len(self.read_log(log)), 2)
+
+        # Only the reinstalled file is fixed up.
+        self.write_src('bar', 'new')
+        self.assertEqual(self.installer.install(entries), (1, 2))
+        self.assertEqual(self.read_dst('bar'), 'new+/usr/lib')
+        self.assertEqual(self.read_log(log)[2:], [
+            '/usr/lib ' + os.path.join(self.prefix, 'bar'),
+        ])
+
+    def test_install_fixup_batch(self):
+        log = os.path.join(self.tmpdir.name, 'log')
+        self.installer.target_roots = {'prefix': '/usr'}
+        self.write_src('foo', 'foo')
+        self.write_src('bar', 'bar')
+        entries = [self.fixup_entry('foo', 'foo', log, True),
+                   self.fixup_entry('bar', 'bar', log, True)]
+
+        self.assertEqual(self.installer.install(entries), (2, 0))
+        self.assertEqual(self.read_dst('foo'), 'foo+/usr/lib')
+        self.assertEqual(self.read_dst('bar'), 'bar+/usr/lib')
+        self.assertEqual(self.read_log(log), [
+            '/usr/lib ' + os.path.join(self.prefix, 'foo') + ' ' +
+            os.path.join(self.prefix, 'bar'),
+        ])
+
+    def test_install_fixup_failed(self):
+        self.write_src('foo', 'foo')
+        entries = [dict(self.entry('foo', 'foo', 'program'), fixup={
+            'command': [sys.executable, '-c', 'raise SystemExit(1)'],
+        })]
+        with self.assertRaises(installer.InstallError):
+            self.installer.install(entries)
+
+        # Since the fixup failed, we should try again next time, even though
+        # the installed file looks like a faithful copy.
+        self.assertFalse(os.path.exists(self.manifest))
+        with self.assertRaises(installer.InstallError):
+            self.installer.install(entries)
+
+    def test_install_symlink(self):
+        self.write_src('libfoo.so.1')
+        os.symlink('libfoo.so.1', os.path.join(self.srcdir, 'libfoo.so'))
+        entries = [self.entry('libfoo.so.1', 'libfoo.so.1', 'program'),
+                   self.entry('libfoo.so', 'libfoo.so', 'program')]
+
+        self.assertEqual(self.installer.install(entries), (2, 0))
+        dst = os.path.join(self.prefix, 'libfoo.so')
+        self.assertTrue(os.path.islink(dst))
+        self.assertEqual(os.readlink(dst), 'libfoo.so.1')
+        self.assertEqual(self.installer.install(entries), (0, 2))
+
+    def test_install_copy_modes(self):
+        src = self.write_src('foo.txt', 'foo')
+        for mode in ('copy', 'reflink'):
+            self.installer.mode = mode
+            entries = [self.entry('foo.txt', mode)]
+            self.assertEqual(self.installer.install(entries), (1, 0))
+            self.assertEqual(self.read_dst(mode), 'foo')
+            self.assertFalse(os.path.samefile(
+                src, os.path.join(self.prefix, mode)
+            ))
+
+    def test_install_reflink_fallback(self):
+        self.write_src('foo.txt', 'foo')
+        entries = [self.entry('foo.txt', 'foo.txt')]
+
+        err = OSError(errno.EXDEV, 'Invalid cross-device link')
+        with mock.patch('fcntl.ioctl', side_effect=err), \
+             mock.patch('os.copy_file_range', side_effect=err, create=True):
+            self.assertEqual(self.installer.install(entries), (1, 0))
+        self.assertEqual(self.read_dst('foo.txt'), 'foo')
+
+    def test_install_hardlink(self):
+        installer_ = installer.Installer(
+            {'srcdir': self.srcdir, 'prefix': self.prefix}, self.manifest,
+            mode='hardlink'
+        )
+        prog = self.write_src('prog')
+        os.chmod(prog, 0o755)
+        data = self.write_src('data')
+        os.chmod(data, 0o644)
+        entries = [self.entry('prog', 'prog', 'program'),
+                   self.entry('data', 'data'),
+                   self.entry('prog', 'prog_data'),
+                   dict(self.entry('prog', 'fixed', 'program'),
+                        fixup={'command': [sys.executable, '-c', '']})]
+
+        self.assertEqual(installer_.install(entries), (4, 0))
+        self.assertTrue(os.path.samefile(
+            prog, os.path.join(self.prefix, 'prog')
+        ))
+        self.assertTrue(os.path.samefile(
+            data, os.path.join(self.prefix, 'data')
+        ))
+        # Files that need different permissions or post-install fixups are
+        # copied instead.
+        self.assertFalse(os.path.samefile(
+            prog, os.path.join(self.prefix, 'prog_data')
+        ))
+        self.assertFalse(os.path.samefile(
+            prog, os.path.join(self.prefix, 'fixed')
+        ))
+        self.assertEqual(stat.S_IMODE(os.stat(prog).st_mode), 0o755)
+        self.assertEqual(installer_.install(entries), (0, 4))
+
+    def test_install_hardlink_fallback(self):
+        self.installer.mode = 'hardlink'
+        src = self.write_src('prog')
+        entries = [self.entry('prog', 'prog', 'program')]
+
+        err = OSError(errno.EXDEV, 'Invalid cross-device link')
+        with mock.patch('os.link', side_effect=err):
+            self.assertEqual(self.installer.install(entries), (1, 0))
+        self.assertFalse(os.path.samefile(
+            src, os.path.join(self.prefix, 'prog')
+        ))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(installer.InstallError):
+            installer.Installer({}, self.manifest, mode='unknown')
+
+    def test_install_directory(self):
+        entries = [{'kind': 'directory', 'dst': ['prefix', 'dir']}]
+        self.assertEqual(self.installer.install(entries), (0, 0))
+        self.assertTrue(os.path.isdir(os.path.join(self.prefix, 'dir')))
+
+    def test_install_missing(self):
+        entries = [self.entry('missing.txt', 'missing.txt')]
+        with self.assertRaises(installer.InstallError):
+            self.installer.install(entries)
+
+    def test_uninstall(self):
+        self.write_src('foo.txt')
+        self.write_src('bar.txt')
+        self.installer.install([self.entry('foo.txt', 'foo.txt')])
+
+        # Files in the manifest are removed even if they're no longer part of
+        # the plan.
+        entries = [self.entry('bar.txt', 'bar.txt')]
+        self.assertEqual(self.installer.uninstall(entries), 1)
+        self.assertEqual(os.listdir(self.prefix), [])
+        self.assertFalse(os.path.exists(self.manifest))
+
+    def test_uninstall_other_destdir(self):
+        self.write_src('foo.txt')
+        entries = [self.entry('foo.txt', 'foo.txt')]
+        self.installer.install(entries)
+
+        destdir = os.path.join(self.tmpdir.name, 'destdir')
+        staged = installer.Installer(
+            {'srcdir': self.srcdir, 'prefix': destdir + self.prefix},
+            self.manifest
+        )
+        staged.install(entries)
+
+        self.assertEqual(self.installer.uninstall(entries), 1)
+        self.assertEqual(os.listdir(self.prefix), [])
+        self.assertTrue(os.path.exists(destdir + self.prefix + '/foo.txt'))
+        self.assertEqual(list(installer.read_manifest(self.manifest)),
+                         [os.path.join(destdir + self.prefix, 'foo.txt')])
+
+
+class TestPlan(TestCase):
+    def test_round_trip(self):
+        entries = [{'kind': 'data', 'src': ['srcdir', 'foo'],
+                    'dst': ['prefix', 'foo']}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plan = os.path.join(tmpdir, 'plan')
+            with open(plan, 'w') as f:
+                installer.write_plan(f, entries)
+            self.assertEqual(installer.read_plan(plan), entries)
+
+    def test_bad_version(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plan = os.path.join(tmpdir, 'plan')
+            with open(plan, 'w') as f:
+                json.dump({'version': 999, 'entries': []}, f)
+            with self.assertRaises(installer.InstallError):
+                installer.read_plan(plan)
+
+    def test_bad_manifest(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = os.path.join(tmpdir, 'manifest')
+            self.assertEqual(installer.read_manifest(manifest), {})
+            with open(manifest, 'w') as f:
+                f.write('garbage')
+            self.assertEqual(installer.read_manifest(manifest), {})
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from . import *
 
 from bfg9000.languages import Formats, Languages
@@ -105,6 +107,18 @@ class TestLanguages(TestCase):
         self.assertEqual(self.known_langs.fromext('.c', 'goofy'), None)
         self.assertEqual(self.known_langs.fromext('.foo', 'source'), None)
 
+    def test_loader(self):
+        def loader():
+            with known_langs.make('c') as x:
+                x.exts(source='.c')
+
+        known_langs = Languages(mock.Mock(side_effect=loader))
+        known_langs._loader.assert_not_called()
+        self.assertEqual(known_langs.fromext('.c', 'source'), 'c')
+        self.assertTrue('c' in known_langs)
+        self.assertEqual(known_langs['c'].name, 'c')
+        self.assertEqual(known_langs._loader, None)
+
 
 class TestFormats(TestCase):
     def setUp(self):
@@ -157,3 +171,13 @@ class TestFormats(TestCase):
         msg = r"^unrecognized format 'native \(goofy\)'$"
         with self.assertRaisesRegex(ValueError, msg):
             self.known_formats['native']['goofy']
+
+    def test_loader(self):
+        loader = mock.Mock()
+        known_formats = Formats(loader)
+        loader.assert_not_called()
+        with self.assertRaises(ValueError):
+            known_formats['native']
+        with self.assertRaises(ValueError):
+            known_formats['native']
+        loader.assert_called_once_with()
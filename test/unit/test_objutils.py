@@ -1,3 +1,7 @@
+import json
+import os
+import tempfile
+
 from . import *
 
 from bfg9000.objutils import *
@@ -28,3 +32,155 @@ class TestObjectify(TestCase):
     def test_extra_args(self):
         self.assertEqual(objectify('foo', list, lambda x, y: [x, y], y='bar'),
                          ['foo', 'bar'])
+
+
+class TestInstanceVars(TestCase):
+    class Slotted:
+        __slots__ = ('foo', 'bar')
+
+        def __init__(self):
+            self.foo = 1
+
+    class Derived(Slotted):
+        def __init__(self):
+            super().__init__()
+            self.baz = 2
+
+    def test_dict(self):
+        self.assertEqual(instance_vars(AttrDict(foo=1, bar=2)),
+                         {'foo': 1, 'bar': 2})
+
+    def test_slots(self):
+        self.assertEqual(instance_vars(self.Slotted()), {'foo': 1})
+
+    def test_mixed(self):
+        self.assertEqual(instance_vars(self.Derived()), {'foo': 1, 'baz': 2})
+
+
+class TestMemoize(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        @memoize
+        def fn(x, y=None):
+            self.calls.append((x, y))
+            return [x, y]
+
+        self.fn = fn
+
+    def test_memoize(self):
+        self.assertEqual(self.fn(1), [1, None])
+        self.assertEqual(self.fn(1), [1, None])
+        self.assertEqual(self.fn(1, y=2), [1, 2])
+        self.assertEqual(self.calls, [(1, None), (1, 2)])
+
+    def test_unhashable(self):
+        self.assertEqual(self.fn([1], y={'a': [2]}), [[1], {'a': [2]}])
+        self.assertEqual(self.fn([1], y={'a': [2]}), [[1], {'a': [2]}])
+        self.assertEqual(self.calls, [([1], {'a': [2]})])
+
+    def test_cache_info(self):
+        self.fn(1)
+        self.fn(1)
+        self.fn(2)
+        info = self.fn.cache_info()
+        self.assertEqual(info.name, __name__ + '.TestMemoize.setUp.' +
+                         '<locals>.fn')
+        self.assertEqual(info[1:], (1, 2, None, 2))
+
+    def test_reset(self):
+        self.fn(1)
+        self.fn._reset()
+        self.fn(1)
+        self.assertEqual(self.calls, [(1, None), (1, None)])
+        self.assertEqual(self.fn.cache_info()[1:], (0, 1, None, 1))
+
+    def test_maxsize(self):
+        @memoize(maxsize=2)
+        def fn(x):
+            self.calls.append(x)
+            return x
+
+        fn(1)
+        fn(2)
+        fn(1)
+        fn(3)
+        fn(1)
+        fn(2)
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+        self.assertEqual(fn.cache_info()[1:], (2, 4, 2, 2))
+
+    def test_summarize(self):
+        self.fn(1)
+        self.fn(1)
+        summary = summarize_caches()
+        self.assertRegex(summary[0],
+                         r'^memoize summary: \d+ hits, \d+ misses$')
+        self.assertIn('  {}: 1 hits, 1 misses, 1 entries'.format(
+            self.fn.cache_info().name
+        ), summary)
+
+
+class TestPersistentCaches(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'cache',
+                                     'memoize.json')
+
+        def key(x):
+            return None if x < 0 else ['key', x]
+
+        @memoize(persist=key)
+        def fn(x):
+            self.calls.append(x)
+            return {'value': x}
+
+        self.fn = fn
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_fn(self, *args):
+        self.fn._reset()
+        with persistent_caches(self.filename):
+            return [self.fn(i) for i in args]
+
+    def test_round_trip(self):
+        self.assertEqual(self.run_fn(1, 2),
+                         [{'value': 1}, {'value': 2}])
+        self.assertEqual(self.run_fn(1, 3),
+                         [{'value': 1}, {'value': 3}])
+        self.assertEqual(self.calls, [1, 2, 3])
+        self.assertEqual(self.fn.cache_info()[1:3], (1, 1))
+
+        # Only the results used last time should be saved.
+        self.assertEqual(self.run_fn(2), [{'value': 2}])
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+
+    def test_no_key(self):
+        self.run_fn(-1)
+        self.run_fn(-1)
+        self.assertEqual(self.calls, [-1, -1])
+
+    def test_not_persisting(self):
+        self.run_fn(1)
+        self.fn._reset()
+        self.fn(1)
+        self.assertEqual(self.calls, [1, 1])
+
+    def test_exception(self):
+        with self.assertRaises(RuntimeError):
+            with persistent_caches(self.filename):
+                self.fn(1)
+                raise RuntimeError()
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_invalid_file(self):
+        os.makedirs(os.path.dirname(self.filename))
+        for data in ['garbage', json.dumps({'version': 0, 'caches': {}}),
+                     json.dumps([])]:
+            with open(self.filename, 'w') as f:
+                f.write(data)
+            self.run_fn(1)
+        self.assertEqual(self.calls, [1, 1, 1])
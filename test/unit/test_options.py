@@ -1,6 +1,8 @@
 from . import *
 
-from bfg9000 import options
+from bfg9000 import file_types, options
+from bfg9000.path import Path
+from bfg9000.safe_str import shell_literal
 
 
 class TestOptionList(TestCase):
@@ -29,6 +31,33 @@ class TestOptionList(TestCase):
         opts.append('-v')
         self.assertEqual(list(opts), ['-v', '-v'])
 
+    def test_append_fields(self):
+        opts = options.option_list()
+        opts.append(options.define('name'))
+        opts.append(options.define('name', 'value'))
+        opts.append(options.define('name'))
+        opts.append(options.define('name', 'value'))
+        self.assertEqual(list(opts), [options.define('name'),
+                                      options.define('name', 'value')])
+
+    def test_append_variadic(self):
+        opts = options.option_list()
+        opts.append(options.warning('all', 'error'))
+        opts.append(options.warning('all'))
+        opts.append(options.warning('all', 'error'))
+        self.assertEqual(list(opts), [options.warning('all', 'error'),
+                                      options.warning('all')])
+
+    def test_append_unhashable(self):
+        opts = options.option_list()
+        opts.append(options.lib_literal(shell_literal('-lfoo')))
+        opts.append(options.lib_literal('-lfoo'))
+        opts.append(options.lib_literal(shell_literal('-lfoo')))
+        self.assertEqual(list(opts), [
+            options.lib_literal(shell_literal('-lfoo')),
+            options.lib_literal('-lfoo'),
+        ])
+
     def test_extend(self):
         opts = options.option_list()
         opts.extend([options.pthread(), options.pic()])
@@ -57,6 +86,11 @@ class TestOptionList(TestCase):
         self.assertTrue(opts is not opts2)
         self.assertEqual(opts, opts2)
 
+        opts2.append(options.debug())
+        opts.append(options.debug())
+        self.assertEqual(opts, opts2)
+        self.assertEqual(len(opts), 3)
+
     def test_filter(self):
         opts = options.option_list(options.pthread(), options.pic())
         opts2 = opts.filter(options.pic)
@@ -96,6 +130,11 @@ class TestOptionList(TestCase):
         opts[0:] = [options.define('name')]
         self.assertEqual(opts, options.option_list(options.define('name')))
 
+        opts.append(options.pic())
+        opts.append(options.define('name'))
+        self.assertEqual(opts, options.option_list(options.define('name'),
+                                                   options.pic()))
+
     def test_eq(self):
         opts1 = options.option_list(options.pthread())
         opts2 = options.option_list(options.pthread())
@@ -127,6 +166,119 @@ class TestOptionList(TestCase):
             opts += [options.pic()]
 
 
+class TestForwardOptions(TestCase):
+    def make_lib(self, name, *, libs=[], compile_options=[]):
+        lib = file_types.StaticLibrary(Path(name), 'elf', 'c')
+        lib.forward_opts = options.ForwardOptions(
+            compile_options=options.option_list(compile_options),
+            libs=libs,
+        )
+        return lib
+
+    def test_recurse(self):
+        inner = self.make_lib('inner', compile_options=[options.pic()])
+        middle = self.make_lib('middle', libs=[inner],
+                               compile_options=[options.debug()])
+        outer = self.make_lib('outer', libs=[middle, inner])
+
+        fwd = options.ForwardOptions.recurse([outer])
+        self.assertEqual(fwd.libs, [middle, inner, inner])
+        self.assertEqual(fwd.compile_options, options.option_list(
+            options.debug(), options.pic()
+        ))
+
+    def test_recurse_no_forward_opts(self):
+        lib = file_types.SharedLibrary(Path('shared'), 'elf', 'c')
+        self.assertEqual(options.ForwardOptions.recurse([lib]),
+                         options.ForwardOptions())
+
+    def test_closure_cached(self):
+        inner = self.make_lib('inner')
+        outer = self.make_lib('outer', libs=[inner])
+        closure = outer.forward_opts.closure()
+        self.assertIs(outer.forward_opts.closure(), closure)
+
+        fwd = options.ForwardOptions.recurse([outer])
+        fwd.libs.append(outer)
+        self.assertEqual(outer.forward_opts.closure().libs, [inner])
+
+    def test_closure_invalidated(self):
+        inner = self.make_lib('inner', compile_options=[options.pic()])
+        outer = self.make_lib('outer', libs=[inner])
+        closure = outer.forward_opts.closure()
+
+        outer.forward_opts.compile_options.append(options.debug())
+        self.assertIsNot(outer.forward_opts.closure(), closure)
+        self.assertEqual(outer.forward_opts.closure().compile_options,
+                         options.option_list(options.debug(), options.pic()))
+
+        inner.forward_opts = options.ForwardOptions(
+            compile_options=options.option_list(options.static())
+        )
+        self.assertEqual(outer.forward_opts.closure().compile_options,
+                         options.option_list(options.debug(),
+                                             options.static()))
+
+    def test_closure_invalidated_transitive(self):
+        inner = self.make_lib('inner', compile_options=[options.define('C')])
+        middle = self.make_lib('middle', libs=[inner])
+        outer = self.make_lib('outer', libs=[middle])
+        closure = outer.forward_opts.closure()
+
+        inner.forward_opts.compile_options.append(options.define('C2'))
+        self.assertIsNot(outer.forward_opts.closure(), closure)
+        self.assertEqual(outer.forward_opts.closure().compile_options,
+                         options.option_list(options.define('C'),
+                                             options.define('C2')))
+
+        inner.forward_opts.libs.append(self.make_lib(
+            'innermost', compile_options=[options.pic()]
+        ))
+        self.assertEqual(outer.forward_opts.closure().compile_options,
+                         options.option_list(options.define('C'),
+                                             options.define('C2'),
+                                             options.pic()))
+
+    def test_closure_diamond(self):
+        base = self.make_lib('base', compile_options=[options.pic()])
+        left = self.make_lib('left', libs=[base])
+        right = self.make_lib('right', libs=[base])
+        top = self.make_lib('top', libs=[left, right])
+        closure = top.forward_opts.closure()
+        self.assertEqual(closure.compile_options,
+                         options.option_list(options.pic()))
+        self.assertIs(top.forward_opts.closure(), closure)
+
+        base.forward_opts.compile_options.append(options.debug())
+        self.assertEqual(top.forward_opts.closure().compile_options,
+                         options.option_list(options.pic(), options.debug()))
+
+    def test_closure_hit_skips_libs(self):
+        inner = self.make_lib('inner', compile_options=[options.pic()])
+        outer = self.make_lib('outer', libs=[inner])
+        closure = outer.forward_opts.closure()
+
+        # A cached closure shouldn't need to look at any libs at all.
+        class BadLib:
+            @property
+            def forward_opts(self):
+                raise AssertionError('forward_opts accessed')
+
+        list.append(outer.forward_opts.libs, BadLib())
+        self.assertIs(outer.forward_opts.closure(), closure)
+
+    def test_closure_invalidated_field(self):
+        inner = self.make_lib('inner')
+        outer = self.make_lib('outer', libs=[inner])
+        outer.forward_opts.closure()
+
+        inner.forward_opts.packages.append('pkg')
+        self.assertEqual(outer.forward_opts.closure().packages, ['pkg'])
+        inner.forward_opts.link_options[0:0] = [options.debug()]
+        self.assertEqual(outer.forward_opts.closure().link_options,
+                         options.option_list(options.debug()))
+
+
 class TestOption(TestCase):
     def test_create(self):
         my_option = options.option('my_option', ['value'])
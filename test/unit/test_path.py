@@ -1,4 +1,5 @@
 import os
+import tempfile
 from collections import namedtuple
 from contextlib import contextmanager
 from unittest import mock
@@ -834,6 +835,40 @@ class TestSamefile(TestCase):
                                            path.Path('/foo/bar')), True)
 
 
+class TestDirectoryIndex(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.base = path.abspath(self.tmpdir.name)
+        os.mkdir(os.path.join(self.tmpdir.name, 'sub'))
+        for i in ('foo.hpp', os.path.join('sub', 'bar.hpp')):
+            with open(os.path.join(self.tmpdir.name, i), 'w'):
+                pass
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_exists(self):
+        index = path.DirectoryIndex()
+        with mock.patch('os.scandir', side_effect=os.scandir) as m:
+            self.assertTrue(index.exists(self.base.append('foo.hpp')))
+            self.assertTrue(index.exists(self.base.append('sub')))
+            self.assertTrue(index.exists(self.base.append('sub/bar.hpp')))
+            self.assertFalse(index.exists(self.base.append('bar.hpp')))
+            self.assertFalse(index.exists(self.base.append('sub/foo.hpp')))
+            self.assertFalse(index.exists(self.base.append('nonexist/foo')))
+            self.assertFalse(index.exists(self.base.append('nonexist/bar')))
+            self.assertEqual(m.call_count, 3)
+
+    def test_broken_symlink(self):
+        index = path.DirectoryIndex()
+        try:
+            os.symlink(os.path.join(self.tmpdir.name, 'nonexist'),
+                       os.path.join(self.tmpdir.name, 'link'))
+        except (OSError, NotImplementedError):  # pragma: no cover
+            self.skipTest('unable to create symlink')
+        self.assertFalse(index.exists(self.base.append('link')))
+
+
 class TestListdir(TestCase):
     path_vars = {path.Root.builddir: None}
 
@@ -914,3 +949,57 @@ class TestPushd(TestCase):
             self.assertEqual(os_chdir.mock_calls, [
                 mock.call('foo'), mock.call('cwd')
             ])
+
+
+class TestWriteIfChanged(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path_vars = {path.Root.builddir: self.tmpdir.name}
+        self.filename = os.path.join(self.tmpdir.name, 'sub', 'file')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_text(self):
+        p = path.Path('sub/file')
+        self.assertEqual(path.write_if_changed(p, 'foo', self.path_vars),
+                         True)
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), 'foo')
+
+        os.utime(self.filename, (0, 0))
+        self.assertEqual(path.write_if_changed(p, 'foo', self.path_vars),
+                         False)
+        self.assertEqual(os.stat(self.filename).st_mtime, 0)
+
+        self.assertEqual(path.write_if_changed(p, 'bar', self.path_vars),
+                         True)
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), 'bar')
+        self.assertEqual(os.listdir(os.path.dirname(self.filename)),
+                         ['file'])
+
+    def test_binary(self):
+        p = path.Path('sub/file')
+        self.assertEqual(path.write_if_changed(p, b'foo', self.path_vars),
+                         True)
+        self.assertEqual(path.write_if_changed(p, b'foo', self.path_vars),
+                         False)
+        self.assertEqual(path.write_if_changed(p, b'bar', self.path_vars),
+                         True)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'bar')
+
+    def test_keep_mode(self):
+        p = path.Path('sub/file')
+        path.write_if_changed(p, 'foo', self.path_vars)
+        os.chmod(self.filename, 0o600)
+        path.write_if_changed(p, 'bar', self.path_vars)
+        self.assertEqual(os.stat(self.filename).st_mode & 0o777, 0o600)
+
+    def test_error(self):
+        p = path.Path('sub/file')
+        with mock.patch('os.replace', side_effect=OSError()), \
+             self.assertRaises(OSError):  # noqa
+            path.write_if_changed(p, 'foo', self.path_vars)
+        self.assertEqual(os.listdir(os.path.dirname(self.filename)), [])
@@ -0,0 +1,33 @@
+from unittest import mock
+
+from . import *
+
+from bfg9000 import plugins
+from bfg9000.platforms.posix import PosixPath
+
+
+class TestLoadObject(TestCase):
+    def test_module(self):
+        self.assertIs(plugins.load_object('bfg9000.plugins'), plugins)
+
+    def test_attr(self):
+        self.assertIs(plugins.load_object('bfg9000.platforms.posix:PosixPath'),
+                      PosixPath)
+
+    def test_nested_attr(self):
+        self.assertIs(plugins.load_object(
+            'bfg9000.platforms.posix:PosixPath.string'
+        ), PosixPath.string)
+
+    def test_not_found(self):
+        self.assertRaises(ImportError, plugins.load_object, 'nonexist')
+        self.assertRaises(AttributeError, plugins.load_object,
+                          'bfg9000.plugins:nonexist')
+
+
+class TestIterEntryPoints(TestCase):
+    def test_iter(self):
+        eps = mock.MagicMock()
+        with mock.patch('bfg9000.plugins._entry_points', return_value=eps):
+            plugins.iter_entry_points('group')
+        eps.select.assert_called_once_with(group='group')
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from . import *
+
+from bfg9000 import probes
+
+
+class TestProbeLog(TestCase):
+    def test_record(self):
+        log = probes.ProbeLog()
+        log.record('exec', 'cmd', 1)
+        self.assertEqual(log.probes, [
+            probes.Probe('exec', 'cmd', None, 1, False),
+        ])
+
+    def test_record_lazy(self):
+        log = probes.ProbeLog()
+        command = mock.Mock(return_value='cmd')
+        log.record('exec', command, 1)
+        command.assert_not_called()
+        self.assertEqual(log.probes[0].command, 'cmd')
+
+    def test_caller(self):
+        log = probes.ProbeLog()
+        with log.caller('outer'):
+            log.record('exec', 'cmd1')
+            with log.caller('inner'):
+                log.record('exec', 'cmd2')
+            log.record('exec', 'cmd3')
+        self.assertEqual([(i.command, i.caller) for i in log.probes], [
+            ('cmd1', 'outer'), ('cmd2', 'inner'), ('cmd3', 'outer'),
+        ])
+        self.assertEqual(log.current_caller, None)
+
+    def test_timed(self):
+        log = probes.ProbeLog()
+        with self.assertRaises(ValueError):
+            with log.timed('which', 'cmd'):
+                raise ValueError()
+        self.assertEqual(len(log.probes), 1)
+        self.assertEqual(log.probes[0].kind, 'which')
+        self.assertGreaterEqual(log.probes[0].duration, 0)
+
+    def test_summarize_empty(self):
+        self.assertEqual(probes.ProbeLog().summarize(), [])
+
+    def test_summarize(self):
+        log = probes.ProbeLog()
+        with log.caller('tool'):
+            log.record('exec', 'cmd1', 1)
+        with log.caller('package'):
+            log.record('exec', 'cmd2', 2)
+            log.record('call', 'cmd2', cached=True)
+
+        self.assertEqual(log.summarize(), [
+            'probe summary: 2 probes in 3.000s (1 cached)',
+            '  package: 1 probes in 2.000s (1 cached)',
+            '  tool: 1 probes in 1.000s (0 cached)',
+        ])
+        self.assertEqual(log.summarize(verbose=True), [
+            'probe summary: 2 probes in 3.000s (1 cached)',
+            '  package: 1 probes in 2.000s (1 cached)',
+            '      2.000s exec  cmd2',
+            '      cached call  cmd2',
+            '  tool: 1 probes in 1.000s (0 cached)',
+            '      1.000s exec  cmd1',
+        ])
+
+
+class TestGlobalProbeLog(TestCase):
+    def setUp(self):
+        self.log = probes.reset()
+
+    def test_record(self):
+        with probes.caller('caller'):
+            probes.record('exec', 'cmd')
+        self.assertEqual(self.log.probes, [
+            probes.Probe('exec', 'cmd', 'caller', 0, False),
+        ])
+
+    def test_memoize(self):
+        class Foo:
+            @probes.memoize
+            def fn(self, x):
+                probes.record('exec', 'fn {}'.format(x))
+                return x
+
+        foo = Foo()
+        self.assertEqual(foo.fn(1), 1)
+        self.assertEqual(foo.fn(1), 1)
+        self.assertEqual(foo.fn(2), 2)
+        self.assertEqual([(i.kind, i.cached) for i in self.log.probes], [
+            ('exec', False), ('call', True), ('exec', False),
+        ])
@@ -0,0 +1,74 @@
+import json
+from io import StringIO
+
+from . import *
+
+from bfg9000 import profiler
+
+
+class TestProfiler(TestCase):
+    def test_span(self):
+        p = profiler.Profiler()
+        with p.span('name', 'category'):
+            pass
+        self.assertEqual(len(p.events), 1)
+        event = p.events[0]
+        self.assertEqual(event['name'], 'name')
+        self.assertEqual(event['cat'], 'category')
+        self.assertEqual(event['ph'], 'X')
+        self.assertGreaterEqual(event['ts'], 0)
+        self.assertGreaterEqual(event['dur'], 0)
+        self.assertFalse('args' in event)
+
+    def test_span_args(self):
+        p = profiler.Profiler()
+        with p.span('name', 'category', foo='bar', baz=1):
+            pass
+        self.assertEqual(p.events[0]['args'], {'foo': 'bar', 'baz': '1'})
+
+    def test_span_exception(self):
+        p = profiler.Profiler()
+        with self.assertRaises(ValueError):
+            with p.span('name', 'category'):
+                raise ValueError()
+        self.assertEqual(len(p.events), 1)
+
+    def test_nested_spans(self):
+        p = profiler.Profiler()
+        with p.span('outer', 'category'):
+            with p.span('inner', 'category'):
+                pass
+        inner, outer = p.events
+        self.assertEqual(inner['name'], 'inner')
+        self.assertEqual(outer['name'], 'outer')
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'],
+                                inner['ts'] + inner['dur'])
+
+    def test_write(self):
+        p = profiler.Profiler()
+        with p.span('name', 'category'):
+            pass
+        out = StringIO()
+        p.write(out)
+        data = json.loads(out.getvalue())
+        self.assertEqual(data['traceEvents'], p.events)
+
+
+class TestGlobalProfiler(TestCase):
+    def tearDown(self):
+        profiler.stop()
+
+    def test_disabled(self):
+        self.assertFalse(profiler.enabled())
+        with profiler.span('name', 'category'):
+            pass
+
+    def test_enabled(self):
+        p = profiler.start()
+        self.assertTrue(profiler.enabled())
+        with profiler.span('name', 'category'):
+            pass
+        self.assertIs(profiler.stop(), p)
+        self.assertFalse(profiler.enabled())
+        self.assertEqual([i['name'] for i in p.events], ['name'])
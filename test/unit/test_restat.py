@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+from . import *
+
+from bfg9000 import restat
+
+
+class TestRestat(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'file.c')
+        self.write('int x;')
+        os.utime(self.filename, ns=(1000000000, 1000000000))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, data):
+        with open(self.filename, 'w') as f:
+            f.write(data)
+
+    def mtime(self):
+        return os.stat(self.filename).st_mtime_ns
+
+    def test_unchanged(self):
+        snap = restat.snapshot([self.filename])
+        self.write('int x;')
+        self.assertEqual(restat.restore(snap), [self.filename])
+        self.assertEqual(self.mtime(), 1000000000)
+
+    def test_changed(self):
+        snap = restat.snapshot([self.filename])
+        self.write('int y;')
+        self.assertEqual(restat.restore(snap), [])
+        self.assertNotEqual(self.mtime(), 1000000000)
+
+    def test_new_file(self):
+        os.remove(self.filename)
+        snap = restat.snapshot([self.filename])
+        self.assertEqual(snap, {})
+        self.write('int x;')
+        self.assertEqual(restat.restore(snap), [])
+
+    def test_removed_file(self):
+        snap = restat.snapshot([self.filename])
+        os.remove(self.filename)
+        self.assertEqual(restat.restore(snap), [])
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from unittest import mock
 
 from ... import *
@@ -5,7 +7,8 @@ from .common import known_langs, mock_execute, mock_which
 
 from bfg9000 import platforms
 from bfg9000.exceptions import PackageResolutionError
-from bfg9000.path import Path, Root
+from bfg9000.file_types import HeaderDirectory
+from bfg9000.path import abspath, Path, Root
 from bfg9000.tools.cc import CcBuilder
 from bfg9000.versioning import Version
 
@@ -217,8 +220,20 @@ class TestCcPackageResolver(CrossPlatformTestCase):
             self.packages = CcBuilder(self.env, known_langs['c++'], ['c++'],
                                       'version').packages
 
+    def test_header(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, 'foo.hpp'), 'w'):
+                pass
+            dirs = [abspath(os.path.join(tmpdir, 'nonexist')), abspath(tmpdir)]
+            self.assertEqual(self.packages.header('foo.hpp', dirs),
+                             HeaderDirectory(abspath(tmpdir), None,
+                                             system=True))
+            with self.assertRaises(PackageResolutionError):
+                self.packages.header('bar.hpp', dirs)
+
     def test_header_not_found(self):
-        with mock.patch('bfg9000.tools.cc.exists', return_value=False):
+        with mock.patch.object(self.env.dir_index, 'exists',
+                               return_value=False):
             with self.assertRaises(PackageResolutionError):
                 self.packages.header('foo.hpp')
 
@@ -227,7 +242,8 @@ class TestCcPackageResolver(CrossPlatformTestCase):
             self.packages.header('foo.hpp', [Path('dir', Root.srcdir)])
 
     def test_library_not_found(self):
-        with mock.patch('bfg9000.tools.cc.exists', return_value=False):
+        with mock.patch.object(self.env.dir_index, 'exists',
+                               return_value=False):
             with self.assertRaises(PackageResolutionError):
                 self.packages.library('foo')
 
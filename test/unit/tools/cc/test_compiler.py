@@ -174,3 +174,62 @@ class TestCcPchCompiler(TestCcCompiler):
         ext = '.gch' if self.compiler.brand == 'gcc' else '.pch'
         self.assertEqual(self.compiler.output_file('file.h', None),
                          PrecompiledHeader(Path('file.h' + ext), 'c++'))
+
+
+def gcc_version(version):
+    return ('g++ (GCC) {}\n'.format(version) +
+            'Copyright (C) 2024 Free Software Foundation, Inc.\n')
+
+
+class TestCcCompilerModules(CrossPlatformTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(clear_variables=True, *args, **kwargs)
+
+    def make_compiler(self, version):
+        with mock.patch('bfg9000.shell.which', mock_which), \
+             mock.patch('bfg9000.shell.execute', mock_execute):  # noqa
+            return CcBuilder(self.env, known_langs['c++'], ['c++'],
+                             version).compiler
+
+    def test_module_flavor(self):
+        for version, flavor in ((gcc_version('14.1.0'), 'p1689'),
+                                (gcc_version('12.2.0'), None),
+                                ('clang version 17.0.0', None),
+                                ('version', None)):
+            self.assertEqual(self.make_compiler(version).module_flavor,
+                             flavor)
+
+    def test_call(self):
+        compiler = self.make_compiler(gcc_version('14.1.0'))
+        extra = compiler._always_flags
+        self.assertEqual(
+            compiler('in', 'out', modules=True),
+            [compiler] + extra + ['-fmodules-ts', '-c', 'in', '-o', 'out']
+        )
+        self.assertEqual(
+            compiler('in', 'out', 'out.d', modules=True),
+            [compiler] + extra + ['-fmodules-ts', '-c', 'in', '-MMD', '-MF',
+                                  'out.d', '-Mno-modules', '-o', 'out']
+        )
+
+    def test_scan_modules(self):
+        compiler = self.make_compiler(gcc_version('14.1.0'))
+        extra = compiler._always_flags
+        self.assertEqual(
+            compiler.scan_modules('in', 'out.ddi', 'out.o'),
+            [compiler] + extra + [
+                '-fmodules-ts', '-E', 'in', '-fdeps-format=p1689r5',
+                '-fdeps-file=out.ddi', '-fdeps-target=out.o',
+                '-o', 'out.ddi.ii'
+            ]
+        )
+        self.assertEqual(
+            compiler.scan_modules('in', 'out.ddi', 'out.o', 'out.ddi.d',
+                                  ['flags']),
+            [compiler] + extra + [
+                'flags', '-fmodules-ts', '-E', 'in', '-MT', 'out.ddi', '-MMD',
+                '-MF', 'out.ddi.d', '-fdeps-format=p1689r5',
+                '-fdeps-file=out.ddi', '-fdeps-target=out.o',
+                '-o', 'out.ddi.ii'
+            ]
+        )
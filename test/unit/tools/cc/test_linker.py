@@ -10,6 +10,7 @@ from bfg9000.file_types import *
 from bfg9000.tools.cc import CcBuilder
 from bfg9000.packages import Framework
 from bfg9000.path import InstallRoot, Path, Root
+from bfg9000.safe_str import jbos
 
 
 class TestCcLinker(CrossPlatformTestCase):
@@ -44,6 +45,10 @@ class TestCcLinker(CrossPlatformTestCase):
             [self.linker] + extra + ['flags', 'in', 'lib', '-o', 'out']
         )
 
+    def test_rspfile_arg(self):
+        self.assertEqual(self.linker.rspfile_arg('out.rsp'),
+                         jbos('@', 'out.rsp'))
+
     def test_output_file(self):
         fmt = self.env.target_platform.object_format
         ext = self.env.target_platform.executable_ext
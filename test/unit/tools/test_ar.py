@@ -3,6 +3,7 @@ from unittest import mock
 from .. import *
 
 from bfg9000 import file_types, options as opts
+from bfg9000.safe_str import jbos
 from bfg9000.tools.ar import ArLinker
 from bfg9000.versioning import Version
 
@@ -54,6 +55,17 @@ class TestArLinker(CrossPlatformTestCase):
         self.assertEqual(self.ar(['in'], 'out', ['flags']),
                          [self.ar, 'flags', 'out', 'in'])
 
+    def test_rspfile_arg(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='GNU ar (binutils) 2.26.1'):
+            self.assertEqual(self.ar.rspfile_arg('out.rsp'),
+                             jbos('@', 'out.rsp'))
+
+        self.ar = ArLinker(AttrDict(object_format='elf'), self.env,
+                           command=('ar', ['ar']), flags=('arflags', []))
+        with mock.patch('bfg9000.shell.execute', return_value='unknown'):
+            self.assertEqual(self.ar.rspfile_arg('out.rsp'), None)
+
     def test_output_file(self):
         fmt = self.env.target_platform.object_format
         self.assertEqual(
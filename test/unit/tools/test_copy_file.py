@@ -0,0 +1,29 @@
+from . import *
+
+from bfg9000.safe_str import shell_literal
+from bfg9000.tools.copy_file import Hardlink, Reflink
+
+
+class TestHardlink(ToolTestCase):
+    tool_type = Hardlink
+
+    def test_env(self):
+        with mock.patch('bfg9000.shell.which', return_value=['command']):
+            self.assertIsInstance(self.env.tool('hardlink'), Hardlink)
+
+    def test_hardlink(self):
+        copy = self.env.tool('copy')
+        self.assertEqual(self.tool('src', 'dst'), [
+            self.tool, 'src', 'dst', shell_literal('||'), copy, 'src', 'dst'
+        ])
+
+
+class TestReflink(ToolTestCase):
+    tool_type = Reflink
+
+    def test_env(self):
+        with mock.patch('bfg9000.shell.which', return_value=['command']):
+            self.assertIsInstance(self.env.tool('reflink'), Reflink)
+
+    def test_reflink(self):
+        self.assertEqual(self.tool('src', 'dst'), [self.tool, 'src', 'dst'])
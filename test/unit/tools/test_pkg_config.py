@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 from . import *
 
 from bfg9000 import options as opts
@@ -142,3 +145,56 @@ class TestPkgConfigPackage(ToolTestCase):
                 opts.install_name_change('/path/to/build/baz/libbaz.dylib',
                                          '/usr/lib/libbaz.dylib'),
             ))
+
+
+class TestPkgConfig(ToolTestCase):
+    tool_type = PkgConfig
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmpdir.name, 'foo.pc'), 'w'):
+            pass
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        PkgConfig._execute._reset()
+        PkgConfig._default_path._reset()
+        PkgConfig._path_stamp._reset()
+
+    def test_run(self):
+        with mock.patch('bfg9000.shell.execute',
+                        side_effect=mock_execute) as m:
+            self.assertEqual(self.tool.run('foo', 'version'), '1.0')
+            self.assertEqual(self.tool.run('foo', 'version'), '1.0')
+            m.assert_called_once()
+
+    def test_persist_key(self):
+        stamp = os.stat(os.path.join(self.tmpdir.name, 'foo.pc')).st_mtime_ns
+        stamp = max(stamp, os.stat(self.tmpdir.name).st_mtime_ns)
+        missing = os.path.join(self.tmpdir.name, 'nonexist')
+        command = ['pkg-config', 'foo', '--modversion']
+
+        self.env.variables['PKG_CONFIG_LIBDIR'] = self.tmpdir.name
+        self.assertEqual(self.tool._persist_key(command), [
+            command, {'PKG_CONFIG_LIBDIR': self.tmpdir.name},
+            [[self.tmpdir.name, stamp]],
+        ])
+        self.assertEqual(self.tool._persist_key(command, {
+            'PKG_CONFIG_PATH': missing, 'OTHER': 'value'
+        }), [
+            command, {'PKG_CONFIG_LIBDIR': self.tmpdir.name,
+                      'PKG_CONFIG_PATH': missing},
+            [[missing, None], [self.tmpdir.name, stamp]],
+        ])
+
+    def test_persist_key_default_path(self):
+        command = ['pkg-config', 'foo', '--modversion']
+        with mock.patch('bfg9000.shell.execute',
+                        return_value=self.tmpdir.name + '\n'):
+            self.assertEqual(self.tool._persist_key(command)[2][0][0],
+                             self.tmpdir.name)
+
+        PkgConfig._default_path._reset()
+        with mock.patch('bfg9000.shell.execute', side_effect=OSError()):
+            self.assertEqual(self.tool._persist_key(command), None)
@@ -0,0 +1,68 @@
+import subprocess
+import sys
+
+from .. import *
+
+from bfg9000 import tools
+from bfg9000.languages import known_formats, known_langs
+from bfg9000.platforms.host import platform_info
+from bfg9000.exceptions import ToolNotFoundError
+
+
+class TestRegistry(TestCase):
+    def setUp(self):
+        tools.init()
+
+    def _module(self, fn):
+        return fn.__module__[len(tools.__name__):]
+
+    def test_builders(self):
+        self.assertEqual(set(tools._builder_modules), set(tools._builders))
+        for lang, (fn, _) in tools._builders.items():
+            self.assertEqual(tools._builder_modules[lang], self._module(fn))
+
+    def test_tools(self):
+        # `setenv` is only defined on Windows.
+        missing = (set() if platform_info().family == 'windows'
+                   else {'setenv'})
+        self.assertEqual(set(tools._tool_modules) - missing,
+                         set(tools._tools))
+        for name, fn in tools._tools.items():
+            self.assertEqual(tools._tool_modules[name], self._module(fn))
+
+    def test_tool_runners(self):
+        self.assertEqual(set(tools._tool_runner_modules),
+                         set(tools._tool_runners))
+        for lang, name in tools._tool_runners.items():
+            self.assertEqual(tools._tool_runner_modules[lang],
+                             tools._tool_modules[name])
+
+    def test_language_modules(self):
+        # Run this in a fresh interpreter, since we've already imported all
+        # the tools here.
+        script = ('from bfg9000 import languages, tools\n'
+                  'tools.init_languages()\n'
+                  'print(sorted(languages.known_langs._langs),\n'
+                  '      sorted(languages.known_formats._formats))\n')
+        output = subprocess.run(
+            [sys.executable, '-c', script], stdout=subprocess.PIPE,
+            universal_newlines=True, check=True
+        ).stdout
+        self.assertEqual(output, '{} {}\n'.format(
+            sorted(known_langs._langs), sorted(known_formats._formats)
+        ))
+
+
+class TestGetTool(CrossPlatformTestCase):
+    def test_get_builder_unknown(self):
+        self.assertRaises(ToolNotFoundError, tools.get_builder, self.env,
+                          'unknown')
+
+    def test_get_tool_unknown(self):
+        self.assertRaises(ToolNotFoundError, tools.get_tool, self.env,
+                          'unknown')
+
+    def test_get_tool_runner(self):
+        self.assertEqual(tools.get_tool_runner('python'), 'python')
+        self.assertRaises(ToolNotFoundError, tools.get_tool_runner,
+                          'unknown')